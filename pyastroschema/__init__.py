@@ -11,9 +11,6 @@ with open(_PATH_VERSION, "r") as inn:
 
 __version__ = version
 
-import shutil
-from jsonschema import ValidationError  # noqa
-
 
 # Basic hard-coded Parameters
 # -------------------------------------
@@ -27,6 +24,7 @@ _DIR_TESTS = "tests"
 _DIR_TESTS_SCHEMA = "test_schema"
 _DIR_META_SCHEMA = "meta-schema"
 _META_SCHEMA_FILENAME = "meta-schema.json"
+_DIR_BUNDLE = "bundled"
 
 INDEX_DESCRIPTION = "Index and summary of schema included in `astroschema`."
 
@@ -44,6 +42,7 @@ class PATHS:
     TESTS_SCHEMA_DIR = os.path.join(TESTS_DIR, _DIR_TESTS_SCHEMA, "")
     ASTROSCHEMA_VERSION_FILE = os.path.join(PYASTROSCHEMA, _FNAME_VERSION)
     INDEX_JSON_FILE = os.path.join(PYASTROSCHEMA, _INDEX_JSON_FILENAME)
+    BUNDLE_DIR = os.path.join(PYASTROSCHEMA, _DIR_BUNDLE, "")
 
     META_SCHEMA_FILE = os.path.join(SCHEMA_DIR, _META_SCHEMA_FILENAME)
 
@@ -78,6 +77,9 @@ def copy_schema_files(target_dir, sname=None, verbose=None):
     fnames : list of str, or str
 
     """
+    import shutil
+    from . import utils
+
     if verbose is None:
         verbose = VERBOSE
 
@@ -163,10 +165,35 @@ class KEY_FORMATS(object):  # , metaclass=MetaEnum):
     _options = [NUMERIC, ASTROTIME, STRING]
 
 
+# Lazily loaded attributes
+# --------------------------------------
+# Importing `struct` constructs all of the built-in `Struct` classes, and most modules depend on
+# `jsonschema`; so submodules are only imported when they are first accessed, e.g.
+# `pyastroschema.struct.Entry`, keeping `import pyastroschema` (e.g. for `PATHS`) cheap.
+
+_SUBMODULES = ["bundle", "cache", "columnar", "compiler", "dedup", "defaults", "keys", "lazy",
+               "schema", "streaming", "struct", "table", "utils", "validation"]
+# Attributes imported from other modules, as `name: (module, attribute)`
+_ATTRIBUTES = {
+    "SchemaDict": (".schema", "SchemaDict"),
+    "ValidationError": ("jsonschema", "ValidationError"),
+}
+
+
+def __getattr__(name):
+    import importlib
+    if name in _SUBMODULES:
+        # NOTE: importing a submodule also sets it as an attribute of this package
+        return importlib.import_module("." + name, __name__)
+
+    if name in _ATTRIBUTES:
+        module, attr = _ATTRIBUTES[name]
+        value = getattr(importlib.import_module(module, __name__), attr)
+        globals()[name] = value
+        return value
+
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
 
-from . import utils  # noqa
-from . import struct  # noqa
-from . import schema  # noqa
-from . import validation  # noqa
 
-from . schema import SchemaDict  # noqa
+def __dir__():
+    return sorted(set(globals().keys()) | set(_SUBMODULES) | set(_ATTRIBUTES.keys()))
@@ -1,11 +1,25 @@
 """Primary astroschema script for validating schema and producing additional output files.
 
+Usage:
+    $ python -m pyastroschema
+        Validate the schema files themselves, write the index file, and write bundled versions
+        of each schema (with all `$ref`s inlined, see `bundle`) to the 'bundled' directory.
+    $ python -m pyastroschema validate PATH [PATH ...] [--schema NAME] [--jobs N] [--fail-fast]
+                                                        [--format {json,ndjson}] [--output FNAME]
+        Validate catalog files (e.g. entries) against the named schema, in parallel.  `PATH`s can
+        be files, directories (searched recursively for '*.json' files), or glob patterns.
+
 To-Do:
 
 """
 import os
+import sys
 import glob
+import json
+import time
+import argparse
 import datetime
+import multiprocessing
 from collections import OrderedDict
 
 import jsonschema
@@ -13,8 +27,19 @@ import jsonschema
 from . import (PATHS, INDEX_DESCRIPTION, VERBOSE, META_KEYS)
 from . import utils
 
+# Output formats for the `validate` command
+FORMATS = ["json", "ndjson"]
+
+# Schema used by each worker process of the `validate` command, see `_init_worker`
+_WORKER_SCHEMA = None
+
 
-def main():
+def main(args=None):
+    if args is None:
+        args = sys.argv[1:]
+
+    if (len(args) > 0) and (args[0] == "validate"):
+        return main_validate(args[1:])
 
     print("Loading schema")
     files = get_schema_filenames()
@@ -32,6 +57,10 @@ def main():
     print("Writing summary to index file: '{}'".format(index_fname))
     schemas_index(schemas, files, index_fname)
 
+    bundle_dir = PATHS.BUNDLE_DIR
+    print("Writing bundled schema to: '{}'".format(bundle_dir))
+    bundle_schemas(files, bundle_dir)
+
     return
 
 
@@ -188,7 +217,8 @@ def schemas_index(schemas, file_names, index_fname):
     # Write to File
     # --------------------------
     fname_base = os.path.basename(index_fname)
-    utils.json_dump_file(index, index_fname)
+    # Keep the formatting of the (version controlled) index file unchanged
+    utils.json_dump_file(index, index_fname, identical=True)
     if VERBOSE:
         size_str = utils.get_file_size_str(index_fname)
         print("\t{}, size: {}".format(fname_base, size_str))
@@ -196,5 +226,248 @@ def schemas_index(schemas, file_names, index_fname):
     return index
 
 
+def bundle_schemas(files, bundle_dir):
+    """Write a self-contained version of each schema, with all `$ref`s resolved and inlined.
+
+    The meta-schema is skipped, as it refers to remote schemas (and is not used for data).
+
+    Returns
+    -------
+    fnames : list of str
+        Names of the bundled files written.
+
+    """
+    from pyastroschema.schema import SchemaDict
+
+    if not os.path.exists(bundle_dir):
+        os.makedirs(bundle_dir)
+
+    fnames = []
+    for fname in files:
+        if os.path.realpath(fname) == os.path.realpath(PATHS.META_SCHEMA_FILE):
+            continue
+
+        bundled = SchemaDict(fname).bundle()
+        bundle_fname = os.path.join(bundle_dir, os.path.basename(fname))
+        utils.json_dump_file(bundled, bundle_fname)
+        fnames.append(bundle_fname)
+        if VERBOSE:
+            size_str = utils.get_file_size_str(bundle_fname)
+            print("\t{}, size: {}".format(os.path.basename(bundle_fname), size_str))
+
+    return fnames
+
+
+def main_validate(args=None):
+    """Run the `validate` command: validate catalog files against a schema, in parallel.
+
+    Returns
+    -------
+    status : int
+        Exit status, `0` if all files are valid, otherwise `1`.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m pyastroschema validate",
+        description="Validate catalog files (e.g. entries) against a schema.")
+    parser.add_argument("paths", nargs="+",
+                        help="Files, directories (searched recursively) or glob patterns.")
+    parser.add_argument("-s", "--schema", default="entry",
+                        help="Name (or filename) of the schema to validate against.")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes (default: number of cpus).")
+    parser.add_argument("-x", "--fail-fast", action="store_true", default=False,
+                        help="Stop after the first invalid file.")
+    parser.add_argument("-f", "--format", dest="output_format", choices=FORMATS, default="json",
+                        help="Output format: a single JSON summary, or newline-delimited JSON "
+                        "with one line per file followed by the summary.")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Write output to this file instead of stdout.")
+    parser.add_argument("--max-errors", type=int, default=None,
+                        help="Maximum number of errors reported per file.")
+    args = parser.parse_args(args)
+
+    fnames = find_files(args.paths)
+    out = sys.stdout if (args.output is None) else open(args.output, 'w')
+    try:
+        summary = validate_files(fnames, schema=args.schema, jobs=args.jobs,
+                                 fail_fast=args.fail_fast, max_errors=args.max_errors,
+                                 out=out, output_format=args.output_format)
+    finally:
+        if args.output is not None:
+            out.close()
+
+    return 0 if (summary["invalid"] == 0) else 1
+
+
+def find_files(paths):
+    """Find the files matching the given paths, which can be files, directories or glob patterns.
+
+    Directories are searched recursively for '*.json' files.
+
+    Returns
+    -------
+    fnames : list of str
+
+    """
+    fnames = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                fnames.extend([os.path.join(root, ff) for ff in sorted(files)
+                               if ff.endswith('.json')])
+        elif os.path.isfile(path):
+            fnames.append(path)
+        else:
+            matches = sorted(glob.glob(path, recursive=True))
+            if len(matches) == 0:
+                raise ValueError("No files matching '{}'!".format(path))
+            fnames.extend([mm for mm in matches if os.path.isfile(mm)])
+
+    return fnames
+
+
+def validate_files(fnames, schema="entry", jobs=None, fail_fast=False, max_errors=None,
+                   out=None, output_format="json"):
+    """Validate each of the given files against a schema, using a pool of worker processes.
+
+    Each worker loads and compiles the schema once, and then validates files incrementally (see
+    `SchemaDict.validate_file`), so that large files do not need to be loaded into memory.
+
+    Arguments
+    ---------
+    fnames : list of str
+        Files to validate.
+    schema : str
+        Name (or filename) of the schema to validate against.
+    jobs : int or `None`
+        Number of worker processes, if `None` then the number of cpus is used.  If `1`, files are
+        validated in the current process.
+    fail_fast : bool
+        Stop after the first invalid file.
+    max_errors : int or `None`
+        Maximum number of errors reported for each file.
+    out : file-like or `None`
+        Where output is written, if `None` nothing is written.
+    output_format : str
+        'json' : a single JSON object with the summary and the results of all invalid files.
+        'ndjson' : one JSON object per line for each file (as they complete), and then summary.
+
+    Returns
+    -------
+    summary : dict
+        Number of files that are `valid` and `invalid`, timing and throughput information, and
+        a list of the `results` for invalid files.
+
+    """
+    if output_format not in FORMATS:
+        err = "`output_format` '{}' must be one of {}!".format(output_format, FORMATS)
+        raise ValueError(err)
+
+    if jobs is None:
+        jobs = multiprocessing.cpu_count()
+    jobs = max(1, min(jobs, len(fnames)))
+
+    beg = time.time()
+    summary = OrderedDict()
+    summary["type"] = "summary"
+    summary["schema"] = schema
+    summary["files"] = len(fnames)
+    summary["valid"] = 0
+    summary["invalid"] = 0
+    summary["bytes"] = 0
+    failures = []
+
+    args = [(fname, max_errors) for fname in fnames]
+    if jobs == 1:
+        _init_worker(schema)
+        pool = None
+        results = map(_validate_file, args)
+    else:
+        pool = multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(schema,))
+        # Use small chunks: the cost of each file can vary enormously
+        chunk = max(1, min(16, len(args) // (8 * jobs)))
+        results = pool.imap_unordered(_validate_file, args, chunksize=chunk)
+
+    try:
+        for res in results:
+            summary["bytes"] += res["size"]
+            if res["valid"]:
+                summary["valid"] += 1
+            else:
+                summary["invalid"] += 1
+                failures.append(res)
+
+            if (out is not None) and (output_format == "ndjson"):
+                out.write(json.dumps(res) + "\n")
+                out.flush()
+
+            if fail_fast and (not res["valid"]):
+                break
+
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    dur = time.time() - beg
+    summary["skipped"] = summary["files"] - summary["valid"] - summary["invalid"]
+    summary["jobs"] = jobs
+    summary["duration"] = dur
+    summary["files_per_sec"] = (summary["valid"] + summary["invalid"]) / dur if dur > 0 else 0.0
+    summary["bytes_per_sec"] = summary["bytes"] / dur if dur > 0 else 0.0
+    if output_format == "json":
+        summary["results"] = sorted(failures, key=lambda res: res["file"])
+
+    if out is not None:
+        if output_format == "ndjson":
+            out.write(json.dumps(summary) + "\n")
+        else:
+            json.dump(summary, out, indent=2)
+            out.write("\n")
+
+    summary["results"] = failures
+    return summary
+
+
+def _init_worker(schema):
+    """Load and compile the schema once, for all files validated in this process.
+
+    Files are validated with `SchemaDict.validate_file`, whose (compiled) streaming validator is
+    constructed here, before the first file.
+    """
+    global _WORKER_SCHEMA
+    from pyastroschema.schema import SchemaDict
+    _WORKER_SCHEMA = SchemaDict(schema, compiled=True)
+    _WORKER_SCHEMA._get_streaming_validator()
+    return
+
+
+def _validate_file(args):
+    """Validate a single file using the schema loaded by `_init_worker`, returns results dict.
+    """
+    fname, max_errors = args
+    beg = time.time()
+    res = OrderedDict()
+    res["type"] = "file"
+    res["file"] = fname
+    try:
+        res["size"] = os.path.getsize(fname)
+        errors = _WORKER_SCHEMA.validate_file(fname, max_errors=max_errors)
+        errors = [OrderedDict([("path", list(err.path)), ("message", err.message)])
+                  for err in errors]
+    except Exception as err:
+        # Files that cannot be read or parsed are reported as invalid
+        res.setdefault("size", 0)
+        errors = [OrderedDict([("path", []), ("message", "{}: {}".format(
+            type(err).__name__, str(err)))])]
+
+    res["valid"] = (len(errors) == 0)
+    res["errors"] = errors
+    res["duration"] = time.time() - beg
+    return res
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Bundle a schema, and everything it references, into a single self-contained schema.
+
+The astroschema schema files refer to each other with `$ref`s (e.g. 'entry.json' ->
+'file:defs.json#/definitions/PHOTOMETRY_LIST' -> 'file:photometry.json'), so validating against
+them requires a `jsonschema.RefResolver`, which reads files, parses URLs and changes resolution
+scopes while validating.  `bundle_schema` resolves every `$ref` once, and inlines its target, so
+that the result validates identically without any reference resolution.
+
+Under Draft4, the other keywords of a schema containing a `$ref` are ignored when validating.
+The inlined target therefore replaces all of the validation keywords, while the remaining
+(annotation) keywords alongside the `$ref` are kept, e.g. the 'description', 'unique' and
+'default' of a property (which are used by `Keychain` and `validation.PAS_Validator`).  Note that
+the 'type' and 'format' of properties are then those of their (resolved) definitions.
+
+Recursive references cannot be inlined.  The target of each of these is stored once, in the
+'definitions' of the bundled schema, and referred to with a local `$ref` (or '#' for the schema
+itself).
+
+Usage:
+    bundled = bundle_schema(schema, resolver=resolver)
+
+"""
+import copy
+from collections import OrderedDict
+
+import six
+from six.moves.urllib.parse import urldefrag
+
+import jsonschema
+
+from . import validation
+
+# Keywords which are ignored alongside a `$ref`: all of those used for validation
+_REF_IGNORED = set(validation.Validator.VALIDATORS) | set([u"$ref", u"id"])
+# Keywords containing a single subschema, a list of subschemas, or subschemas by name
+_SCHEMA_KEYWORDS = [u"additionalItems", u"additionalProperties", u"not"]
+_LIST_KEYWORDS = [u"allOf", u"anyOf", u"oneOf"]
+_DICT_KEYWORDS = [u"definitions", u"properties", u"patternProperties"]
+# Prefix for the names of recursive references stored in 'definitions'
+_DEFINITION_PREFIX = "__bundled_"
+
+
+def bundle_schema(schema, resolver=None):
+    """Construct a copy of the given schema with all `$ref`s resolved and inlined.
+
+    Arguments
+    ---------
+    schema : dict,
+        A valid JSON schema.
+    resolver : `jsonschema.RefResolver` or `None`,
+        Used to resolve `$ref`s.  If `None`, one is constructed from the schema itself.
+
+    Returns
+    -------
+    bundled : `OrderedDict`
+        Schema which does not contain any `$ref`s, except for recursive references to its own
+        'definitions'.
+
+    """
+    return _Bundler(schema, resolver)._bundle_root()
+
+
+class _Bundler(object):
+
+    def __init__(self, schema, resolver=None):
+        if resolver is None:
+            resolver = jsonschema.RefResolver.from_schema(schema)
+
+        self.schema = schema
+        self.resolver = resolver
+        # Bundled targets of each resolved `$ref` url
+        self._done = {}
+        # Url of the schema itself, and of references currently being bundled (i.e. recursion)
+        self._root = None
+        self._active = []
+        # Name of the definition for each recursive reference url, and their bundled targets
+        self._names = OrderedDict()
+        self._definitions = OrderedDict()
+
+    def _bundle_root(self):
+        bundled = self._bundle(self.schema, root=True)
+        if len(self._names) > 0:
+            # Once the recursive references are known, bundle again so that each of their
+            # targets is only included once (in 'definitions')
+            self._done = {}
+            self._definitions = OrderedDict()
+            bundled = self._bundle(self.schema, root=True)
+
+            if not isinstance(bundled.get(u"definitions"), dict):
+                bundled[u"definitions"] = {}
+            bundled[u"definitions"].update(self._definitions)
+
+        return bundled
+
+    def _bundle(self, schema, root=False):
+        """Bundle a (sub)schema, returning a new dictionary.
+        """
+        if not isinstance(schema, dict):
+            return copy.deepcopy(schema)
+
+        scope = schema.get(u"id")
+        if scope:
+            self.resolver.push_scope(scope)
+        if root:
+            self._root = _normalize(self.resolver.resolution_scope)
+
+        try:
+            ref = schema.get(u"$ref")
+            if ref is not None:
+                bundled = self._bundle_ref(ref)
+                # A 'default' is only used from the referring schema (see `PAS_Validator`)
+                bundled.pop(u"default", None)
+                # Keep annotations (overriding those of the target), but not validation keywords
+                for kw, val in six.iteritems(schema):
+                    if kw not in _REF_IGNORED:
+                        bundled[kw] = self._bundle_keyword(kw, val)
+                return bundled
+
+            # Use plain `dict`s for subschemas, which are faster to validate with (as are the
+            # resolved documents, see `cache`)
+            bundled = OrderedDict() if root else {}
+            for kw, val in six.iteritems(schema):
+                # Resolution scopes are not needed once all `$ref`s are inlined
+                if (kw == u"id") and (not root):
+                    continue
+                bundled[kw] = self._bundle_keyword(kw, val)
+
+        finally:
+            if scope:
+                self.resolver.pop_scope()
+
+        return bundled
+
+    def _bundle_keyword(self, kw, val):
+        if kw in _SCHEMA_KEYWORDS:
+            return self._bundle(val)
+        if (kw in _LIST_KEYWORDS) and isinstance(val, list):
+            return [self._bundle(sub) for sub in val]
+        if (kw in _DICT_KEYWORDS) and isinstance(val, dict):
+            return dict((name, self._bundle(sub)) for name, sub in six.iteritems(val))
+        if kw == u"items":
+            if isinstance(val, list):
+                return [self._bundle(sub) for sub in val]
+            return self._bundle(val)
+        if (kw == u"dependencies") and isinstance(val, dict):
+            # Dependencies are either subschemas, or lists of property names
+            return dict((name, self._bundle(sub)) for name, sub in six.iteritems(val))
+
+        return copy.deepcopy(val)
+
+    def _bundle_ref(self, ref):
+        url, resolved = self.resolver.resolve(ref)
+        url = _normalize(url)
+        if url == self._root:
+            return {u"$ref": u"#"}
+
+        name = self._names.get(url)
+        if (name is None) and (url in self._active):
+            # Recursive reference, found while bundling its own target
+            name = "{}{}".format(_DEFINITION_PREFIX, len(self._names))
+            self._names[url] = name
+
+        if name is not None:
+            # Refer to the definition containing the target, constructing it if needed
+            if name not in self._definitions:
+                self._definitions[name] = None
+                self._definitions[name] = self._bundle_target(url, resolved)
+            return {u"$ref": u"#/definitions/" + name}
+
+        bundled = self._done.get(url)
+        if bundled is None:
+            bundled = self._bundle_target(url, resolved)
+            self._done[url] = bundled
+
+        return copy.deepcopy(bundled)
+
+    def _bundle_target(self, url, resolved):
+        self._active.append(url)
+        self.resolver.push_scope(url)
+        try:
+            return self._bundle(resolved)
+        finally:
+            self.resolver.pop_scope()
+            self._active.pop()
+
+
+def _normalize(url):
+    """Normalize a url, e.g. '#' and '' both refer to the root of the same document.
+    """
+    return u"#".join(urldefrag(url))
@@ -0,0 +1,180 @@
+"""Persistent, on-disk cache of the schemas and keychains of `Struct` classes.
+
+Constructing each `Struct` class (see `struct.set_struct_schema`) loads its schema files,
+validates them against the meta-schema, and constructs and validates a `Key` for every property.
+This is done for all of the built-in classes whenever `pyastroschema.struct` is imported.  The
+results are instead stored in a single pickle file, which is reused by later processes, along
+with the contents of all schema files (used to resolve `$ref`s without reading each file).
+
+The cache file is named by a hash of the package version and the modification time and size of
+every schema file (which only requires `stat`ing them), so that it is not used after any of them
+change.  Only classes constructed from the package's own schemas (by name, or filename) are
+cached.  Its location is `CACHE_DIR`, which can be set with the environment variable
+`PYASTROSCHEMA_CACHE_DIR`; setting `PYASTROSCHEMA_CACHE=0` (or `ENABLED = False`) disables the
+cache.  Unpickling can execute code, so cache files are only loaded if they are owned by the
+current user, and are not writable by anyone else.
+
+"""
+import os
+import sys
+import glob
+import json
+import stat
+import pickle
+import hashlib
+import tempfile
+import threading
+
+from . import PATHS, __version__
+
+# Whether cached `Struct` schemas and keychains are used (and stored)
+ENABLED = (os.environ.get("PYASTROSCHEMA_CACHE", "1").lower() not in ["0", "false", "no"])
+# Directory containing cache files
+CACHE_DIR = os.environ.get("PYASTROSCHEMA_CACHE_DIR", os.path.join(
+    os.path.expanduser("~"), ".cache", "pyastroschema"))
+
+
+class SchemaCache(object):
+    """Cache of data stored in a single file, named by a hash of all schema files.
+    """
+
+    def __init__(self, cache_dir=None):
+        self._cache_dir = cache_dir
+        self._data = None
+        self._fname = None
+        self._lock = threading.Lock()
+        return
+
+    @property
+    def filename(self):
+        if self._fname is None:
+            cache_dir = CACHE_DIR if (self._cache_dir is None) else self._cache_dir
+            self._fname = os.path.join(cache_dir, "structs-{}.pickle".format(_schema_hash()))
+        return self._fname
+
+    def get(self, key):
+        """Get the cached value for the given key, or `None` if there is none.
+        """
+        return self._load().get(key)
+
+    def set(self, key, value):
+        """Store the given value, and write the cache file.
+
+        Failures to write (e.g. to a read-only directory) are ignored.
+
+        """
+        with self._lock:
+            data = self._load()
+            data[key] = value
+            try:
+                _write_atomic(self.filename, data)
+            except (IOError, OSError):
+                pass
+        return
+
+    def documents(self):
+        """Get the contents of all schema files, by URL, for resolving `$ref`s.
+        """
+        docs = self.get("documents")
+        if docs is None:
+            docs = _load_documents()
+            self.set("documents", docs)
+        return docs
+
+    def _load(self):
+        if self._data is None:
+            data = {}
+            try:
+                with open(self.filename, 'rb') as inp:
+                    if _trusted(os.fstat(inp.fileno())):
+                        data = pickle.load(inp)
+            except Exception:
+                # Missing, or unreadable cache: start from scratch
+                pass
+            self._data = data
+
+        return self._data
+
+
+CACHE = SchemaCache()
+
+
+def _schema_hash():
+    """Hash of the package version, python version and the metadata of all schema files.
+
+    The modification time and size of each file are used, instead of their contents, so that
+    files are not read when the cache is valid.
+    """
+    sha = hashlib.sha1()
+    sha.update("{} {}".format(__version__, sys.version_info[:2]).encode('utf-8'))
+    for fname in _schema_files() + [PATHS.INDEX_JSON_FILE]:
+        info = os.stat(fname)
+        sha.update("{} {} {}".format(os.path.relpath(fname, PATHS.PYASTROSCHEMA),
+                                     info.st_mtime_ns, info.st_size).encode('utf-8'))
+
+    return sha.hexdigest()
+
+
+def _trusted(info):
+    """Whether a file (given by its `os.stat` result) can be trusted: owned by the current user,
+    and not writable by others.
+    """
+    # NOTE: ownership and permissions are not checked on systems without them (e.g. Windows)
+    if not hasattr(os, "getuid"):
+        return True
+    if info.st_uid != os.getuid():
+        return False
+    return not (info.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _builtin_source(source):
+    """Normalize the name (or filename) of one of the package's own schema files.
+
+    Returns `None` for any other source (e.g. a user's schema file), whose contents are not
+    included in `_schema_hash`, so that it is never cached.
+    """
+    if not isinstance(source, str):
+        return None
+    if not os.path.exists(source):
+        # Name of a schema in the index
+        return source
+
+    fname = os.path.realpath(source)
+    schema_dir = os.path.realpath(PATHS.SCHEMA_DIR)
+    if os.path.commonpath([fname, schema_dir]) != schema_dir:
+        return None
+    return os.path.relpath(fname, schema_dir)
+
+
+def _schema_files():
+    pattern = os.path.join(PATHS.SCHEMA_DIR, "**", "*.json")
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def _load_documents():
+    docs = {}
+    for fname in _schema_files():
+        with open(fname, 'r') as inp:
+            docs["file://" + os.path.abspath(fname)] = json.load(inp)
+    return docs
+
+
+def _write_atomic(fname, data):
+    """Write data to a temporary file, and then move it into place.
+    """
+    path = os.path.dirname(fname)
+    if not os.path.exists(path):
+        os.makedirs(path, mode=0o700)
+
+    # NOTE: temporary files are only readable and writable by the current user
+    fd, temp = tempfile.mkstemp(dir=path, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            pickle.dump(data, out, protocol=pickle.HIGHEST_PROTOCOL)
+        # NOTE: unlike `os.rename`, this also overwrites existing files atomically on Windows
+        os.replace(temp, fname)
+    except Exception:
+        os.remove(temp)
+        raise
+
+    return
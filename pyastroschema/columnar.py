@@ -0,0 +1,460 @@
+"""Vectorized validation of columnar (table-like) data using `numpy`.
+
+Data such as photometry is naturally stored as a table: one column per schema property, and one
+row per `Photometry` instance.  The `ColumnarValidator` validates all rows of such a table at
+once, using vectorized `numpy` operations for each column (types, formats, length and
+value-range constraints), and boolean-mask logic for the object-level constraints ('required',
+'dependencies', 'anyOf', etc).  The result is a boolean mask of invalid rows, which matches the
+result of validating each row individually with `SchemaDict.validate`.
+
+Columns are given as a `dict` of 1D `numpy` arrays (or as a structured array).  A value is
+considered to be *absent* from a row if it is masked (in a `numpy.ma.MaskedArray`) or if it is
+`None` (in an object array).  Schema constructs which cannot be vectorized are handled by
+falling back to the compiled validator for the affected column (or rows).
+
+NOTE: unlike the standard validators, default values are *not* set when validating columns.
+
+`numpy` is an optional dependency of `pyastroschema`, and is required only for this module.
+
+"""
+import six
+import numpy as np
+
+from . import KEY_FORMATS
+from . import compiler, validation
+
+# Column keywords which are handled with vectorized operations
+_COLUMN_KEYWORDS = ["type", "format", "minLength", "maxLength", "minimum", "maximum",
+                    "enum", "anyOf", "allOf", "not"]
+# Keywords which only apply to arrays and objects, and thus have no effect on columns of scalars
+_SCALAR_NOOP_KEYWORDS = ["items", "additionalItems", "minItems", "maxItems", "uniqueItems",
+                         "properties", "patternProperties", "additionalProperties", "required",
+                         "dependencies", "minProperties", "maxProperties"]
+# Object keywords which are handled with mask logic
+_OBJECT_KEYWORDS = ["type", "required", "properties", "dependencies",
+                    "anyOf", "allOf", "oneOf", "not"]
+# Formats which are always satisfied by numerical values
+_NUMERIC_FORMATS = [KEY_FORMATS.NUMERIC, KEY_FORMATS.ASTROTIME]
+# Array 'kind's corresponding to JSON types, when converted to python values
+_KIND_TYPES = {
+    'b': ["boolean"],
+    'i': ["integer", "number"],
+    'u': ["integer", "number"],
+    'f': ["number"],
+    'U': ["string"],
+}
+
+
+class ColumnarValidator(object):
+    """Validate tables of instances, stored as columns, against a schema.
+    """
+
+    def __init__(self, schema, resolver=None, format_checker=None):
+        """Construct the validator for the given `schema`.
+
+        Arguments
+        ---------
+        schema : dict,
+            A valid JSON schema for a single row (e.g. a single photometric point).
+        resolver : `jsonschema.RefResolver` or `None`,
+            Used to resolve `$ref`s.
+        format_checker : `jsonschema.FormatChecker` or `None`,
+
+        """
+        # The compiler is used for ref-resolution, and for any checks that can't be vectorized
+        self._compiler = compiler.CompiledValidator(
+            schema, resolver=resolver, format_checker=format_checker)
+        self.schema = schema
+        self._check = self._build_object(schema)
+        return
+
+    def validate(self, columns):
+        """Validate each row of the given columns.
+
+        Arguments
+        ---------
+        columns : dict of array_like, or structured `numpy.ndarray`
+
+        Returns
+        -------
+        bad : (N,) bool `numpy.ndarray`
+            Mask which is `True` for each invalid row.
+
+        """
+        table = _Table(columns)
+        return self._check(table)
+
+    def is_valid(self, columns):
+        return not np.any(self.validate(columns))
+
+    def check_array(self, name, values):
+        """Check each element of an array against the schema of the property `name`.
+
+        Returns
+        -------
+        bad : (N,) bool `numpy.ndarray`
+
+        """
+        subschema = self.schema["properties"][name]
+        table = _Table({name: values})
+        present, vals = table.column(name)
+        return _scatter(present, self._build_column(subschema)(vals))
+
+    # ==== Object-level (row) checks ====
+
+    def _scoped(self, schema, build):
+        """Call `build(schema)` within the resolution scope of `schema`, following `$ref`s.
+        """
+        resolver = self._compiler.resolver
+        scope = schema.get(u"id")
+        if scope:
+            resolver.push_scope(scope)
+        try:
+            ref = schema.get(u"$ref")
+            if ref is None:
+                return build(schema)
+
+            url, resolved = resolver.resolve(ref)
+            resolver.push_scope(url)
+            try:
+                return self._scoped(resolved, build)
+            finally:
+                resolver.pop_scope()
+        finally:
+            if scope:
+                resolver.pop_scope()
+
+    def _build_object(self, schema):
+        return self._scoped(schema, self._build_object_resolved)
+
+    def _build_object_resolved(self, schema):
+        if any((kw in compiler._KEYWORDS) and (kw not in _OBJECT_KEYWORDS) for kw in schema):
+            return self._build_fallback_rows(schema)
+
+        checks = []
+        for kw, val in schema.items():
+            if kw == "type":
+                types = [val] if isinstance(val, six.string_types) else val
+                if "object" not in types:
+                    checks.append(_all_bad)
+
+            elif kw == "required":
+                checks.append(_required_check(val))
+
+            elif kw == "properties":
+                props = [(name, self._build_column(sub)) for name, sub in val.items()]
+                checks.append(_properties_check(props))
+
+            elif kw == "dependencies":
+                deps = []
+                for prop, dep in val.items():
+                    if isinstance(dep, dict):
+                        deps.append((prop, self._build_object(dep), None))
+                    else:
+                        dep = [dep] if isinstance(dep, six.string_types) else dep
+                        deps.append((prop, None, _required_check(dep)))
+                checks.append(_dependencies_check(deps))
+
+            elif kw in ["anyOf", "allOf", "oneOf"]:
+                subs = [self._build_object(sub) for sub in val]
+                checks.append(_combination_check(kw, subs))
+
+            elif kw == "not":
+                sub = self._build_object(val)
+                checks.append(lambda table: ~sub(table))
+
+        def check(table):
+            bad = np.zeros(table.size, dtype=bool)
+            for func in checks:
+                bad |= func(table)
+            return bad
+
+        return check
+
+    def _build_fallback_rows(self, schema):
+        """Validate complete rows with the compiled validator.
+        """
+        func = self._compiler._compile(schema)
+
+        def check(table):
+            return np.array([func(row) is not None for row in table.rows()], dtype=bool)
+
+        return check
+
+    # ==== Column checks ====
+    #    These functions take an array of (present) values, and return a mask of bad values
+
+    def _build_column(self, schema):
+        return self._scoped(schema, self._build_column_resolved)
+
+    def _build_column_resolved(self, schema):
+        fallback = self._compiler._compile(schema)
+        supported = _COLUMN_KEYWORDS + _SCALAR_NOOP_KEYWORDS
+        if any((kw in compiler._KEYWORDS) and (kw not in supported) for kw in schema):
+            return _fallback_column(fallback)
+
+        format_checker = self._compiler.format_checker
+        checks = []
+        for kw, val in schema.items():
+            if kw == "type":
+                checks.append(_type_column(val))
+            elif kw == "format":
+                if (format_checker is not None) and (val in format_checker.checkers):
+                    func, raises = format_checker.checkers[val]
+                    checks.append(_format_column(val, func, raises))
+            elif kw in ["minLength", "maxLength"]:
+                checks.append(_length_column(kw, val))
+            elif kw in ["minimum", "maximum"]:
+                checks.append(_range_column(kw, val, schema))
+            elif kw == "enum":
+                checks.append(_enum_column(val))
+            elif kw in ["anyOf", "allOf"]:
+                subs = [self._build_column(sub) for sub in val]
+                checks.append(_combination_check(kw, subs))
+            elif kw == "not":
+                sub = self._build_column(val)
+                checks.append(lambda values, sub=sub: ~sub(values))
+
+        def check(values):
+            # Arrays of non-JSON types, and multidimensional arrays, are checked element-wise
+            if (values.ndim != 1) or (values.dtype.kind not in _KIND_TYPES):
+                return _fallback_column(fallback)(values)
+
+            bad = np.zeros(values.size, dtype=bool)
+            for func in checks:
+                bad |= func(values)
+            return bad
+
+        return check
+
+
+def validate_columns(schema, columns, **kwargs):
+    """Validate `columns` against the given `schema`, see `ColumnarValidator.validate`.
+    """
+    return ColumnarValidator(schema, **kwargs).validate(columns)
+
+
+class _Table(object):
+    """Wrapper around a set of columns, tracking which values are present in each row.
+    """
+
+    def __init__(self, columns):
+        if isinstance(columns, np.ndarray) and (columns.dtype.names is not None):
+            columns = dict((name, columns[name]) for name in columns.dtype.names)
+
+        self._columns = {}
+        size = None
+        for name, values in columns.items():
+            if isinstance(values, np.ma.MaskedArray):
+                present = ~np.ma.getmaskarray(values)
+                values = values.data
+            else:
+                values = np.asarray(values)
+                if values.dtype.kind == 'O':
+                    present = np.array([vv is not None for vv in values], dtype=bool)
+                else:
+                    present = np.ones(len(values), dtype=bool)
+
+            if size is None:
+                size = len(values)
+            elif len(values) != size:
+                err = "Column '{}' length {} does not match others ({})!".format(
+                    name, len(values), size)
+                raise ValueError(err)
+
+            self._columns[name] = (present, values)
+
+        self.size = 0 if (size is None) else size
+        self._rows = None
+        return
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def column(self, name):
+        return self._columns[name]
+
+    def present(self, name):
+        if name not in self._columns:
+            return np.zeros(self.size, dtype=bool)
+        return self._columns[name][0]
+
+    def rows(self):
+        """Materialize each row as a `dict`, only used for non-vectorizable checks.
+        """
+        if self._rows is None:
+            rows = [{} for ii in range(self.size)]
+            for name, (present, values) in self._columns.items():
+                for ii, (pres, val) in enumerate(zip(present, values.tolist())):
+                    if pres:
+                        rows[ii][name] = val
+            self._rows = rows
+
+        return self._rows
+
+
+# ==== Helper functions ====
+
+
+def _scatter(present, bad_present):
+    """Expand a mask of bad *present* values to a mask over all rows.
+    """
+    bad = np.zeros(present.size, dtype=bool)
+    bad[present] = bad_present
+    return bad
+
+
+def _all_bad(data):
+    size = data.size if isinstance(data, (_Table, np.ndarray)) else len(data)
+    return np.ones(size, dtype=bool)
+
+
+def _required_check(required):
+    def check(table):
+        bad = np.zeros(table.size, dtype=bool)
+        for prop in required:
+            bad |= ~table.present(prop)
+        return bad
+
+    return check
+
+
+def _properties_check(props):
+    def check(table):
+        bad = np.zeros(table.size, dtype=bool)
+        for name, func in props:
+            if name not in table:
+                continue
+            present, values = table.column(name)
+            bad |= _scatter(present, func(values[present]))
+        return bad
+
+    return check
+
+
+def _dependencies_check(deps):
+    def check(table):
+        bad = np.zeros(table.size, dtype=bool)
+        for prop, func, required in deps:
+            dependent = table.present(prop)
+            if func is not None:
+                bad |= dependent & func(table)
+            else:
+                bad |= dependent & required(table)
+        return bad
+
+    return check
+
+
+def _combination_check(kw, subs):
+    def check(data):
+        bads = [func(data) for func in subs]
+        if len(bads) == 0:
+            return np.zeros(_all_bad(data).size, dtype=bool)
+        if kw == "anyOf":
+            return np.logical_and.reduce(bads)
+        if kw == "allOf":
+            return np.logical_or.reduce(bads)
+        # 'oneOf': exactly one subschema must be satisfied
+        num_good = np.sum([~bb for bb in bads], axis=0)
+        return (num_good != 1)
+
+    return check
+
+
+def _fallback_column(func):
+    def check(values):
+        return np.array([func(vv) is not None for vv in values.tolist()], dtype=bool)
+
+    return check
+
+
+def _type_column(types):
+    types = [types] if isinstance(types, six.string_types) else types
+
+    def check(values):
+        kind_types = _KIND_TYPES[values.dtype.kind]
+        if any(tt in types for tt in kind_types):
+            return np.zeros(values.size, dtype=bool)
+        return np.ones(values.size, dtype=bool)
+
+    return check
+
+
+def _format_column(format, func, raises):
+    # Use the batch form of the astroschema format checkers, see `validation.check_many`
+    batch = (validation.FORMAT_FUNCTIONS.get(format) is func)
+
+    def check_element(value):
+        try:
+            return not func(value)
+        except raises:
+            return True
+
+    def check(values):
+        kind = values.dtype.kind
+        if kind in 'iuf' and (format in _NUMERIC_FORMATS):
+            return np.zeros(values.size, dtype=bool)
+
+        # Fast-path for strings which are all convertible to numbers
+        if (kind == 'U') and (format in _NUMERIC_FORMATS):
+            try:
+                values.astype(float)
+            except ValueError:
+                pass
+            else:
+                # Values containing spaces are not 'numeric', but may still be valid
+                spaces = (np.char.find(values, ' ') >= 0)
+                bad = np.zeros(values.size, dtype=bool)
+                if np.any(spaces):
+                    bad[spaces] = check_unique(values[spaces])
+                return bad
+
+        return check_unique(values)
+
+    def check_unique(values):
+        # Check each unique value once
+        uniq, inv = np.unique(values, return_inverse=True)
+        if batch:
+            bad = ~np.array(validation.check_many(format, uniq.tolist()), dtype=bool)
+        else:
+            bad = np.array([check_element(vv) for vv in uniq.tolist()], dtype=bool)
+        return bad[inv.reshape(-1)]
+
+    return check
+
+
+def _length_column(kw, length):
+    def check(values):
+        if values.dtype.kind != 'U':
+            return np.zeros(values.size, dtype=bool)
+
+        lens = np.char.str_len(values)
+        if kw == "minLength":
+            return (lens < length)
+        return (lens > length)
+
+    return check
+
+
+def _range_column(kw, limit, schema):
+    exclusive = schema.get("exclusiveMinimum" if kw == "minimum" else "exclusiveMaximum", False)
+
+    def check(values):
+        # Only numbers (not booleans) are checked
+        if values.dtype.kind not in 'iuf':
+            return np.zeros(values.size, dtype=bool)
+
+        if kw == "minimum":
+            return (values <= limit) if exclusive else (values < limit)
+        return (values >= limit) if exclusive else (values > limit)
+
+    return check
+
+
+def _enum_column(enums):
+    def check(values):
+        # `bool` and numerical values compare equal in python, as in the standard validators
+        return np.array([vv not in enums for vv in values.tolist()], dtype=bool)
+
+    return check
@@ -0,0 +1,766 @@
+"""Compile JSON schema into specialized python callables for fast, repeated validation.
+
+The standard `jsonschema` validators walk the schema dictionary, dispatch on keyword names and
+resolve `$ref`s for every instance that is validated.  The `CompiledValidator` does all of this
+work once, when it is constructed, producing a tree of closures that only has to be executed for
+each instance.  The results (pass/fail, and the first error reported including its `path` and
+`schema_path`) are the same as for `validation.PAS_Validator`, i.e. Draft4 semantics with the
+astroschema format checkers and default-setting behavior.
+
+Usage:
+    validator = CompiledValidator(schema, resolver=resolver)
+    validator.validate(instance)
+
+"""
+import re
+import numbers
+import threading
+from collections import OrderedDict
+
+import six
+
+import jsonschema
+from jsonschema import _utils
+from jsonschema.exceptions import ValidationError
+
+from . import validation
+
+# Lock guarding the (lazy) decomposition of compiled validators, which uses their resolver
+_LOCK = threading.Lock()
+
+
+class CompiledValidator(object):
+    """Validator that compiles a schema (including all `$ref`s) into a single python callable.
+    """
+
+    def __init__(self, schema, resolver=None, format_checker=None, set_defaults=True):
+        """Compile the given `schema`.
+
+        Arguments
+        ---------
+        schema : dict,
+            A valid JSON schema.
+        resolver : `jsonschema.RefResolver` or `None`,
+            Used to resolve `$ref`s *while compiling*.  If `None`, one is constructed from the
+            schema itself.
+        format_checker : `jsonschema.FormatChecker` or `None`,
+            Format checker used for the 'format' keyword.  If `None`, the astroschema
+            `validation.format_checker` is used.
+        set_defaults : bool,
+            Whether the 'default' values of missing properties are set in validated instances,
+            as by `validation.PAS_Validator`.  If `False`, instances are never modified (see
+            `defaults.DefaultsPlan` to set them separately).
+
+        """
+        if resolver is None:
+            resolver = jsonschema.RefResolver.from_schema(schema)
+        if format_checker is None:
+            format_checker = validation.format_checker
+
+        self.schema = schema
+        self.resolver = resolver
+        self.format_checker = format_checker
+        self.set_defaults = set_defaults
+
+        # Compiled functions for each resolved `$ref` url
+        self._refs = {}
+        self._check = self._compile(schema)
+        # Per-property decomposition of the schema, constructed as needed
+        self._decomposition = None
+        return
+
+    def check(self, instance):
+        """Return the first `ValidationError` for the given instance, or `None` if it is valid.
+        """
+        return self._check(instance)
+
+    def iter_errors(self, instance):
+        error = self._check(instance)
+        if error is not None:
+            yield error
+        return
+
+    def is_valid(self, instance):
+        return (self._check(instance) is None)
+
+    def validate(self, instance):
+        error = self._check(instance)
+        if error is not None:
+            raise error
+        return
+
+    def decompose(self):
+        """Split an object schema into separate validators for each property, and the remainder.
+
+        Allows individual properties of an instance to be re-validated independently (e.g. after
+        they have been modified), see `struct.Struct.validate`.
+
+        Returns
+        -------
+        decomp : tuple or `None`
+            `(check_object, check_props, defaults)`: a function validating everything except
+            the 'properties' keyword, a dict of functions validating the value of each named
+            property, and a dict of the default value for properties which have them.
+            `None` is returned if the schema cannot be decomposed, e.g. if it is a `$ref`, or
+            the validity of some properties depends on the others ('additionalProperties').
+
+        """
+        if self._decomposition is None:
+            with _LOCK:
+                if self._decomposition is None:
+                    self._decomposition = self._decompose()
+
+        return self._decomposition or None
+
+    # ==== Compilation ====
+
+    def _decompose(self):
+        schema = self.schema
+        properties = schema.get(u"properties")
+        if (u"$ref" in schema) or (not isinstance(properties, dict)):
+            return False
+        if any(kw in schema for kw in _NOT_DECOMPOSABLE):
+            return False
+
+        rest = OrderedDict((kw, val) for kw, val in six.iteritems(schema) if kw != u"properties")
+        check_object = self._compile(rest)
+
+        scope = schema.get(u"id")
+        if scope:
+            self.resolver.push_scope(scope)
+
+        try:
+            check_props = dict((name, self._compile(sub))
+                               for name, sub in six.iteritems(properties))
+        finally:
+            if scope:
+                self.resolver.pop_scope()
+
+        defaults = dict((name, sub["default"]) for name, sub in six.iteritems(properties)
+                        if "default" in sub)
+        return check_object, check_props, defaults
+
+    def _compile(self, schema):
+        """Compile a (sub)schema into a function returning a `ValidationError` or `None`.
+        """
+        scope = schema.get(u"id")
+        if scope:
+            self.resolver.push_scope(scope)
+
+        try:
+            ref = schema.get(u"$ref")
+            # Errors are passed through a `$ref` without modification, so use the target directly
+            if ref is not None:
+                return self._compile_ref(ref)
+
+            checks = []
+            for kw, val in six.iteritems(schema):
+                builder = _KEYWORDS.get(kw)
+                if builder is None:
+                    continue
+                func = builder(self, val, schema)
+                if func is not None:
+                    checks.append((kw, val, func))
+
+        finally:
+            if scope:
+                self.resolver.pop_scope()
+
+        return _combine(checks, schema)
+
+    def _compile_ref(self, ref):
+        url, resolved = self.resolver.resolve(ref)
+        cell = self._refs.get(url)
+        if cell is not None:
+            # Compilation of this reference is complete, use it directly
+            if cell[0] is not None:
+                return cell[0]
+
+            # Reference is still being compiled (i.e. it is recursive); defer lookup
+            def recursive_ref(instance):
+                return cell[0](instance)
+
+            return recursive_ref
+
+        cell = [None]
+        self._refs[url] = cell
+        self.resolver.push_scope(url)
+        try:
+            cell[0] = self._compile(resolved)
+        finally:
+            self.resolver.pop_scope()
+
+        return cell[0]
+
+
+def compile_schema(schema, **kwargs):
+    """Construct a `CompiledValidator` for the given `schema`.
+    """
+    return CompiledValidator(schema, **kwargs)
+
+
+# ==== Helper functions ====
+
+
+def _valid(instance):
+    return None
+
+
+def _combine(checks, schema):
+    """Combine the checks for each keyword of a schema into a single function.
+    """
+    if len(checks) == 0:
+        return _valid
+
+    meta = dict((func, (kw, val)) for kw, val, func in checks)
+    funcs = tuple(func for kw, val, func in checks)
+
+    def finish(error, func, instance):
+        kw, val = meta[func]
+        error._set(validator=kw, validator_value=val, instance=instance, schema=schema)
+        error.schema_path.appendleft(kw)
+        return error
+
+    if len(funcs) == 1:
+        only = funcs[0]
+
+        def check_one(instance):
+            error = only(instance)
+            if error is not None:
+                return finish(error, only, instance)
+            return None
+
+        return check_one
+
+    def check_all(instance):
+        for func in funcs:
+            error = func(instance)
+            if error is not None:
+                return finish(error, func, instance)
+        return None
+
+    return check_all
+
+
+def _is_object(instance):
+    return isinstance(instance, dict)
+
+
+def _is_array(instance):
+    return isinstance(instance, list)
+
+
+def _is_string(instance):
+    return isinstance(instance, six.string_types)
+
+
+def _is_number(instance):
+    return isinstance(instance, numbers.Number) and not isinstance(instance, bool)
+
+
+_PY_TYPES = {
+    u"array": (list,),
+    u"boolean": (bool,),
+    u"integer": six.integer_types,
+    u"null": (type(None),),
+    u"number": (numbers.Number,),
+    u"object": (dict,),
+    u"string": six.string_types,
+}
+
+
+# ==== Keyword compilers ====
+#    Each takes `(compiler, value, schema)`, and returns a function `func(instance)` which
+#    returns either `None` or a `ValidationError`; or, returns `None` if no check is needed.
+
+
+def _type(comp, types, schema):
+    types = _utils.ensure_list(types)
+    pytypes = []
+    for tt in types:
+        if tt not in _PY_TYPES:
+            raise jsonschema.exceptions.UnknownType(tt, None, schema)
+        pytypes.extend(_PY_TYPES[tt])
+
+    pytypes = tuple(pytypes)
+    allow_bool = (u"boolean" in types)
+
+    def check(instance):
+        if isinstance(instance, bool):
+            if allow_bool:
+                return None
+        elif isinstance(instance, pytypes):
+            return None
+
+        return ValidationError(_utils.types_msg(instance, types))
+
+    return check
+
+
+def _format(comp, format, schema):
+    checker = comp.format_checker
+    if (checker is None) or (format not in checker.checkers):
+        return None
+
+    func, raises = checker.checkers[format]
+
+    def check(instance):
+        cause = None
+        try:
+            result = func(instance)
+        except raises as err:
+            result = False
+            cause = err
+
+        if not result:
+            return ValidationError("%r is not a %r" % (instance, format), cause=cause)
+        return None
+
+    return check
+
+
+def _properties(comp, properties, schema):
+    # Default values are set on validated instances, as in `validation._extend_with_default`
+    defaults = [(name, sub["default"]) for name, sub in six.iteritems(properties)
+                if "default" in sub] if comp.set_defaults else []
+    props = [(name, comp._compile(sub)) for name, sub in six.iteritems(properties)]
+
+    def check(instance):
+        if not isinstance(instance, dict):
+            return None
+
+        for name, value in defaults:
+            instance.setdefault(name, value)
+
+        for name, func in props:
+            if name in instance:
+                error = func(instance[name])
+                if error is not None:
+                    error.path.appendleft(name)
+                    error.schema_path.appendleft(name)
+                    return error
+
+        return None
+
+    return check
+
+
+def _pattern_properties(comp, patternProperties, schema):
+    patterns = [(pat, comp._compile(sub)) for pat, sub in six.iteritems(patternProperties)]
+
+    def check(instance):
+        if not isinstance(instance, dict):
+            return None
+
+        for pat, func in patterns:
+            for kk, vv in six.iteritems(instance):
+                if re.search(pat, kk):
+                    error = func(vv)
+                    if error is not None:
+                        error.path.appendleft(kk)
+                        error.schema_path.appendleft(pat)
+                        return error
+
+        return None
+
+    return check
+
+
+def _additional_properties(comp, aP, schema):
+    if isinstance(aP, dict):
+        func = comp._compile(aP)
+
+        def check(instance):
+            if not isinstance(instance, dict):
+                return None
+
+            extras = set(_utils.find_additional_properties(instance, schema))
+            for extra in extras:
+                error = func(instance[extra])
+                if error is not None:
+                    error.path.appendleft(extra)
+                    return error
+
+            return None
+
+        return check
+
+    if aP:
+        return None
+
+    def check_none(instance):
+        if not isinstance(instance, dict):
+            return None
+
+        extras = set(_utils.find_additional_properties(instance, schema))
+        if not extras:
+            return None
+
+        if "patternProperties" in schema:
+            patterns = sorted(schema["patternProperties"])
+            verb = "does" if len(extras) == 1 else "do"
+            error = "%s %s not match any of the regexes: %s" % (
+                ", ".join(map(repr, sorted(extras))), verb, ", ".join(map(repr, patterns)))
+            return ValidationError(error)
+
+        error = "Additional properties are not allowed (%s %s unexpected)"
+        return ValidationError(error % _utils.extras_msg(extras))
+
+    return check_none
+
+
+def _items(comp, items, schema):
+    if isinstance(items, dict):
+        func = comp._compile(items)
+
+        def check(instance):
+            if not isinstance(instance, list):
+                return None
+
+            for index, item in enumerate(instance):
+                error = func(item)
+                if error is not None:
+                    error.path.appendleft(index)
+                    return error
+
+            return None
+
+        return check
+
+    funcs = [comp._compile(sub) for sub in items]
+
+    def check_tuple(instance):
+        if not isinstance(instance, list):
+            return None
+
+        for index, (item, func) in enumerate(zip(instance, funcs)):
+            error = func(item)
+            if error is not None:
+                error.path.appendleft(index)
+                error.schema_path.appendleft(index)
+                return error
+
+        return None
+
+    return check_tuple
+
+
+def _additional_items(comp, aI, schema):
+    if isinstance(schema.get("items", {}), dict):
+        return None
+
+    len_items = len(schema.get("items", []))
+    if isinstance(aI, dict):
+        func = comp._compile(aI)
+
+        def check(instance):
+            if not isinstance(instance, list):
+                return None
+
+            for index, item in enumerate(instance[len_items:], start=len_items):
+                error = func(item)
+                if error is not None:
+                    error.path.appendleft(index)
+                    return error
+
+            return None
+
+        return check
+
+    if aI:
+        return None
+
+    def check_none(instance):
+        if isinstance(instance, list) and len(instance) > len_items:
+            error = "Additional items are not allowed (%s %s unexpected)"
+            return ValidationError(error % _utils.extras_msg(instance[len_items:]))
+        return None
+
+    return check_none
+
+
+def _minimum(comp, minimum, schema):
+    exclusive = schema.get("exclusiveMinimum", False)
+    cmp = "less than or equal to" if exclusive else "less than"
+
+    def check(instance):
+        if not _is_number(instance):
+            return None
+
+        failed = (instance <= minimum) if exclusive else (instance < minimum)
+        if failed:
+            return ValidationError("%r is %s the minimum of %r" % (instance, cmp, minimum))
+        return None
+
+    return check
+
+
+def _maximum(comp, maximum, schema):
+    exclusive = schema.get("exclusiveMaximum", False)
+    cmp = "greater than or equal to" if exclusive else "greater than"
+
+    def check(instance):
+        if not _is_number(instance):
+            return None
+
+        failed = (instance >= maximum) if exclusive else (instance > maximum)
+        if failed:
+            return ValidationError("%r is %s the maximum of %r" % (instance, cmp, maximum))
+        return None
+
+    return check
+
+
+def _multiple_of(comp, dB, schema):
+    def check(instance):
+        if not _is_number(instance):
+            return None
+
+        if isinstance(dB, float):
+            quotient = instance / dB
+            failed = int(quotient) != quotient
+        else:
+            failed = instance % dB
+
+        if failed:
+            return ValidationError("%r is not a multiple of %r" % (instance, dB))
+        return None
+
+    return check
+
+
+def _min_items(comp, mI, schema):
+    def check(instance):
+        if isinstance(instance, list) and len(instance) < mI:
+            return ValidationError("%r is too short" % (instance,))
+        return None
+
+    return check
+
+
+def _max_items(comp, mI, schema):
+    def check(instance):
+        if isinstance(instance, list) and len(instance) > mI:
+            return ValidationError("%r is too long" % (instance,))
+        return None
+
+    return check
+
+
+def _unique_items(comp, uI, schema):
+    if not uI:
+        return None
+
+    def check(instance):
+        if isinstance(instance, list) and not _utils.uniq(instance):
+            return ValidationError("%r has non-unique elements" % (instance,))
+        return None
+
+    return check
+
+
+def _pattern(comp, patrn, schema):
+    def check(instance):
+        if _is_string(instance) and not re.search(patrn, instance):
+            return ValidationError("%r does not match %r" % (instance, patrn))
+        return None
+
+    return check
+
+
+def _min_length(comp, mL, schema):
+    def check(instance):
+        if _is_string(instance) and len(instance) < mL:
+            return ValidationError("%r is too short" % (instance,))
+        return None
+
+    return check
+
+
+def _max_length(comp, mL, schema):
+    def check(instance):
+        if _is_string(instance) and len(instance) > mL:
+            return ValidationError("%r is too long" % (instance,))
+        return None
+
+    return check
+
+
+def _dependencies(comp, dependencies, schema):
+    deps = []
+    for prop, dependency in six.iteritems(dependencies):
+        if isinstance(dependency, dict):
+            deps.append((prop, comp._compile(dependency), None))
+        else:
+            deps.append((prop, None, _utils.ensure_list(dependency)))
+
+    def check(instance):
+        if not isinstance(instance, dict):
+            return None
+
+        for prop, func, required in deps:
+            if prop not in instance:
+                continue
+
+            if func is not None:
+                error = func(instance)
+                if error is not None:
+                    error.schema_path.appendleft(prop)
+                    return error
+            else:
+                for each in required:
+                    if each not in instance:
+                        return ValidationError("%r is a dependency of %r" % (each, prop))
+
+        return None
+
+    return check
+
+
+def _enum(comp, enums, schema):
+    def check(instance):
+        if instance not in enums:
+            return ValidationError("%r is not one of %r" % (instance, enums))
+        return None
+
+    return check
+
+
+def _required(comp, required, schema):
+    required = tuple(required)
+
+    def check(instance):
+        if not isinstance(instance, dict):
+            return None
+
+        for prop in required:
+            if prop not in instance:
+                return ValidationError("%r is a required property" % prop)
+
+        return None
+
+    return check
+
+
+def _min_properties(comp, mP, schema):
+    def check(instance):
+        if isinstance(instance, dict) and len(instance) < mP:
+            return ValidationError("%r does not have enough properties" % (instance,))
+        return None
+
+    return check
+
+
+def _max_properties(comp, mP, schema):
+    def check(instance):
+        if isinstance(instance, dict) and len(instance) > mP:
+            return ValidationError("%r has too many properties" % (instance,))
+        return None
+
+    return check
+
+
+def _all_of(comp, allOf, schema):
+    funcs = [comp._compile(sub) for sub in allOf]
+
+    def check(instance):
+        for index, func in enumerate(funcs):
+            error = func(instance)
+            if error is not None:
+                error.schema_path.appendleft(index)
+                return error
+        return None
+
+    return check
+
+
+def _any_of(comp, anyOf, schema):
+    funcs = [comp._compile(sub) for sub in anyOf]
+
+    def check(instance):
+        all_errors = []
+        for index, func in enumerate(funcs):
+            error = func(instance)
+            if error is None:
+                return None
+            error.schema_path.appendleft(index)
+            all_errors.append(error)
+
+        return ValidationError("%r is not valid under any of the given schemas" % (instance,),
+                               context=all_errors)
+
+    return check
+
+
+def _one_of(comp, oneOf, schema):
+    funcs = [comp._compile(sub) for sub in oneOf]
+
+    def check(instance):
+        all_errors = []
+        first_valid = None
+        for index, func in enumerate(funcs):
+            error = func(instance)
+            if error is None:
+                first_valid = index
+                break
+            error.schema_path.appendleft(index)
+            all_errors.append(error)
+        else:
+            return ValidationError(
+                "%r is not valid under any of the given schemas" % (instance,),
+                context=all_errors)
+
+        more_valid = [oneOf[ii] for ii in range(first_valid + 1, len(funcs))
+                      if funcs[ii](instance) is None]
+        if more_valid:
+            more_valid.append(oneOf[first_valid])
+            reprs = ", ".join(repr(sub) for sub in more_valid)
+            return ValidationError("%r is valid under each of %s" % (instance, reprs))
+
+        return None
+
+    return check
+
+
+def _not(comp, not_schema, schema):
+    func = comp._compile(not_schema)
+
+    def check(instance):
+        if func(instance) is None:
+            return ValidationError("%r is not allowed for %r" % (not_schema, instance))
+        return None
+
+    return check
+
+
+# Draft4 keywords (`$ref` is handled directly in `CompiledValidator._compile`)
+_KEYWORDS = {
+    u"additionalItems": _additional_items,
+    u"additionalProperties": _additional_properties,
+    u"allOf": _all_of,
+    u"anyOf": _any_of,
+    u"dependencies": _dependencies,
+    u"enum": _enum,
+    u"format": _format,
+    u"items": _items,
+    u"maxItems": _max_items,
+    u"maxLength": _max_length,
+    u"maxProperties": _max_properties,
+    u"maximum": _maximum,
+    u"minItems": _min_items,
+    u"minLength": _min_length,
+    u"minProperties": _min_properties,
+    u"minimum": _minimum,
+    u"multipleOf": _multiple_of,
+    u"not": _not,
+    u"oneOf": _one_of,
+    u"pattern": _pattern,
+    u"patternProperties": _pattern_properties,
+    u"properties": _properties,
+    u"required": _required,
+    u"type": _type,
+    u"uniqueItems": _unique_items,
+}
+
+# Keywords whose results depend on the 'properties' keyword, see `CompiledValidator.decompose`
+_NOT_DECOMPOSABLE = [u"additionalProperties"]
@@ -0,0 +1,119 @@
+"""Find duplicates within large collections of `Struct` instances, in (nearly) linear time.
+
+Comparing each pair of instances with `Struct.is_duplicate_of` requires O(N^2) comparisons.
+For instances of the same class, `is_duplicate_of` compares the values of `unique` and
+`distinguishing` keys in a fixed order, until either: the presence or value of a key differs
+(not duplicates); or a `unique` key is present in both with matching values (duplicates).  Two
+instances are thus duplicates exactly when they have identical 'signatures': the (presence,
+value) of each of these keys, up to and including the first `unique` key which is present.
+Instances are grouped by hashing their signatures.
+
+"""
+from collections import OrderedDict
+
+
+def duplicate_plan(cls):
+    """Get the keys used to compare instances of the given `Struct` subclass.
+
+    Returns
+    -------
+    plan : tuple of (str, bool)
+        The name of each `unique` or `distinguishing` key, and whether it is `unique`, in the
+        order used by `Struct.is_duplicate_of` (see `struct.duplicate_plan`).
+
+    """
+    return cls._get_duplicate_plan()
+
+
+def signature(item, plan=None):
+    """Construct the values that determine which instances `item` is a duplicate of.
+
+    Two instances (of the same class) are duplicates if-and-only-if their signatures are equal.
+
+    """
+    if plan is None:
+        plan = duplicate_plan(type(item))
+
+    sig = []
+    for name, unique in plan:
+        if name in item:
+            sig.append((name, item._peek(name)))
+            if unique:
+                break
+        else:
+            sig.append(None)
+
+    return tuple(sig)
+
+
+def group_duplicates(items):
+    """Group the given instances into sets of duplicates.
+
+    The results are identical to comparing each pair with `Struct.is_duplicate_of`.
+
+    Arguments
+    ---------
+    items : iterable of `Struct`
+
+    Returns
+    -------
+    groups : list of list of int
+        Indices of each set of (two or more) duplicate instances, ordered by first occurrence.
+
+    """
+    # Map each hashable key to a list of (signature, indices) for each distinct signature
+    buckets = OrderedDict()
+    plans = {}
+    for index, item in enumerate(items):
+        cls = type(item)
+        plan = plans.get(cls)
+        if plan is None:
+            plan = duplicate_plan(cls)
+            plans[cls] = plan
+
+        sig = signature(item, plan)
+        key = (cls, _hashable(sig))
+        classes = buckets.get(key)
+        if classes is None:
+            buckets[key] = [(sig, [index])]
+            continue
+
+        # Values with the same hashable key are (almost always) equal, but make sure
+        for other, indices in classes:
+            if other == sig:
+                indices.append(index)
+                break
+        else:
+            classes.append((sig, [index]))
+
+    groups = [indices for classes in buckets.values() for sig, indices in classes
+              if len(indices) > 1]
+    groups = sorted(groups, key=lambda gg: gg[0])
+    return groups
+
+
+def deduplicate(items):
+    """Return the given instances with duplicates removed, keeping the first of each.
+    """
+    items = list(items)
+    drop = set(index for group in group_duplicates(items) for index in group[1:])
+    return [item for index, item in enumerate(items) if index not in drop]
+
+
+def _hashable(value):
+    """Convert a value into a hashable object, such that equal values have equal results.
+    """
+    if isinstance(value, (tuple, list)):
+        return (isinstance(value, tuple), tuple(_hashable(vv) for vv in value))
+    if isinstance(value, dict):
+        # NOTE: values are compared directly, see `group_duplicates`
+        return frozenset(value.keys())
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+
+    try:
+        hash(value)
+    except TypeError:
+        return type(value).__name__
+
+    return value
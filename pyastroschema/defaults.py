@@ -0,0 +1,325 @@
+"""Set the default values of a schema in instances, separately from validating them.
+
+`validation.PAS_Validator` (and `compiler.CompiledValidator`) set the 'default' of each missing
+property while validating, which modifies every validated instance.  Pure validators (constructed
+with `set_defaults=False`) never modify instances, so they can be used on shared or read-only
+data (e.g. from `Struct.open`) and concurrently; while defaults are set, e.g. once at ingest, by a
+`DefaultsPlan`.
+
+The plan is constructed once for each schema (resolving all `$ref`s), and only visits the parts of
+instances where defaults can be set: if the schema has no defaults, applying them does nothing.
+For valid instances, the results are the same as validating with `PAS_Validator`.
+
+Usage:
+    plan = DefaultsPlan(schema, resolver=resolver)
+    plan.apply(instances)
+
+"""
+import re
+
+import six
+
+import jsonschema
+
+from . import compiler
+
+
+class DefaultsPlan(object):
+    """Precomputed plan for setting the default values of a schema in instances.
+    """
+
+    def __init__(self, schema, resolver=None):
+        """Construct the plan for the given `schema`.
+
+        Arguments
+        ---------
+        schema : dict,
+            A valid JSON schema.
+        resolver : `jsonschema.RefResolver` or `None`,
+            Used to resolve `$ref`s while constructing the plan.  If `None`, one is constructed
+            from the schema itself.
+
+        """
+        if resolver is None:
+            resolver = jsonschema.RefResolver.from_schema(schema)
+
+        self.schema = schema
+        self.resolver = resolver
+
+        # Plans for each resolved `$ref` url
+        self._refs = {}
+        # Pure validator used for the branches of 'anyOf', constructed as needed
+        self._compiler = None
+        self._apply = self._plan(schema)
+
+    @property
+    def empty(self):
+        """Whether setting defaults never changes instances, i.e. the schema has none.
+        """
+        return self._apply is None
+
+    def apply(self, instances):
+        """Set the default values of missing properties in each of the given instances.
+
+        Arguments
+        ---------
+        instances : iterable
+            Instances of this schema, which are modified in place.
+
+        """
+        func = self._apply
+        if func is None:
+            return
+
+        for instance in instances:
+            func(instance)
+
+        return
+
+    def apply_one(self, instance):
+        """Set the default values of missing properties in the given instance, and return it.
+        """
+        if self._apply is not None:
+            self._apply(instance)
+        return instance
+
+    def _plan(self, schema):
+        """Construct a function setting the defaults of a (sub)schema, or `None` if it has none.
+        """
+        if not isinstance(schema, dict):
+            return None
+
+        scope = schema.get(u"id")
+        if scope:
+            self.resolver.push_scope(scope)
+
+        try:
+            ref = schema.get(u"$ref")
+            if ref is not None:
+                return self._plan_ref(ref)
+
+            funcs = []
+            for kw, val in six.iteritems(schema):
+                builder = _KEYWORDS.get(kw)
+                if builder is None:
+                    continue
+                func = builder(self, val, schema)
+                if func is not None:
+                    funcs.append(func)
+
+        finally:
+            if scope:
+                self.resolver.pop_scope()
+
+        return _combine(funcs)
+
+    def _plan_ref(self, ref):
+        url, resolved = self.resolver.resolve(ref)
+        cell = self._refs.get(url)
+        if cell is not None:
+            if not cell[1]:
+                return cell[0]
+
+            # Reference is still being planned (i.e. it is recursive); defer lookup
+            def recursive_ref(instance):
+                if cell[0] is not None:
+                    cell[0](instance)
+
+            return recursive_ref
+
+        cell = [None, True]
+        self._refs[url] = cell
+        self.resolver.push_scope(url)
+        try:
+            cell[0] = self._plan(resolved)
+        finally:
+            self.resolver.pop_scope()
+            cell[1] = False
+
+        return cell[0]
+
+    def _check(self, schema):
+        """Compile a pure validation function for a subschema (in the current resolution scope).
+        """
+        if self._compiler is None:
+            self._compiler = compiler.CompiledValidator(
+                {}, resolver=self.resolver, set_defaults=False)
+        return self._compiler._compile(schema)
+
+
+def _combine(funcs):
+    funcs = [func for func in funcs if func is not None]
+    if len(funcs) == 0:
+        return None
+    if len(funcs) == 1:
+        return funcs[0]
+
+    def apply(instance):
+        for func in funcs:
+            func(instance)
+
+    return apply
+
+
+# ==== Keywords ====
+#    Each constructs a function setting defaults in (the relevant parts of) an instance, or
+#    returns `None` if there are no defaults to set.  These follow the order in which the
+#    `PAS_Validator` visits instances.
+
+def _properties(plan, properties, schema):
+    defaults = [(name, sub["default"]) for name, sub in six.iteritems(properties)
+                if isinstance(sub, dict) and ("default" in sub)]
+    subs = [(name, plan._plan(sub)) for name, sub in six.iteritems(properties)]
+    subs = [(name, func) for name, func in subs if func is not None]
+    if (len(defaults) == 0) and (len(subs) == 0):
+        return None
+
+    def apply(instance):
+        if not isinstance(instance, dict):
+            return
+
+        for name, value in defaults:
+            instance.setdefault(name, value)
+
+        for name, func in subs:
+            if name in instance:
+                func(instance[name])
+
+    return apply
+
+
+def _pattern_properties(plan, patterns, schema):
+    subs = [(re.compile(pattern), plan._plan(sub)) for pattern, sub in six.iteritems(patterns)]
+    subs = [(pattern, func) for pattern, func in subs if func is not None]
+    if len(subs) == 0:
+        return None
+
+    def apply(instance):
+        if not isinstance(instance, dict):
+            return
+
+        for pattern, func in subs:
+            for name, value in six.iteritems(instance):
+                if pattern.search(name):
+                    func(value)
+
+    return apply
+
+
+def _additional_properties(plan, additional, schema):
+    func = plan._plan(additional)
+    if func is None:
+        return None
+
+    properties = schema.get(u"properties", {})
+    patterns = [re.compile(pattern) for pattern in schema.get(u"patternProperties", {})]
+
+    def apply(instance):
+        if not isinstance(instance, dict):
+            return
+
+        for name, value in six.iteritems(instance):
+            if (name not in properties) and (not any(pp.search(name) for pp in patterns)):
+                func(value)
+
+    return apply
+
+
+def _items(plan, items, schema):
+    if isinstance(items, dict):
+        func = plan._plan(items)
+        if func is None:
+            return None
+
+        def apply(instance):
+            if isinstance(instance, list):
+                for item in instance:
+                    func(item)
+
+        return apply
+
+    funcs = [plan._plan(sub) for sub in items]
+    if all(func is None for func in funcs):
+        return None
+
+    def apply_each(instance):
+        if isinstance(instance, list):
+            for func, item in zip(funcs, instance):
+                if func is not None:
+                    func(item)
+
+    return apply_each
+
+
+def _additional_items(plan, additional, schema):
+    items = schema.get(u"items", {})
+    if isinstance(items, dict):
+        return None
+
+    func = plan._plan(additional)
+    if func is None:
+        return None
+
+    def apply(instance):
+        if isinstance(instance, list):
+            for item in instance[len(items):]:
+                func(item)
+
+    return apply
+
+
+def _dependencies(plan, dependencies, schema):
+    subs = [(name, plan._plan(dep)) for name, dep in six.iteritems(dependencies)
+            if isinstance(dep, dict)]
+    subs = [(name, func) for name, func in subs if func is not None]
+    if len(subs) == 0:
+        return None
+
+    def apply(instance):
+        if isinstance(instance, dict):
+            for name, func in subs:
+                if name in instance:
+                    func(instance)
+
+    return apply
+
+
+def _all(plan, schemas, schema):
+    # All branches of 'allOf' and 'oneOf' are evaluated for valid instances
+    return _combine([plan._plan(sub) for sub in schemas])
+
+
+def _not(plan, not_schema, schema):
+    return plan._plan(not_schema)
+
+
+def _any_of(plan, any_of, schema):
+    # Branches are evaluated until the first valid one
+    funcs = [plan._plan(sub) for sub in any_of]
+    if all(func is None for func in funcs):
+        return None
+
+    branches = [(func, plan._check(sub)) for func, sub in zip(funcs, any_of)]
+
+    def apply(instance):
+        for func, check in branches:
+            if func is not None:
+                func(instance)
+            if check(instance) is None:
+                break
+
+    return apply
+
+
+_KEYWORDS = {
+    u"additionalItems": _additional_items,
+    u"additionalProperties": _additional_properties,
+    u"allOf": _all,
+    u"anyOf": _any_of,
+    u"dependencies": _dependencies,
+    u"items": _items,
+    u"not": _not,
+    u"oneOf": _all,
+    u"patternProperties": _pattern_properties,
+    u"properties": _properties,
+}
@@ -4,13 +4,22 @@
 import os
 
 from . import PATHS
-from . import utils, validation, schema
+from . import utils, schema, compiler
+
+# Maximum number of keys stored by `Key.intern`, beyond which new keys are not stored
+INTERN_LIMIT = 10000
+# Shared `Key` instances, by class, name and (frozen) attributes, see `Key.intern`
+_INTERNED = {}
 
 
 class Key(str):
 
     __key_schema_fname = os.path.join(PATHS.SCHEMA_DIR, "key.json")
     __key_schema = utils.json_load_file(__key_schema_fname)
+    # Compiled validator for the attributes of keys, shared by all instances
+    __key_validator = None
+    # Default values of attributes, from the key schema
+    __key_defaults = None
 
     def __new__(cls, name, **kwargs):
         # Enforce lower-case
@@ -55,12 +64,70 @@ class Key(str):
             raise AttributeError("Once `Key` is constructed, it is immutable!")
         return super(Key, self).__setattr__(name, value)
 
+    @classmethod
+    def intern(cls, name, **kwargs):
+        """Get a shared `Key` with the given name and attributes.
+
+        `Key`s are immutable, so a single instance is constructed (and validated) for each
+        distinct name and set of attributes, and returned by all later calls.
+
+        """
+        # Attributes which are the same as the defaults are equivalent to missing ones
+        defaults = cls._get_defaults()
+        attrs = dict((kk, vv) for kk, vv in kwargs.items()
+                     if (kk not in defaults) or (defaults[kk] != vv))
+        ident = (cls, name, _freeze(attrs))
+        key = _INTERNED.get(ident)
+        if key is None:
+            key = cls(name, **kwargs)
+            if len(_INTERNED) < INTERN_LIMIT:
+                _INTERNED[ident] = key
+
+        return key
+
+    @classmethod
+    def _get_defaults(cls):
+        if Key.__key_defaults is None:
+            props = cls.__key_schema['properties']
+            Key.__key_defaults = dict((kk, vv['default']) for kk, vv in props.items()
+                                      if 'default' in vv)
+        return Key.__key_defaults
+
+    @classmethod
+    def trusted(cls, name, **kwargs):
+        """Construct a `Key` from attributes which are known to be valid, without validation.
+
+        Default values are still set, so the result is identical to `Key(name, **kwargs)`.
+
+        """
+        key = cls.__new__(cls, name)
+        attrs = key.__dict__
+        attrs.update(kwargs)
+        key._set_defaults()
+        attrs['_repr'] = repr(key)
+        attrs['_immutable'] = True
+        return key
+
+    @classmethod
+    def _get_validator(cls):
+        if Key.__key_validator is None:
+            Key.__key_validator = compiler.CompiledValidator(cls.__key_schema)
+        return Key.__key_validator
+
     def validate(self):
         """Check for consistency between the stored parameters and schema.
         """
-        # Use a custom validator that sets default values
-        validator = validation.PAS_Validator(self.__key_schema)
-        validator.validate(self.__dict__)
+        self._set_defaults()
+        error = self._get_validator().check(self.__dict__)
+        if error is not None:
+            raise error
+        return
+
+    def _set_defaults(self):
+        # Set default values of missing attributes, as done by `validation.PAS_Validator`
+        attrs = self.__dict__
+        for kk, vv in self._get_defaults().items():
+            attrs.setdefault(kk, vv)
         return
 
     def equals(self, other, identical=False):
@@ -90,7 +157,7 @@ class Keychain(object):
 
     _USE_UPPER_CASE = True
 
-    def __init__(self, schema_source, mutable=False, extendable=True):
+    def __init__(self, schema_source, mutable=False, extendable=True, keys=None, trusted=False):
         """Initialize this `Keys` object using properties from given schema as keys.
 
         Arguments
@@ -103,6 +170,12 @@ class Keychain(object):
         extendable : bool,
             If `True`, then new key-value pairs can be added after initialization.
             This setting does not affect whether existing key-value pairs can be modified.
+        keys : list of `Key` or `None`,
+            The `Key` for each property of the schema.  If `None`, they are constructed (and
+            validated) from the schema.
+        trusted : bool,
+            If `True`, the properties of the schema are known to be valid `Key` attributes, and
+            keys are constructed without validation (see `Key.trusted`).
 
         """
         if isinstance(schema_source, schema.SchemaDict):
@@ -110,12 +183,14 @@ class Keychain(object):
         else:
             schema_dict = schema.SchemaDict(schema_source)
 
-        props = schema_dict.properties
+        if keys is None:
+            props = schema_dict.properties
+            construct = Key.trusted if trusted else Key.intern
+            keys = [construct(prop_name, **prop_vals) for prop_name, prop_vals in props.items()]
 
         # Store all of the property names to this object
-        for prop_name, prop_vals in props.items():
-            use_name = prop_name.upper() if self._USE_UPPER_CASE else prop_name
-            _key = Key(prop_name, **prop_vals)
+        for _key in keys:
+            use_name = str(_key).upper() if self._USE_UPPER_CASE else str(_key)
             setattr(self, use_name, _key)
 
         self._schema = schema_dict
@@ -146,14 +221,20 @@ class Keychain(object):
         if isinstance(value, Key):
             if not hasattr(self, "_keys"):
                 self._keys = []
+                # Map from each key's name to the `Key` itself, for fast lookups
+                self._index = {}
 
-            # Store valid new attributes to the keys and values lists
-            if not hasattr(self, name):
-                self._keys.append(value)
+            old = getattr(self, name, None)
             # Update existing attributes
-            elif hasattr(self, name):
-                idx = self._keys.index(name)
+            if isinstance(old, Key) and (self._index.get(str(old)) is old):
+                idx = self._keys.index(old)
                 self._keys[idx] = value
+                del self._index[str(old)]
+            # Store valid new attributes to the keys and values lists
+            else:
+                self._keys.append(value)
+
+            self._index[str(value)] = value
 
         # Actually store key-value pair as an attribute
         super(Keychain, self).__setattr__(name, value)
@@ -172,18 +253,35 @@ class Keychain(object):
         """Compare the given `str` with the `str` representation of each internal `Key`.
         """
         # cont = (key in [str(kk) for kk in self._keys])
-        cont = (key in self._keys)
+        try:
+            cont = (key in self._index)
+        except TypeError:
+            # Unhashable values are never keys
+            cont = False
         return cont
 
+    def __getitem__(self, name):
+        """Get the `Key` with the given name, raises `KeyError` if there is none.
+        """
+        return self._index[name]
+
     def get_key_by_name(self, name, create_if_missing=True):
         try:
-            idx = self.keys().index(name)
-        except ValueError as err:
+            return self._index[name]
+        except KeyError:
             if create_if_missing:
-                return Key(name)
+                return Key.intern(name)
 
-            # NOTE: this does not work in python2
-            # raise ValueError("`Keychain` does not have a key for '{}'! " + str(err)) from err
-            raise
+            raise ValueError("`Keychain` does not have a key for '{}'!".format(name))
 
-        return self._keys[idx]
+
+def _freeze(value):
+    """Convert a (JSON) value into a hashable equivalent, for use as a dictionary key.
+    """
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((kk, _freeze(vv)) for kk, vv in value.items())))
+    if isinstance(value, (list, tuple)):
+        # Subclasses (e.g. the lists of a `SchemaDict`) are equivalent to plain lists
+        return (list, tuple(_freeze(vv) for vv in value))
+    # Include the type, so that e.g. `True` and `1` are distinguished
+    return (type(value), value)
@@ -0,0 +1,437 @@
+"""Open (large) JSON files lazily, decoding each value only when it is first accessed.
+
+`Struct.open` memory-maps a file and scans it once to find the byte offsets of each top-level
+property, and of each element of properties which are lists of items (e.g. the 'photometry' and
+'spectra' of an 'entry', see `streaming.StreamingValidator`).  Each value is decoded, and
+validated against the schema of that property (or list item), the first time it is accessed;
+so that reading e.g. the 'name' and 'redshift' of an entry never decodes its photometry.
+
+Object-level constraints of the schema (e.g. 'required') and the lengths of lists are checked
+when the file is opened.  If these constraints depend on the values of properties (e.g. 'not' or
+'anyOf'), and not only on which properties are present, all values are decoded and validated
+when the file is opened instead.  Once all values have been decoded (see
+`LazyStruct.materialize`) the instance is converted into a normal instance of its `Struct` class,
+and the file is closed.  Files can also be closed explicitly, with `LazyStruct.close` or by using
+the instance as a context manager.
+
+"""
+import re
+import mmap
+from collections import OrderedDict
+
+import six
+
+from . import utils, schema, streaming, compiler
+
+# Tokens of the JSON structure: containers which do not contain other containers (matched in
+# their entirety), strings, brackets and commas.  Everything else is skipped
+_STRING_PATTERN = br'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOKENS = re.compile(br'([\[{][^"\[\]{}]*(?:' + _STRING_PATTERN + br'[^"\[\]{}]*)*[\]}])|(' +
+                     _STRING_PATTERN + br')|([\[{])|([\]}])|(,)')
+_FLAT, _STRING, _OPEN, _CLOSE, _COMMA = 1, 2, 3, 4, 5
+_WHITESPACE = re.compile(br'\s*')
+
+# `list` methods which require all elements to be decoded
+_LIST_READERS = ["__contains__", "__eq__", "__ne__", "__lt__", "__le__", "__gt__", "__ge__",
+                 "__add__", "__mul__", "__rmul__", "__repr__", "__reversed__",
+                 "count", "index", "remove", "sort"]
+# `Struct` methods which require all values to be decoded
+_STRUCT_READERS = ["__eq__", "__ne__", "__repr__", "__str__", "__copy__", "__deepcopy__",
+                   "__reduce__", "__reduce_ex__", "cow_copy", "dump", "dumps", "popitem"]
+
+# Object-level keywords which only depend on the presence of properties, and not their values
+_PRESENCE_KEYWORDS = [u"required", u"minProperties", u"maxProperties", u"type", u"dependencies"]
+
+# Lazy subclasses of each `Struct` class, see `lazy_class`
+_LAZY_CLASSES = {}
+
+
+class _Span(object):
+    """Location (in bytes) of a value which has not yet been decoded.
+    """
+
+    __slots__ = ('start', 'end')
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        return
+
+
+class _Source(object):
+    """Memory-mapped file, and the validators used for the values decoded from it.
+    """
+
+    def __init__(self, fname, schema_dict, validate):
+        with open(fname, 'rb') as inp:
+            self.buffer = mmap.mmap(inp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.fname = fname
+        self.streams = schema_dict._get_streaming_validator()
+        # Validators for each property, `None` if values are not validated when decoded
+        self.decomp = schema_dict.compile().decompose() if validate else None
+        return
+
+    def load(self, name, span):
+        """Decode (and validate) the value of the named property.
+        """
+        value = self.decode(span)
+        check = None if (self.decomp is None) else self.decomp[1].get(name)
+        if check is not None:
+            error = check(value)
+            if error is not None:
+                error.path.appendleft(name)
+                error.schema_path.appendleft(name)
+                error.schema_path.appendleft("properties")
+                raise error
+
+        return value
+
+    def load_item(self, name, index, span):
+        """Decode (and validate) the element of the named list property at the given index.
+        """
+        value = self.decode(span)
+        if self.decomp is not None:
+            error = self.streams.list_plan(name)[1](value)
+            if error is not None:
+                error.path.extendleft([index, name])
+                error.schema_path.extendleft(["items", name, "properties"])
+                raise error
+
+        return value
+
+    def decode(self, span):
+        if self.buffer.closed:
+            raise ValueError("File '{}' has been closed!".format(self.fname))
+        return utils.json_load_str(self.buffer[span.start:span.end])
+
+    def close(self):
+        self.buffer.close()
+        return
+
+
+class LazyList(list):
+    """List whose elements are decoded (and validated) from a memory-mapped file when accessed.
+
+    Operations on the entire list (e.g. comparisons, searching, sorting) decode all elements.
+
+    """
+
+    def __init__(self, source, name, spans):
+        super(LazyList, self).__init__(spans)
+        self._source = source
+        self._name = name
+        return
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[ii] for ii in range(*index.indices(len(self)))]
+
+        value = list.__getitem__(self, index)
+        if type(value) is _Span:
+            if index < 0:
+                index += len(self)
+            value = self._source.load_item(self._name, index, value)
+            list.__setitem__(self, index, value)
+
+        return value
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __reduce_ex__(self, protocol):
+        # Copies (and pickles) are normal lists
+        return (list, (list(iter(self)),))
+
+    def pop(self, index=-1):
+        value = self[index]
+        list.pop(self, index)
+        return value
+
+    def materialize(self):
+        """Decode all remaining elements.
+        """
+        for index in range(len(self)):
+            self[index]
+        return
+
+
+def _list_reader(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.materialize()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in _LIST_READERS:
+    setattr(LazyList, _name, _list_reader(_name))
+
+
+class LazyStruct(object):
+    """Mixin for `Struct` classes whose values are decoded from a file when first accessed.
+
+    Instances are constructed by `open_struct` (i.e. `Struct.open`), using `lazy_class`.
+
+    """
+
+    _LAZY_BASE = None
+
+    def __getitem__(self, name):
+        value = super(LazyStruct, self).__getitem__(name)
+        if type(value) is _Span:
+            OrderedDict.__setitem__(self, name, self._source.load(name, value))
+            # Handle the decoded value like any other, e.g. flag it for re-validation if mutable
+            value = super(LazyStruct, self).__getitem__(name)
+        return value
+
+    def _peek(self, name):
+        value = OrderedDict.__getitem__(self, name)
+        if type(value) is _Span:
+            value = self._source.load(name, value)
+            OrderedDict.__setitem__(self, name, value)
+        return value
+
+    def get(self, name, default=None):
+        return self[name] if (name in self) else default
+
+    def items(self):
+        self._load_all()
+        return super(LazyStruct, self).items()
+
+    def values(self):
+        self._load_all()
+        return super(LazyStruct, self).values()
+
+    def pop(self, name, *args):
+        if name in self:
+            self[name]
+        return super(LazyStruct, self).pop(name, *args)
+
+    def setdefault(self, name, default=None):
+        if name in self:
+            return self[name]
+        return super(LazyStruct, self).setdefault(name, default)
+
+    def materialize(self):
+        """Decode all remaining values, and convert this into a normal (non-lazy) instance.
+        """
+        self._load_all()
+        for value in OrderedDict.values(self):
+            if isinstance(value, LazyList):
+                value.materialize()
+
+        self.__class__ = self._LAZY_BASE
+        self._source.close()
+        del self._source
+        return
+
+    def close(self):
+        """Close the file, after which values which have not been decoded cannot be accessed.
+        """
+        self._source.close()
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        # Instances which have been materialized are no longer lazy (and already closed)
+        if isinstance(self, LazyStruct):
+            self.close()
+        return
+
+    def _load_all(self):
+        for name in self.keys():
+            self[name]
+        return
+
+
+def _struct_reader(name):
+    def wrapper(self, *args, **kwargs):
+        self.materialize()
+        # Call the method of the (now normal) instance
+        return getattr(self, name)(*args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in _STRUCT_READERS:
+    setattr(LazyStruct, _name, _struct_reader(_name))
+
+
+def lazy_class(struct_class):
+    """Get the (cached) lazy subclass of the given `Struct` class.
+    """
+    lazy = _LAZY_CLASSES.get(struct_class)
+    if lazy is None:
+        name = "Lazy" + struct_class.__name__
+        lazy = type(name, (LazyStruct, struct_class), {"_LAZY_BASE": struct_class})
+        _LAZY_CLASSES[struct_class] = lazy
+
+    return lazy
+
+
+def open_struct(struct_class, fname, validate=True):
+    """Open a JSON file as a (lazy) instance of the given `Struct` class.
+
+    Arguments
+    ---------
+    struct_class : `Struct` subclass
+    fname : str
+        Path to a JSON file containing a single object.
+    validate : bool
+        Validate each value against its schema when it is decoded, and check the object-level
+        constraints (e.g. 'required') immediately.  If the schema cannot be decomposed into
+        individual properties (see `compiler.CompiledValidator.decompose`), all values are
+        decoded and validated immediately.
+
+    Returns
+    -------
+    obj : instance of `lazy_class(struct_class)`
+
+    """
+    struct_class._check_class()
+    source = _Source(fname, struct_class._SCHEMA, validate)
+    streams = source.streams
+    spans = _scan(source.buffer, streams.stream_keys)
+    if spans is None:
+        raise ValueError("File '{}' does not contain a JSON object!".format(fname))
+
+    cls = lazy_class(struct_class)
+    obj = cls.__new__(cls)
+    schema.JSONOrderedDict.__init__(obj)
+    obj._parent = None
+    obj._dirty = None
+    obj._source = source
+
+    setitem = schema.JSONOrderedDict.__setitem__
+    for name, (start, end, elements) in six.iteritems(spans):
+        if (not struct_class._extendable) and (name not in struct_class._KEYCHAIN):
+            err = "'{}' not in `keychain`, and not extendable!".format(name)
+            raise RuntimeError(err)
+
+        if elements is None:
+            setitem(obj, name, _Span(start, end))
+            continue
+
+        value = LazyList(source, name, [_Span(beg, fin) for beg, fin in elements])
+        setitem(obj, name, value)
+        # Check the list length constraints (only short lists need to be decoded)
+        check_list, check_item, list_schema, min_items, max_items = streams.list_plan(name)
+        if source.decomp is not None:
+            num = len(value)
+            head = []
+            if (min_items is not None) and (num < min_items):
+                head = [source.decode(_Span(beg, fin)) for beg, fin in elements]
+            error = streaming._length_error(list_schema, head, num, min_items, max_items)
+            if error is not None:
+                error.path.appendleft(name)
+                error.schema_path.extendleft([name, "properties"])
+                raise error
+
+    if validate:
+        if (source.decomp is None) or (not _presence_only(struct_class._SCHEMA)):
+            obj.materialize()
+            obj.validate(incremental=False)
+        else:
+            # Object-level constraints only depend on which properties are present
+            error = source.decomp[0](OrderedDict.fromkeys(spans))
+            if error is not None:
+                raise error
+            obj._dirty = set()
+
+    return obj
+
+
+def _presence_only(schema_dict):
+    """Whether the object-level keywords of a schema only depend on the presence of properties.
+    """
+    for kw, val in six.iteritems(schema_dict):
+        if (kw == u"properties") or (kw not in compiler._KEYWORDS):
+            continue
+        if kw not in _PRESENCE_KEYWORDS:
+            return False
+        # Dependencies can either be lists of property names, or schemas
+        if (kw == u"dependencies") and any(isinstance(dep, dict) for dep in val.values()):
+            return False
+
+    return True
+
+
+def _scan(buf, list_names):
+    """Find the byte offsets of each top-level property, and of the elements of named lists.
+
+    Returns
+    -------
+    spans : `OrderedDict` or `None`
+        `(start, end, elements)` of each property, where `elements` is a list of the
+        `(start, end)` of each element for lists in `list_names` (otherwise `None`).
+        `None` is returned if `buf` does not contain an object.
+
+    """
+    start = _WHITESPACE.match(buf).end()
+    if buf[start:start + 1] != b'{':
+        return None
+
+    spans = OrderedDict()
+    depth = 0
+    key = None
+    value_start = None
+    elements = None
+    item_start = None
+    for match in _TOKENS.finditer(buf, start + 1):
+        kind = match.lastindex
+        if depth == 0:
+            if (kind == _STRING) and (key is None):
+                key = utils.json_load_str(match.group())
+                value_start = buf.find(b':', match.end()) + 1
+                elements = None
+            elif kind == _OPEN:
+                depth = 1
+                if (key in list_names) and (buf[match.start():match.end()] == b'['):
+                    elements = []
+            elif kind == _CLOSE or kind == _COMMA:
+                if key is not None:
+                    if (elements is not None) and \
+                            (not _covers(buf, value_start, match.start(), elements)):
+                        elements = None
+                    spans[key] = (value_start, match.start(), elements)
+                    key = None
+                if kind == _CLOSE:
+                    break
+
+        elif kind == _OPEN:
+            if (depth == 1) and (elements is not None):
+                item_start = match.start()
+            depth += 1
+        elif kind == _CLOSE:
+            depth -= 1
+            if (depth == 1) and (elements is not None):
+                elements.append((item_start, match.end()))
+        elif (depth == 1) and (elements is not None) and (kind != _COMMA):
+            elements.append(match.span())
+
+    else:
+        raise ValueError("Unexpected end of JSON object!")
+
+    return spans
+
+
+def _covers(buf, start, end, elements):
+    """Check that the elements found make up the entire list, e.g. the list has no numbers.
+    """
+    prev = buf.find(b'[', start) + 1
+    sep = b''
+    for beg, fin in elements:
+        if buf[prev:beg].strip() != sep:
+            return False
+        prev = fin
+        sep = b','
+
+    return buf[prev:end].strip() == b']'
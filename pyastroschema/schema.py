@@ -1,37 +1,70 @@
 """
 """
 import os
+import sys
 import copy
+import itertools
+import threading
 import warnings
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple, deque
+
+import six
 
 import jsonschema
 
-from pyastroschema import utils, validation
+from pyastroschema import utils, validation, compiler, streaming, cache, bundle, defaults
 
 warnings.showwarning = utils.warn_with_traceback
 
+# Default for whether `SchemaDict` instances validate data using a `compiler.CompiledValidator`
+COMPILED = False
+
+# Description of an invalid item, as returned by `SchemaDict.validate_many`
+ValidationFailure = namedtuple('ValidationFailure', ['index', 'path', 'message'])
+
+# Whether python threads run in parallel, i.e. on free-threaded builds with the GIL disabled
+FREE_THREADED = not getattr(sys, "_is_gil_enabled", lambda: True)()
+# Number of items validated by each task of the thread pool in `SchemaDict.validate_many`
+THREAD_CHUNK_SIZE = 64
+
+# Lock guarding the construction of the cached validators of all `SchemaDict` instances
+_LOCK = threading.RLock()
+# Positions of values tracked within a `SchemaDict`: (sub)schemas, dictionaries of subschemas
+# by name (e.g. 'properties'), and anything else (e.g. the values of 'enum')
+_SCHEMA, _SCHEMA_MAP, _DATA = 0, 1, 2
+# Keywords whose values are subschemas, lists of subschemas, or subschemas by name
+_SUBSCHEMA_KEYWORDS = set(bundle._SCHEMA_KEYWORDS + bundle._LIST_KEYWORDS + [u"items"])
+_SCHEMA_MAP_KEYWORDS = set(bundle._DICT_KEYWORDS + [u"dependencies"])
+
 
 class JSONOrderedDict(OrderedDict):
 
     def __str__(self):
         return utils.json_dump_str(self)
 
-    def dump(self, fname, sort_func=None):
+    def dump(self, fname, sort_func=None, **kwargs):
+        """Write to the given filename as JSON, see `utils.json_dump_stream` for `kwargs`.
+        """
         package = self if sort_func is None else sort_func(self)
-        return utils.json_dump_file(package, fname)
+        return utils.json_dump_file(package, fname, **kwargs)
 
-    def dumps(self, sort_func=None):
+    def dumps(self, sort_func=None, **kwargs):
+        """Construct a JSON string, see `utils.json_dump_str` for `kwargs`.
+        """
         package = self if sort_func is None else sort_func(self)
-        return utils.json_dump_str(package)
+        return utils.json_dump_str(package, **kwargs)
 
     @classmethod
-    def load(cls, fname):
-        return cls(utils.json_load_file(fname))
+    def load(cls, fname, **kwargs):
+        """Load from the given JSON filename, see `utils.json_load_str` for `kwargs`.
+        """
+        return cls(utils.json_load_file(fname, **kwargs))
 
     @classmethod
-    def loads(cls, jstr):
-        return cls(utils.json_load_str(jstr))
+    def loads(cls, jstr, **kwargs):
+        """Load from the given JSON string, see `utils.json_load_str` for `kwargs`.
+        """
+        return cls(utils.json_load_str(jstr, **kwargs))
 
     def extend(self, data, **kwargs):
         """Add elements from `schema` not present in self (recursively).
@@ -44,13 +77,41 @@ class JSONOrderedDict(OrderedDict):
 
 
 class SchemaDict(JSONOrderedDict):
+    """JSON schema, with cached validators for data.
+
+    Changes: the schema, and all of the dictionaries and lists within it, record modifications by
+    incrementing `version`, and cached validators are reconstructed when it changes.  The
+    'default' values of properties are inserted into validated instances (see
+    `validation.PAS_Validator`), so they are not tracked: these should be replaced, instead of
+    being modified in place.  Once `freeze` is called, the schema cannot be modified and it is
+    hashable, so it can be shared (e.g. as a key in caches).
+
+    Thread safety: a single instance can be used to validate data from any number of threads.
+        - Each cached validator (and `DefaultsPlan`) is constructed once, while holding a lock,
+          and those shared between threads do not change while validating.
+        - Standard (`jsonschema`) validators change the resolution scope of their `RefResolver`
+          while validating, so a separate one is used by each thread.
+        - Validation with `set_defaults=True` (the default) modifies the validated instances, so
+          `set_defaults=False` should be used for instances shared between threads.
+        - Modifying the schema itself while it is used by other threads is not supported.
 
-    def __init__(self, schema={}, path=None):
+    """
+
+    def __init__(self, schema={}, path=None, compiled=None, validate_schema=True):
         """
         Path is used for RefResolver (using relative paths in schema).
+
+        If `compiled` is True, data is validated using a `compiler.CompiledValidator` which is
+        constructed once and reused (see `SchemaDict.compile`).  If `None`, the module-level
+        `COMPILED` value is used.
+
+        If `validate_schema` is False, the schema itself is not validated (against the
+        meta-schema), e.g. when it is known to be valid (see `cache`).
         """
         schema, schema_path, schema_name = _get_schema_dict_and_path_str(schema)
         super(SchemaDict, self).__init__(schema)
+        self._version = _Version()
+        self._track()
         if path is None:
             path = schema_path
 
@@ -62,21 +123,97 @@ class SchemaDict(JSONOrderedDict):
         self.finalize()
         self._name = schema_name
 
-        self._validator = None
+        self._compiled_validator = None
+        self._pure_compiled_validator = None
+        self._columnar_validator = None
+        self._streaming_validator = None
+        self._defaults_plan = None
+        # Standard validators of each thread, see `_get_validator`
+        self._local = threading.local()
         self._ref_resolver = None
-        self._changed = True
+        # Value of `version` for which the cached validators were constructed
+        self._cache_version = None
+        self.compiled = COMPILED if (compiled is None) else compiled
         self._ref_path = path
         self._filename = fname
         path_formatted = 'file://{}/'.format(path) if (path is not None) else None
         self._ref_path_formatted = path_formatted
 
         # Validate the schema itself
-        self.validate()
+        if validate_schema:
+            self.validate()
         return
 
-    def __set__(self, key, val):
-        self._changed = True
-        return super(SchemaDict).__set__(key, val)
+    @property
+    def version(self):
+        """Number of modifications made to this schema (including nested values).
+        """
+        return self._version.count
+
+    @property
+    def frozen(self):
+        return self._version.frozen
+
+    def freeze(self):
+        """Make this schema (including nested values) immutable and hashable, and return it.
+
+        Copies (and pickles) of a frozen schema are also frozen.
+        """
+        self._version.frozen = True
+        return self
+
+    def __hash__(self):
+        if not self.frozen:
+            raise TypeError("unhashable type: '{}' (use `freeze()`)".format(type(self).__name__))
+
+        if self._hash is None:
+            self._hash = _hash_value(self)
+        return self._hash
+
+    def __setitem__(self, key, val):
+        version = getattr(self, "_version", None)
+        if version is not None:
+            version.modify()
+            val = _track_item(_SCHEMA, key, val, version)
+        super(SchemaDict, self).__setitem__(key, val)
+
+    def __delitem__(self, key):
+        self._version.modify()
+        super(SchemaDict, self).__delitem__(key)
+
+    def clear(self):
+        self._version.modify()
+        super(SchemaDict, self).clear()
+
+    def pop(self, *args):
+        self._version.modify()
+        return super(SchemaDict, self).pop(*args)
+
+    def popitem(self, *args, **kwargs):
+        self._version.modify()
+        return super(SchemaDict, self).popitem(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def move_to_end(self, *args, **kwargs):
+        self._version.modify()
+        super(SchemaDict, self).move_to_end(*args, **kwargs)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def _track(self):
+        """Track changes to all of the (nested) values of this schema, see `_TrackedDict`.
+        """
+        version = self._version
+        for key, val in list(self.items()):
+            OrderedDict.__setitem__(self, key, _track_item(_SCHEMA, key, val, version))
+        self._hash = None
+        return
 
     @classmethod
     def to_SchemaDict(cls, data):
@@ -87,11 +224,75 @@ class SchemaDict(JSONOrderedDict):
         # Otherwise, create a new `SchemaDict`
         return cls(data)
 
+    @classmethod
+    def _from_cache_state(cls, state):
+        """Reconstruct a (previously validated) schema from `_cache_state`, without validation.
+        """
+        data, path, name, fname = state
+        self = cls(data, path=path, validate_schema=False)
+        self._name = name
+        self._filename = fname
+        return self
+
+    def _cache_state(self):
+        """Get the data needed to reconstruct this schema, see `_from_cache_state`.
+        """
+        return (OrderedDict(self), self._ref_path, self._name, self._filename)
+
     @property
     def properties(self):
         return self.get('properties', None)
 
-    def validate(self, data=None):
+    def compile(self, set_defaults=True):
+        """Construct (and cache) a `compiler.CompiledValidator` for this schema.
+
+        All `$ref`s are resolved during compilation, so the returned validator can be reused
+        for any number of instances without further reference resolution.
+
+        If `set_defaults` is False, the validator never modifies instances (see `defaults`).
+        """
+        attr = "_compiled_validator" if set_defaults else "_pure_compiled_validator"
+        return self._cached(attr, lambda: compiler.CompiledValidator(
+            self, resolver=self._get_ref_resolver(), set_defaults=set_defaults))
+
+    def defaults_plan(self):
+        """Construct (and cache) a `defaults.DefaultsPlan` for this schema.
+        """
+        return self._cached("_defaults_plan", lambda: defaults.DefaultsPlan(
+            self, resolver=self._get_ref_resolver()))
+
+    def apply_defaults(self, data):
+        """Set the default values of missing properties in each element of the iterable `data`.
+
+        This is the same as the modification of instances made when validating them (with
+        `set_defaults=True`), without validation.  See `defaults.DefaultsPlan`.
+
+        """
+        self.defaults_plan().apply(data)
+        return
+
+    def bundle(self):
+        """Construct a self-contained copy of this schema, with all `$ref`s resolved and inlined.
+
+        The result validates identically, without any reference resolution (or file access).
+        See `bundle.bundle_schema`.
+
+        Returns
+        -------
+        bundled : `SchemaDict`
+
+        """
+        try:
+            data = bundle.bundle_schema(self, resolver=self._get_ref_resolver())
+        except jsonschema.exceptions.RefResolutionError:
+            self._warn_ref_failure()
+            raise
+
+        bundled = SchemaDict(data, compiled=self.compiled, validate_schema=False)
+        bundled._name = self._name
+        return bundled
+
+    def validate(self, data=None, compiled=None, set_defaults=True):
         # Validate this object (i.e. this schema)
         if data is None:
             validator = jsonschema.validators.validator_for(self)
@@ -99,32 +300,282 @@ class SchemaDict(JSONOrderedDict):
 
         # Validate the given data using this object as a schema
         else:
-            # Construct and cache a validator
-            if (self._validator is None) or (self._changed):
-                path = self._ref_path_formatted
-                resolver = jsonschema.RefResolver(path, None) if (path is not None) else None
-                self._validator = validation.PAS_Validator(self, resolver=resolver)
-                self._changed = False
-
             try:
-                self._validator.validate(data)
+                self._get_validator(compiled, set_defaults=set_defaults).validate(data)
             except jsonschema.exceptions.RefResolutionError as err:
-                myname = self.get('title', None)
-                if myname is None:
-                    myname = self._name
-                if myname is None:
-                    myname = str(self)
-                msg = "Reference resolution failure with: {}".format(myname)
-                warnings.warn(msg)
+                self._warn_ref_failure()
                 # NOTE: this does not work in python2
                 # raise jsonschema.exceptions.RefResolutionError(msg) from err
                 raise
 
         return
 
+    def validate_many(self, data, max_errors=None, compiled=True, set_defaults=True, jobs=None):
+        """Validate each element of the iterable `data`, collecting failures instead of raising.
+
+        Arguments
+        ---------
+        data : iterable
+            Instances to be validated against this schema.  Items are consumed one at a time, so
+            generators (e.g. streamed from a file) can be used.
+        max_errors : int or `None`
+            Stop validating after this many failures have been found.
+        compiled : bool or `None`
+            Whether to use a compiled validator (the default, as the cost of compilation is
+            amortized over many items), if `None` then `self.compiled` is used.
+        set_defaults : bool
+            Whether the default values of missing properties are set in the items.  If `False`,
+            items are never modified (e.g. they can be shared, or read-only).
+        jobs : int or `None`
+            Number of threads used to validate items, in chunks of `THREAD_CHUNK_SIZE`.  If
+            `None`, one for each CPU on free-threaded python builds (see `FREE_THREADED`), and
+            otherwise 1, i.e. items are validated serially in the calling thread.
+
+        Returns
+        -------
+        failures : list of `ValidationFailure`
+            One entry for each invalid item, giving the item's `index`, and the `path` and
+            `message` of the (first) error found in it.  These are the same for any `jobs`.
+
+        """
+        if jobs is None:
+            jobs = (os.cpu_count() or 1) if FREE_THREADED else 1
+
+        # Construct the validator(s) before starting any threads
+        self._get_validator(compiled, set_defaults=set_defaults)
+
+        def check_chunk(chunk):
+            validator = self._get_validator(compiled, set_defaults=set_defaults)
+            if isinstance(validator, compiler.CompiledValidator):
+                first_error = validator.check
+            else:
+                def first_error(item):
+                    return next(validator.iter_errors(item), None)
+
+            failures = []
+            for index, item in chunk:
+                error = first_error(item)
+                if error is None:
+                    continue
+
+                failures.append(ValidationFailure(index, list(error.path), error.message))
+                if (max_errors is not None) and (len(failures) >= max_errors):
+                    break
+
+            return failures
+
+        items = enumerate(data)
+        try:
+            if jobs <= 1:
+                return check_chunk(items)
+
+            chunks = iter(lambda: list(itertools.islice(items, THREAD_CHUNK_SIZE)), [])
+            return self._check_chunks(check_chunk, chunks, jobs, max_errors)
+
+        except jsonschema.exceptions.RefResolutionError:
+            self._warn_ref_failure()
+            raise
+
+    def _check_chunks(self, check_chunk, chunks, jobs, max_errors):
+        """Run `check_chunk` on each of the `chunks` using a pool of `jobs` threads.
+
+        Chunks are consumed as needed, and their results combined in order, so that failures are
+        the same as validating serially.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        failures = []
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            try:
+                for chunk in itertools.chain(chunks, [None]):
+                    if chunk is not None:
+                        pending.append(pool.submit(check_chunk, chunk))
+                        # Limit the number of chunks held in memory
+                        if len(pending) < 2*jobs:
+                            continue
+
+                    while len(pending) > 0:
+                        failures.extend(pending.popleft().result())
+                        if (max_errors is not None) and (len(failures) >= max_errors):
+                            return failures[:max_errors]
+                        if chunk is not None:
+                            break
+
+            finally:
+                for future in pending:
+                    future.cancel()
+
+        return failures
+
+    def validate_columns(self, columns):
+        """Validate columnar data (e.g. a table of photometry) using vectorized operations.
+
+        Requires `numpy`, see `columnar.ColumnarValidator`.
+
+        Arguments
+        ---------
+        columns : dict of array_like, or structured `numpy.ndarray`
+            Each column corresponds to a property of this schema, and each row an instance.
+
+        Returns
+        -------
+        bad : (N,) bool `numpy.ndarray`
+            Mask which is `True` for each invalid row.
+
+        """
+        from pyastroschema import columnar
+
+        validator = self._cached("_columnar_validator", lambda: columnar.ColumnarValidator(
+            self, resolver=self._get_ref_resolver()))
+        return validator.validate(columns)
+
+    def validate_file(self, fname, max_errors=None):
+        """Validate the contents of a JSON file incrementally, without loading it entirely.
+
+        The elements of lists (e.g. the 'photometry' of an 'entry') are validated one at a time,
+        as they are parsed, so that memory usage is bounded by the size of the largest element.
+        See `streaming.StreamingValidator`.
+
+        Arguments
+        ---------
+        fname : str
+            Path to a JSON file containing an instance of this schema.
+        max_errors : int or `None`
+            Stop validating after this many errors have been found.
+
+        Returns
+        -------
+        errors : list of `jsonschema.ValidationError`
+            The first error in each invalid list element, and then the first error in the
+            remaining (not streamed) contents; with `path`s relative to the complete instance.
+
+        """
+        validator = self._get_streaming_validator()
+        errors = []
+        try:
+            for error in validator.iter_errors(fname):
+                errors.append(error)
+                if (max_errors is not None) and (len(errors) >= max_errors):
+                    break
+
+        except jsonschema.exceptions.RefResolutionError:
+            self._warn_ref_failure()
+            raise
+
+        return errors
+
     def finalize(self):
         pass
 
+    def _get_streaming_validator(self):
+        """Get the (cached) `streaming.StreamingValidator` for this schema.
+        """
+        return self._cached("_streaming_validator", lambda: streaming.StreamingValidator(
+            self, resolver=self._get_ref_resolver()))
+
+    def _get_validator(self, compiled=None, set_defaults=True):
+        """Get the (cached) validator for this schema, either compiled or standard.
+
+        Standard validators are cached separately for each thread (see `SchemaDict`).
+        """
+        if compiled is None:
+            compiled = self.compiled
+
+        if compiled:
+            return self.compile(set_defaults=set_defaults)
+
+        # Construct and cache a validator for this thread
+        self._clear_if_changed()
+        local = self._local
+        attr = "validator" if set_defaults else "pure_validator"
+        validator = getattr(local, attr, None)
+        if validator is None:
+            resolver = self._get_ref_resolver()
+            validator = validation.PAS_Validator(
+                self, resolver=resolver, set_defaults=set_defaults)
+            setattr(local, attr, validator)
+
+        return validator
+
+    def _cached(self, attr, construct):
+        """Get the cached object stored in the named attribute, constructing it once if needed.
+        """
+        self._clear_if_changed()
+        value = getattr(self, attr)
+        if value is None:
+            with _LOCK:
+                value = getattr(self, attr)
+                if value is None:
+                    value = construct()
+                    setattr(self, attr, value)
+
+        return value
+
+    def _clear_if_changed(self):
+        """Remove all cached validators if this schema has been changed (see `version`).
+        """
+        version = self._version.count
+        if self._cache_version != version:
+            with _LOCK:
+                if self._cache_version != version:
+                    self._clear()
+                    self._cache_version = version
+        return
+
+    def _clear(self):
+        self._compiled_validator = None
+        self._pure_compiled_validator = None
+        self._columnar_validator = None
+        self._streaming_validator = None
+        self._defaults_plan = None
+        self._local = threading.local()
+        return
+
+    def __reduce_ex__(self, protocol):
+        # Items are restored before the state (which can freeze the schema), see `_restore`
+        return (_restore, (type(self), list(self.items()), self.__getstate__()))
+
+    def __getstate__(self):
+        # Cached validators are not copied (or pickled), they are reconstructed when needed
+        state = dict(self.__dict__)
+        for key in ["_compiled_validator", "_pure_compiled_validator", "_columnar_validator",
+                    "_streaming_validator", "_defaults_plan", "_local", "_version", "_hash",
+                    "_cache_version"]:
+            state.pop(key, None)
+        state["_frozen"] = self.frozen
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        frozen = state.pop("_frozen", False)
+        self.__dict__.update(state)
+        self._version = _Version()
+        self._track()
+        self._version.frozen = frozen
+        self._cache_version = None
+        self._clear()
+        return
+
+    def _warn_ref_failure(self):
+        myname = self.get('title', None)
+        if myname is None:
+            myname = self._name
+        if myname is None:
+            myname = str(self)
+        msg = "Reference resolution failure with: {}".format(myname)
+        warnings.warn(msg)
+        return
+
+    def _get_ref_resolver(self):
+        path = self._ref_path_formatted
+        # Use the cached contents of schema files, instead of reading them again
+        store = cache.CACHE.documents() if cache.ENABLED else ()
+        resolver = jsonschema.RefResolver(path, None, store=store) if (path is not None) else None
+        if resolver is None:
+            resolver = jsonschema.RefResolver.from_schema(self)
+        return resolver
+
     def extend(self, schema, **kwargs):
         kwargs.setdefault("check_conflict", True)
         # data = utils.get_schema_odict(schema)
@@ -164,6 +615,190 @@ class SchemaDict(JSONOrderedDict):
         return
 
 
+def _restore(cls, items, state):
+    """Reconstruct a copied (or pickled) `SchemaDict`, see `SchemaDict.__reduce_ex__`.
+    """
+    self = cls.__new__(cls)
+    OrderedDict.__init__(self, items)
+    self.__setstate__(state)
+    return self
+
+
+class _Version(object):
+    """Number of modifications made to a `SchemaDict`, shared with its (nested) values.
+    """
+    __slots__ = ("count", "frozen")
+
+    def __init__(self):
+        self.count = 0
+        self.frozen = False
+
+    def modify(self):
+        if self.frozen:
+            raise RuntimeError("This `SchemaDict` is frozen, cannot modify it!")
+        self.count += 1
+
+
+class _TrackedDict(dict):
+    """Dictionary within a `SchemaDict`, recording modifications in the shared `_Version`.
+
+    Copies (and pickles) are plain dictionaries, which are tracked again if added to a schema.
+    """
+    __slots__ = ("_version", "_kind")
+
+    def __reduce_ex__(self, protocol):
+        return (dict, (), None, None, iter(self.items()))
+
+    def __setitem__(self, key, val):
+        self._version.modify()
+        dict.__setitem__(self, key, _track_item(self._kind, key, val, self._version))
+
+    def __delitem__(self, key):
+        self._version.modify()
+        dict.__delitem__(self, key)
+
+    def clear(self):
+        self._version.modify()
+        dict.clear(self)
+
+    def pop(self, *args):
+        self._version.modify()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._version.modify()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, val in six.iteritems(dict(*args, **kwargs)):
+            self[key] = val
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+class _TrackedList(list):
+    """List within a `SchemaDict`, recording modifications in the shared `_Version`.
+    """
+    __slots__ = ("_version", "_kind")
+
+    def __reduce_ex__(self, protocol):
+        return (list, (), None, iter(self))
+
+    def _modify(self, values=()):
+        self._version.modify()
+        # Elements are in the same position as the list, e.g. the subschemas of 'anyOf'
+        return [_track_value(val, self._version, self._kind) for val in values]
+
+    def __setitem__(self, index, val):
+        val = self._modify(val if isinstance(index, slice) else [val])
+        list.__setitem__(self, index, val if isinstance(index, slice) else val[0])
+
+    def __delitem__(self, index):
+        self._modify()
+        list.__delitem__(self, index)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, num):
+        self._modify()
+        return list.__imul__(self, num)
+
+    def append(self, val):
+        list.append(self, self._modify([val])[0])
+
+    def extend(self, values):
+        list.extend(self, self._modify(values))
+
+    def insert(self, index, val):
+        list.insert(self, index, self._modify([val])[0])
+
+    def pop(self, *args):
+        self._modify()
+        return list.pop(self, *args)
+
+    def remove(self, val):
+        self._modify()
+        list.remove(self, val)
+
+    def clear(self):
+        self._modify()
+        list.clear(self)
+
+    def sort(self, *args, **kwargs):
+        self._modify()
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        self._modify()
+        list.reverse(self)
+
+
+def _track_value(value, version, kind):
+    """Get a version of `value` whose modifications (at any depth) are recorded in `version`.
+
+    `kind` is the position of the value within the schema: `_SCHEMA`, `_SCHEMA_MAP` or `_DATA`.
+    """
+    if isinstance(value, dict):
+        if (type(value) is _TrackedDict) and (value._version is version) and \
+                (value._kind == kind):
+            return value
+        tracked = _TrackedDict()
+        tracked._version = version
+        tracked._kind = kind
+        for key, val in six.iteritems(value):
+            dict.__setitem__(tracked, key, _track_item(kind, key, val, version))
+        return tracked
+
+    if isinstance(value, list):
+        if (type(value) is _TrackedList) and (value._version is version) and \
+                (value._kind == kind):
+            return value
+        tracked = _TrackedList(_track_value(val, version, kind) for val in value)
+        tracked._version = version
+        tracked._kind = kind
+        return tracked
+
+    return value
+
+
+def _track_item(kind, key, value, version):
+    """Track the value stored with the given `key` in a dictionary in position `kind`.
+
+    The 'default' of a (sub)schema is inserted into validated instances (see
+    `validation.PAS_Validator`), so it is stored without being tracked.
+    """
+    if kind == _SCHEMA:
+        if key == u"default":
+            return value
+        if key in _SCHEMA_MAP_KEYWORDS:
+            return _track_value(value, version, _SCHEMA_MAP)
+        if key in _SUBSCHEMA_KEYWORDS:
+            return _track_value(value, version, _SCHEMA)
+    elif kind == _SCHEMA_MAP:
+        return _track_value(value, version, _SCHEMA)
+
+    return _track_value(value, version, _DATA)
+
+
+def _hash_value(value):
+    """Hash a JSON value, consistently with equality (e.g. regardless of the order of keys).
+    """
+    if isinstance(value, dict):
+        return hash(frozenset((key, _hash_value(val)) for key, val in six.iteritems(value)))
+    if isinstance(value, list):
+        return hash(tuple(_hash_value(val) for val in value))
+    return hash(value)
+
+
 def _extend(aa, bb, copy_type='deep', check_conflict=False):
     """Add the key-values from `bb` into `aa`.
     """
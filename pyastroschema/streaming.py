@@ -0,0 +1,400 @@
+"""Validate (very large) JSON files incrementally, without loading them into memory at once.
+
+Catalog entries can contain hundreds of thousands of photometric points and spectra, which are
+each stored as elements of a top-level list (e.g. 'photometry', 'spectra', 'sources').  The
+`StreamingValidator` parses the file incrementally: each element of such a list is decoded,
+validated against the list's item-schema, and then discarded; so that memory usage is bounded
+by the size of the largest single element, regardless of the total file size.  All other
+(top-level) values are loaded normally, and validated once the end of the file is reached.
+
+Errors are reported with the same `path`s and messages as when validating the fully loaded
+object (except for lists violating 'maxItems', which are not stored), but the first error in
+*each* streamed item is reported (instead of only the first error overall).
+
+"""
+import json
+from collections import OrderedDict
+
+import six
+
+from jsonschema.exceptions import ValidationError
+
+from . import compiler
+
+# Size of blocks read from file, in characters
+_CHUNK_SIZE = 2**16
+_WHITESPACE = (' ', '\t', '\n', '\r')
+_NUMBER_CHARS = set('0123456789.eE+-')
+# Maximum length of incomplete tokens (e.g. 'Infinit' or '\\u12') whose decoding errors are
+# reported at their beginning, instead of at the end of the input
+_MAX_TOKEN_LENGTH = 16
+
+# Keywords of list schema which can be checked incrementally
+_STREAM_LIST_KEYWORDS = ["type", "items", "minItems", "maxItems"]
+# Keywords of the top-level schema which are compatible with streaming
+_STREAM_OBJECT_KEYWORDS = ["type", "properties", "required", "dependencies"]
+
+
+class StreamingValidator(object):
+    """Validate JSON files against an object schema, streaming the elements of large lists.
+    """
+
+    def __init__(self, schema, resolver=None, format_checker=None, stream_keys=None):
+        """Construct the validator for the given `schema`.
+
+        Arguments
+        ---------
+        schema : dict,
+            A valid JSON schema for the object stored in each file (e.g. an 'entry').
+        resolver : `jsonschema.RefResolver` or `None`,
+        format_checker : `jsonschema.FormatChecker` or `None`,
+        stream_keys : list of str or `None`,
+            Names of the properties whose elements should be streamed.  If `None`, all
+            properties which are specified as lists of items (e.g. 'photometry') are used.
+
+        """
+        self._compiler = compiler.CompiledValidator(
+            schema, resolver=resolver, format_checker=format_checker)
+        self.schema = schema
+
+        streams = OrderedDict()
+        if _is_streamable_object(schema):
+            # Properties are resolved within the scope of the top-level schema
+            scope = schema.get(u"id")
+            if scope:
+                self._compiler.resolver.push_scope(scope)
+            try:
+                for name, sub in six.iteritems(schema["properties"]):
+                    if (stream_keys is not None) and (name not in stream_keys):
+                        continue
+                    plan = self._list_plan(sub)
+                    if plan is not None:
+                        streams[name] = plan
+            finally:
+                if scope:
+                    self._compiler.resolver.pop_scope()
+
+        self._streams = streams
+
+        # Construct the validator for everything except the streamed lists
+        if len(streams) > 0:
+            skeleton = OrderedDict(schema)
+            props = OrderedDict((kk, vv) for kk, vv in six.iteritems(schema["properties"])
+                                if kk not in streams)
+            skeleton["properties"] = props
+            self._check_skeleton = self._compiler._compile(skeleton)
+        else:
+            self._check_skeleton = self._compiler._check
+
+        return
+
+    @property
+    def stream_keys(self):
+        return list(self._streams.keys())
+
+    def list_plan(self, name):
+        """Get the plan for streaming the named property, or `None` (see `_list_plan`).
+        """
+        return self._streams.get(name)
+
+    def iter_errors(self, fname):
+        """Yield the `ValidationError`s for the contents of the given file.
+        """
+        with open(fname, 'r') as inp:
+            reader = _StreamReader(inp)
+            reader.skip_ws()
+            # Only objects can be streamed, load anything else directly
+            if reader.peek() != '{':
+                error = self._compiler.check(reader.decode_value())
+                if error is not None:
+                    yield error
+                return
+
+            skeleton = OrderedDict()
+            for key, value in self._iter_object(reader, skeleton):
+                if value is not None:
+                    yield value
+
+        error = self._check_skeleton(skeleton)
+        if error is not None:
+            yield error
+
+        return
+
+    def validate(self, fname):
+        """Raise the first error found in the given file.
+        """
+        for error in self.iter_errors(fname):
+            raise error
+        return
+
+    def is_valid(self, fname):
+        return (next(self.iter_errors(fname), None) is None)
+
+    def _iter_object(self, reader, skeleton):
+        """Parse the top-level object, yielding `(key, error)` for each item in streamed lists.
+        """
+        reader.expect('{')
+        reader.skip_ws()
+        if reader.peek() == '}':
+            reader.expect('}')
+            return
+
+        while True:
+            reader.skip_ws()
+            key = reader.decode_value()
+            reader.skip_ws()
+            reader.expect(':')
+            reader.skip_ws()
+
+            plan = self._streams.get(key, None)
+            # Stream lists item-by-item
+            if (plan is not None) and (reader.peek() == '['):
+                # Store a placeholder, so that the presence of this key is recorded
+                skeleton[key] = None
+                for error in self._iter_list(reader, key, plan):
+                    yield key, error
+            else:
+                skeleton[key] = reader.decode_value()
+                # Check lists that were not streamed (e.g. not actually lists) normally
+                if plan is not None:
+                    error = plan[0](skeleton[key])
+                    if error is not None:
+                        yield key, _prefix_error(error, key)
+
+            reader.skip_ws()
+            ch = reader.next()
+            if ch == '}':
+                break
+            elif ch != ',':
+                raise ValueError("Expected ',' or '}}' at position {}, found '{}'!".format(
+                    reader.position, ch))
+
+        return
+
+    def _iter_list(self, reader, key, plan):
+        check_list, check_item, list_schema, min_items, max_items = plan
+        reader.expect('[')
+        reader.skip_ws()
+        num = 0
+        # Items of lists shorter than 'minItems', which are needed for its error message
+        head = []
+        if reader.peek() == ']':
+            reader.expect(']')
+        else:
+            while True:
+                reader.skip_ws()
+                item = reader.decode_value()
+                if (min_items is not None) and (num < min_items):
+                    head.append(item)
+                error = check_item(item)
+                if error is not None:
+                    error.path.appendleft(num)
+                    error.schema_path.appendleft("items")
+                    yield _prefix_error(error, key)
+
+                num += 1
+                reader.skip_ws()
+                ch = reader.next()
+                if ch == ']':
+                    break
+                elif ch != ',':
+                    raise ValueError("Expected ',' or ']' at position {}, found '{}'!".format(
+                        reader.position, ch))
+
+        # Check the list length constraints against the number of items
+        error = _length_error(list_schema, head, num, min_items, max_items)
+        if error is not None:
+            yield _prefix_error(error, key)
+
+        return
+
+    def _list_plan(self, schema):
+        """Determine whether a property schema describes a list whose items can be streamed.
+
+        Returns
+        -------
+        plan : tuple or `None`
+            `(check_list, check_item, list_schema, min_items, max_items)` or `None` if the list
+            cannot be streamed.
+
+        """
+        resolver = self._compiler.resolver
+        scopes = []
+        try:
+            # Follow references to the underlying list schema
+            while u"$ref" in schema:
+                scope = schema.get(u"id")
+                if scope:
+                    resolver.push_scope(scope)
+                    scopes.append(scope)
+                url, schema = resolver.resolve(schema[u"$ref"])
+                resolver.push_scope(url)
+                scopes.append(url)
+
+            kws = [kw for kw in schema if kw in compiler._KEYWORDS]
+            if (schema.get("type") != "array") or \
+                    any(kw not in _STREAM_LIST_KEYWORDS for kw in kws) or \
+                    (not isinstance(schema.get("items"), dict)):
+                return None
+
+            # Validator for the entire list, used for lists that are not streamed
+            check_list = self._compiler._compile(schema)
+            # Items are compiled within the scope of the list schema
+            scope = schema.get(u"id")
+            if scope:
+                resolver.push_scope(scope)
+                scopes.append(scope)
+            check_item = self._compiler._compile(schema["items"])
+        finally:
+            for ss in scopes:
+                resolver.pop_scope()
+
+        plan = (check_list, check_item, schema, schema.get("minItems"), schema.get("maxItems"))
+        return plan
+
+
+def validate_file(schema, fname, **kwargs):
+    """Validate the contents of the given file, see `StreamingValidator.validate`.
+    """
+    return StreamingValidator(schema, **kwargs).validate(fname)
+
+
+class _StreamReader(object):
+    """Minimal incremental JSON reader, built on `json.JSONDecoder.raw_decode`.
+    """
+
+    def __init__(self, stream, chunk_size=None):
+        self._stream = stream
+        self._chunk_size = _CHUNK_SIZE if (chunk_size is None) else chunk_size
+        self._buf = ""
+        self._pos = 0
+        # Number of characters discarded from the beginning of the buffer
+        self._offset = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder(object_pairs_hook=OrderedDict)
+        return
+
+    @property
+    def position(self):
+        return self._offset + self._pos
+
+    def _read(self, size=None):
+        """Read more data into the buffer, returns `False` if the end-of-file has been reached.
+        """
+        if self._eof:
+            return False
+
+        # Discard data which has already been parsed
+        if self._pos > 0:
+            self._offset += self._pos
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+
+        size = self._chunk_size if (size is None) else max(size, self._chunk_size)
+        data = self._stream.read(size)
+        if len(data) == 0:
+            self._eof = True
+            return False
+
+        self._buf += data
+        return True
+
+    def peek(self):
+        while self._pos >= len(self._buf):
+            if not self._read():
+                return ''
+        return self._buf[self._pos]
+
+    def next(self):
+        ch = self.peek()
+        self._pos += 1
+        return ch
+
+    def expect(self, char):
+        ch = self.next()
+        if ch != char:
+            raise ValueError("Expected '{}' at position {}, found '{}'!".format(
+                char, self.position - 1, ch))
+        return
+
+    def skip_ws(self):
+        while self.peek() in _WHITESPACE:
+            self._pos += 1
+        return
+
+    def decode_value(self):
+        """Decode the next complete JSON value from the stream.
+        """
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError as err:
+                # Value may be incomplete, read more (doubling the buffer to avoid quadratic cost).
+                # Other (syntax) errors are raised immediately, without reading the whole file
+                if _incomplete(err, self._buf) and self._read(len(self._buf) - self._pos):
+                    continue
+                raise
+
+            # Numbers may have been truncated (e.g. '1.5e-10' read as '1'), make sure the
+            # following character cannot continue the number
+            if (end >= len(self._buf)) or (self._buf[end] in _NUMBER_CHARS and
+                                           isinstance(value, (float, six.integer_types))):
+                if self._read(len(self._buf) - self._pos):
+                    continue
+
+            self._pos = end
+            return value
+
+
+def _incomplete(err, buf):
+    """Whether a decoding error may be due to the end of `buf`, i.e. more input is needed.
+    """
+    pos = getattr(err, "pos", None)
+    if pos is None:
+        return True
+    # Unterminated strings are reported at their beginning, but only occur at the end of `buf`
+    if err.msg.startswith("Unterminated string"):
+        return True
+    return pos >= len(buf) - _MAX_TOKEN_LENGTH
+
+
+def _is_streamable_object(schema):
+    kws = [kw for kw in schema if kw in compiler._KEYWORDS]
+    if "$ref" in schema:
+        return False
+    if any(kw not in _STREAM_OBJECT_KEYWORDS for kw in kws):
+        return False
+    # Dependencies given as schemas may depend on the values of streamed properties
+    deps = schema.get("dependencies", {})
+    if any(isinstance(dep, dict) for dep in deps.values()):
+        return False
+    return isinstance(schema.get("properties", None), dict)
+
+
+def _length_error(schema, head, num, min_items, max_items):
+    """Construct the error for a list of `num` items violating 'minItems' or 'maxItems'.
+
+    `head` contains the first items of the list (all of them, if it is shorter than 'minItems').
+    """
+    if (min_items is not None) and (num < min_items):
+        return ValidationError("%r is too short" % (head,), validator=u"minItems",
+                               validator_value=min_items, instance=head, schema=schema,
+                               schema_path=[u"minItems"])
+
+    if (max_items is not None) and (num > max_items):
+        # NOTE: long lists are not stored, so the message describes their length instead
+        return ValidationError("list of {} items is too long".format(num), validator=u"maxItems",
+                               validator_value=max_items, schema=schema,
+                               schema_path=[u"maxItems"])
+
+    return None
+
+
+def _prefix_error(error, key):
+    """Convert an error for an element of list `key` to the error path of the complete object.
+    """
+    error.path.appendleft(key)
+    error.schema_path.appendleft(key)
+    error.schema_path.appendleft("properties")
+    return error
@@ -1,40 +1,143 @@
 """Eventually this will be generalized from 'source' specifically to any 'struct'.
 """
 
+import numbers
+import threading
+import contextlib
 from copy import deepcopy
 
-from . import keys, schema
+import six
+
+from . import keys, schema, table, lazy, cache, utils
 
 VERBOSE = False
 
 EXTENDABLE = True
 
+# Default for whether `Struct.validate` only re-validates properties changed since the last call
+INCREMENTAL = False
+
+# Types of values which can be shared between copies of `Struct`s
+_IMMUTABLE_TYPES = six.string_types + (numbers.Number, type(None))
+# Attributes of `Struct`s which reference other objects, and should not be copied
+_REFERENCE_ATTRIBUTES = ["_parent", "_shared"]
+# Sentinel for arguments which were not given
+_UNSET = object()
+# Per-thread state, see `_read_only`
+_STATE = threading.local()
+
 
 def set_struct_schema(schema_source, extensions=[], updates=[],
-                      extendable=None, check_conflict=True, schema_class=schema.SchemaDict):
+                      extendable=None, check_conflict=True, schema_class=schema.SchemaDict,
+                      compiled=None):
     if extendable is None:
         extendable = EXTENDABLE
 
+    # Built-in schemas specified by name (or filename) can be stored in the persistent
+    # `cache.CACHE`, which is only invalidated by changes to the package's own schema files
+    cache_key = None
+    if cache.ENABLED and (schema_class is schema.SchemaDict):
+        sources = [cache._builtin_source(ss) for ss in [schema_source] + extensions + updates]
+        if all(ss is not None for ss in sources):
+            num = 1 + len(extensions)
+            cache_key = ("struct", sources[0], tuple(sources[1:num]), tuple(sources[num:]),
+                         check_conflict)
+
     def wrapper(cls):
-        schema_dict = schema_class(schema_source)
-        for ext in extensions:
-            schema_dict.extend(ext, check_conflict=check_conflict)
-        for upd in updates:
-            schema_dict.update(upd)
+        cached = None if (cache_key is None) else cache.CACHE.get(cache_key)
+        if cached is None:
+            schema_dict = schema_class(schema_source)
+            for ext in extensions:
+                schema_dict.extend(ext, check_conflict=check_conflict)
+            for upd in updates:
+                schema_dict.update(upd)
+            keychain = keys.Keychain(schema_dict, mutable=False, extendable=extendable)
+            if cache_key is not None:
+                cache.CACHE.set(cache_key, (schema_dict._cache_state(), keychain.keys()))
+        else:
+            schema_dict = schema_class._from_cache_state(cached[0])
+            keychain = keys.Keychain(schema_dict, mutable=False, extendable=extendable,
+                                     keys=cached[1])
+
+        if compiled is not None:
+            schema_dict.compiled = compiled
         cls._SCHEMA = schema_dict
-        cls._KEYCHAIN = keys.Keychain(schema_dict, mutable=False, extendable=extendable)
+        cls._KEYCHAIN = keychain
+        cls._DUPLICATE_PLAN = (cls._KEYCHAIN, duplicate_plan(cls._KEYCHAIN))
         cls._extendable = extendable
+        # Compact, column-based container for many instances, see `table.StructTable`
+        cls.Table = table.table_class(cls)
         return cls
 
     return wrapper
 
 
+def _is_immutable(value):
+    if isinstance(value, _IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, tuple):
+        return all(_is_immutable(vv) for vv in value)
+    return False
+
+
+def _cow_value(value, origin, owner):
+    """Copy a value shared between copies of a `Struct`, sharing everything possible.
+
+    Nested `Struct`s are copied with `Struct.cow_copy`, and are re-pointed from the `origin`
+    instance to their new `owner`.
+    """
+    if isinstance(value, Struct):
+        parent = value._parent
+        return value.cow_copy(parent=owner if (parent is origin) else parent)
+    if isinstance(value, list):
+        return [_cow_value(vv, origin, owner) for vv in value]
+    if isinstance(value, dict):
+        return type(value)((kk, _cow_value(vv, origin, owner)) for kk, vv in value.items())
+    if _is_immutable(value):
+        return value
+    return deepcopy(value)
+
+
+@contextlib.contextmanager
+def _read_only():
+    """Context in which the values of `Struct`s are only read (e.g. while encoding them as JSON).
+
+    Accessing values then neither copies those shared with other instances (see
+    `Struct.cow_copy`), nor flags them for re-validation (see `Struct.validate`).
+
+    """
+    prev = getattr(_STATE, "read_only", False)
+    _STATE.read_only = True
+    try:
+        yield
+    finally:
+        _STATE.read_only = prev
+
+
+def duplicate_plan(keychain):
+    """Construct the plan for comparing instances in `Struct.is_duplicate_of`.
+
+    Returns
+    -------
+    plan : tuple of (str, bool)
+        The name of each `unique` key, followed by each (non-unique) `distinguishing` key, and
+        whether it is `unique`.  Keys which are neither are irrelevant to comparisons.
+
+    """
+    unique = [(str(ky), True) for ky in keychain.keys() if ky.unique]
+    dist = [(str(ky), False) for ky in keychain.keys() if ky.distinguishing and not ky.unique]
+    return tuple(unique + dist)
+
+
 class Struct(schema.JSONOrderedDict):
 
     # _SCHEMA = None
     # _KEYCHAIN = None
     # _extendable = True
 
+    # Values shared with copies, mapped to the instance they were copied from, see `cow_copy`
+    _shared = None
+
     def __init__(self, parent=None, validate=True, **kwargs):
         """Initialize with parameters based on the associated schema.
 
@@ -45,15 +148,11 @@ class Struct(schema.JSONOrderedDict):
         # NOTE: this is needed for python2 but not python3, not sure why
         super(Struct, self).__init__()
 
-        _schema = getattr(self, "_SCHEMA", None)
-        if (_schema is None) or (not isinstance(_schema, schema.SchemaDict)):
-            raise ValueError("`_SCHEMA` is a required attribute and must be a `SchemaDict`!")
-
-        _keychain = getattr(self, "_KEYCHAIN", None)
-        if (_keychain is None) or (not isinstance(_keychain, keys.Keychain)):
-            raise ValueError("`_KEYCHAIN` is a required attribute and must be a `Keychain`!")
+        self._check_class()
 
         self._parent = parent
+        # Properties changed since the last successful validation (`None`: never validated)
+        self._dirty = None
 
         # Store parameters passed during initialization
         # NOTE: this is fine for `source`, but perhaps this should be a deepcopy for other objects?
@@ -66,6 +165,76 @@ class Struct(schema.JSONOrderedDict):
 
         return
 
+    @classmethod
+    def _check_class(cls):
+        """Make sure that this class has been configured with a schema and keychain.
+        """
+        _schema = getattr(cls, "_SCHEMA", None)
+        if (_schema is None) or (not isinstance(_schema, schema.SchemaDict)):
+            raise ValueError("`_SCHEMA` is a required attribute and must be a `SchemaDict`!")
+
+        _keychain = getattr(cls, "_KEYCHAIN", None)
+        if (_keychain is None) or (not isinstance(_keychain, keys.Keychain)):
+            raise ValueError("`_KEYCHAIN` is a required attribute and must be a `Keychain`!")
+
+        return
+
+    @classmethod
+    def from_records(cls, records, validate=True, parent=None):
+        """Construct instances of this class in bulk, from an iterable of dictionaries.
+
+        Equivalent to `[cls(parent=parent, validate=validate, **rec) for rec in records]`, but
+        the class configuration is checked only once, values are stored directly (instead of
+        through `__setitem__`), and validation uses the schema's compiled validator.
+
+        Arguments
+        ---------
+        records : iterable of dict
+            Parameters for each instance.
+        validate : bool
+            Whether to validate each instance, raising the first `ValidationError` found.
+        parent : object or `None`
+            Parent of all instances.
+
+        Returns
+        -------
+        structs : list of `Struct` instances
+
+        """
+        cls._check_class()
+        # Names of allowed properties, if restricted
+        names = None if cls._extendable else set(cls._KEYCHAIN.keys())
+        check = cls._SCHEMA.compile().check if validate else None
+
+        new = cls.__new__
+        init = schema.JSONOrderedDict.__init__
+        setitem = schema.JSONOrderedDict.__setitem__
+        structs = []
+        for rec in records:
+            if names is not None:
+                extra = [kk for kk in rec if kk not in names]
+                if len(extra) > 0:
+                    err = "'{}' not in `keychain`, and not extendable!".format(extra[0])
+                    raise RuntimeError(err)
+
+            obj = new(cls)
+            init(obj)
+            obj._parent = parent
+            obj._dirty = None
+            for kk, vv in rec.items():
+                setitem(obj, kk, vv)
+
+            structs.append(obj)
+
+        if validate:
+            for obj in structs:
+                error = check(obj)
+                if error is not None:
+                    raise error
+                obj._dirty = set()
+
+        return structs
+
     def __setitem__(self, name, value):
         """Control what dictionary elements can be added.
 
@@ -79,8 +248,92 @@ class Struct(schema.JSONOrderedDict):
             raise RuntimeError(err)
 
         super(Struct, self).__setitem__(name, value)
+        self._mark(name)
+        if self._shared:
+            self._shared.pop(name, None)
+        return
+
+    def __getitem__(self, name):
+        value = super(Struct, self).__getitem__(name)
+        if getattr(_STATE, "read_only", False):
+            return value
+        # Values shared with copies (see `cow_copy`) must be copied before they can be modified
+        if self._shared and (name in self._shared):
+            value = self._unshare(name, value)
+        # Mutable values can be modified in place, so they must be re-validated (see `validate`)
+        if isinstance(value, (list, dict)):
+            self._mark(name)
+        return value
+
+    def __delitem__(self, name):
+        super(Struct, self).__delitem__(name)
+        self._mark(name)
+        if self._shared:
+            self._shared.pop(name, None)
+        return
+
+    def get(self, name, default=None):
+        # NOTE: this can return mutable values, which must be handled as by `__getitem__`
+        return self[name] if (name in self) else default
+
+    def items(self):
+        if not getattr(_STATE, "read_only", False):
+            self._unshare_all()
+            self._mark_mutable()
+        return super(Struct, self).items()
+
+    def values(self):
+        if not getattr(_STATE, "read_only", False):
+            self._unshare_all()
+            self._mark_mutable()
+        return super(Struct, self).values()
+
+    def pop(self, name, *args):
+        self._mark(name)
+        if self._shared:
+            self._shared.pop(name, None)
+        return super(Struct, self).pop(name, *args)
+
+    def popitem(self, *args, **kwargs):
+        item = super(Struct, self).popitem(*args, **kwargs)
+        self._mark(item[0])
+        if self._shared:
+            self._shared.pop(item[0], None)
+        return item
+
+    def setdefault(self, name, value=None):
+        if name not in self:
+            self[name] = value
+        return self[name]
+
+    def clear(self):
+        for name in self.keys():
+            self._mark(name)
+        super(Struct, self).clear()
         return
 
+    def __repr__(self):
+        with _read_only():
+            return super(Struct, self).__repr__()
+
+    def __str__(self):
+        with _read_only():
+            return super(Struct, self).__str__()
+
+    def dump(self, fname, sort_func=None, **kwargs):
+        """Write to the given filename as JSON, see `utils.json_dump_stream` for `kwargs`.
+        """
+        package = self if sort_func is None else sort_func(self)
+        with _read_only():
+            return utils.json_dump_file(package, fname, **kwargs)
+
+    def dumps(self, sort_func=None, **kwargs):
+        """Construct a JSON string, see `utils.json_dump_str` for `kwargs`.
+        """
+        package = self if sort_func is None else sort_func(self)
+        with _read_only():
+            return utils.json_dump_str(package, **kwargs)
+
     def __copy__(self):
         """
 
@@ -90,8 +343,12 @@ class Struct(schema.JSONOrderedDict):
         result = cls.__new__(cls)
         # Copy attributes
         result.__dict__.update(self.__dict__)
-        # Copy dictionary entries
-        result.update(self)
+        # Copy dictionary entries (values which are shared with other copies remain so)
+        setitem = schema.JSONOrderedDict.__setitem__
+        for kk, vv in super(Struct, self).items():
+            setitem(result, kk, vv)
+        result._dirty = None if (self._dirty is None) else set(self._dirty)
+        result._shared = dict(self._shared) if self._shared else None
         return result
 
     def __deepcopy__(self, memo):
@@ -104,11 +361,66 @@ class Struct(schema.JSONOrderedDict):
         memo[id(self)] = result
         # Copy attributes
         for kk, vv in self.__dict__.items():
+            if kk in _REFERENCE_ATTRIBUTES:
+                continue
             setattr(result, kk, deepcopy(vv, memo))
+
+        # The parent is not copied, unless it is itself being copied (e.g. the parent `Entry`)
+        parent = getattr(self, "_parent", None)
+        result._parent = memo.get(id(parent), parent)
+        result._shared = None
+
         # Copy dictionary entries
-        for kk, vv in self.items():
+        for kk, vv in super(Struct, self).items():
             result[kk] = deepcopy(vv, memo)
 
+        result._dirty = None if (self._dirty is None) else set(self._dirty)
+        return result
+
+    def cow_copy(self, parent=_UNSET):
+        """Construct a copy of this instance which shares values with it until they are modified.
+
+        Constructing the copy only requires a shallow copy of the top-level dictionary.
+        Mutable values (lists, dictionaries and nested `Struct`s) are then shared by both
+        instances, and are (recursively) copied by each instance the first time that they are
+        accessed (e.g. `self['photometry']`).  Nested `Struct`s are copied in the same way, so
+        that accessing e.g. `copy['photometry'][10]['magnitude']` copies the list of photometry
+        and lazily copies each element, instead of (deep-)copying all of the values.
+
+        The `_parent` of nested `Struct`s are re-pointed to the instance which holds them, while
+        the `_parent` of the copy itself is the same object as for this instance (not a copy).
+
+        Arguments
+        ---------
+        parent : object
+            Parent of the new copy, by default the same as for this instance.
+
+        Returns
+        -------
+        result : `Struct`
+            New instance of the same class as this one.
+
+        """
+        cls = self.__class__
+        result = cls.__new__(cls)
+        schema.JSONOrderedDict.__init__(result)
+        result.__dict__.update(self.__dict__)
+        if parent is not _UNSET:
+            result._parent = parent
+        result._dirty = None if (self._dirty is None) else set(self._dirty)
+
+        # Each shared value is tracked along with its 'origin': the instance originally holding it
+        shared = self._shared
+        if shared is None:
+            shared = self._shared = {}
+        result._shared = {}
+
+        setitem = schema.JSONOrderedDict.__setitem__
+        for kk, vv in super(Struct, self).items():
+            setitem(result, kk, vv)
+            if not _is_immutable(vv):
+                result._shared[kk] = shared.setdefault(kk, self)
+
         return result
 
     @classmethod
@@ -128,14 +440,185 @@ class Struct(schema.JSONOrderedDict):
     def extendable(self):
         return self._extendable
 
-    def validate(self):
+    def validate(self, incremental=None):
         """Check for consistency between the stored parameters and schema.
+
+        After a successful validation, changes to this instance (setting, deleting, updating
+        items) are tracked, and (if `incremental`) only the properties which have changed are
+        re-validated, along with the object-level constraints of the schema (e.g. 'required').
+        Full validation is used if the schema cannot be decomposed into individual properties
+        (see `compiler.CompiledValidator.decompose`).
+
+        Mutable values (lists and dictionaries) can be modified in place, so they are flagged
+        for re-validation whenever they are accessed (e.g. `self['photometry'].append(...)`,
+        through `get`, `items` or `values`).  Reading values internally (e.g. to encode them as
+        JSON, or in `is_duplicate_of`) does not flag them.  Changes made through other references
+        to them must be flagged with `mark_dirty`.
+
+        NOTE: if there are several errors, incremental validation checks the changed properties
+              before the object-level constraints, so the error raised can differ from that of
+              full validation.
+
+        Arguments
+        ---------
+        incremental : bool or `None`
+            Whether to only re-validate changed properties.  If `None`, `INCREMENTAL` is used
+            (by default `False`, i.e. full validation).
+
+        """
+        if incremental is None:
+            incremental = INCREMENTAL
+
+        dirty = getattr(self, "_dirty", None)
+        decomp = None
+        if incremental and (dirty is not None):
+            decomp = self.schema.compile().decompose()
+
+        if decomp is None:
+            # Use the validator in the stored `SchemaDict` instance to validate `self`
+            self.schema.validate(self)
+        else:
+            self._validate_properties(dirty, *decomp)
+
+        self._dirty = set()
+        return
+
+    def mark_dirty(self, *names):
+        """Flag the given properties as modified, so that they are re-validated by `validate`.
+
+        If no `names` are given, the next validation will be a full one.
+
         """
-        # jsonschema.validate(self, self._schema)
-        # self._validator.validate(self)
+        if len(names) == 0:
+            self._dirty = None
+
+        for name in names:
+            self._mark(name)
+
+        return
+
+    def _unshare(self, name, value):
+        """Replace a value shared with other copies by a (copy-on-write) copy of it.
+        """
+        origin = self._shared.pop(name)
+        value = _cow_value(value, origin, self)
+        schema.JSONOrderedDict.__setitem__(self, name, value)
+        return value
+
+    def _unshare_all(self):
+        if self._shared:
+            for name in list(self._shared.keys()):
+                self[name]
+        return
+
+    def _peek(self, name):
+        """Get a stored value only to read it, see `_read_only`.
+        """
+        return super(Struct, self).__getitem__(name)
+
+    def _mark(self, name):
+        dirty = getattr(self, "_dirty", None)
+        if dirty is not None:
+            dirty.add(name)
+        return
+
+    def _mark_mutable(self):
+        dirty = getattr(self, "_dirty", None)
+        if dirty is not None:
+            dirty.update(name for name, value in super(Struct, self).items()
+                         if isinstance(value, (list, dict)))
+        return
+
+    def _validate_properties(self, names, check_object, check_props, defaults):
+        """Validate the given properties individually, and then all object-level constraints.
+        """
+        # Check properties in the order given by the schema
+        for name in [nn for nn in check_props if nn in names]:
+            # Restore default values of deleted properties, as would be done by full validation
+            if (name not in self) and (name in defaults):
+                super(Struct, self).__setitem__(name, defaults[name])
+
+            if name not in self:
+                continue
+
+            error = check_props[name](self[name])
+            if error is not None:
+                error.path.appendleft(name)
+                error.schema_path.appendleft(name)
+                error.schema_path.appendleft("properties")
+                raise error
+
+        error = check_object(self)
+        if error is not None:
+            raise error
+
+        return
+
+    @classmethod
+    def open(cls, fname, validate=True):
+        """Open a JSON file lazily, so that each value is only decoded when it is accessed.
+
+        The file is memory-mapped, and each property (and each element of lists, e.g. the
+        'photometry' of an `Entry`) is decoded and validated when it is first accessed.  See
+        `lazy.open_struct`.
+
+        """
+        return lazy.open_struct(cls, fname, validate=validate)
+
+    @classmethod
+    def validate_many(cls, data, **kwargs):
+        """Validate each element of the iterable `data` against this class's schema.
+
+        Elements are typically plain dictionaries, and no instances are constructed.  See
+        `SchemaDict.validate_many` for arguments and return values.
+
+        """
+        return cls._SCHEMA.validate_many(data, **kwargs)
+
+    @classmethod
+    def validate_columns(cls, columns):
+        """Validate columnar data against this class's schema, see `SchemaDict.validate_columns`.
+        """
+        return cls._SCHEMA.validate_columns(columns)
+
+    @classmethod
+    def validate_file(cls, fname, **kwargs):
+        """Validate a JSON file incrementally against this class's schema.
+
+        The file is never loaded entirely into memory, see `SchemaDict.validate_file`.
+
+        """
+        return cls._SCHEMA.validate_file(fname, **kwargs)
+
+    @classmethod
+    def _get_duplicate_plan(cls):
+        """Get the (cached) comparison plan for this class, see `duplicate_plan`.
+        """
+        plan = getattr(cls, "_DUPLICATE_PLAN", None)
+        # Classes constructed without `set_struct_schema` (or sub-classes with a different
+        # keychain) need the plan to be constructed
+        if (plan is None) or (plan[0] is not cls._KEYCHAIN):
+            plan = (cls._KEYCHAIN, duplicate_plan(cls._KEYCHAIN))
+            cls._DUPLICATE_PLAN = plan
+
+        return plan[1]
+
+    def _check_keychain(self, other, verbose=False):
+        """Make sure that the keychains of two instances contain identical keys.
+        """
+        s_keys = self.keychain.keys()
+        o_keys = other.keychain.keys()
+        for ky in set(s_keys + o_keys):
+            # note: this may produce error if a key-chain mismatch occurs... not sure if possible
+            s_key = getattr(self.keychain, ky.upper())
+            o_key = getattr(other.keychain, ky.upper())
+            # Make sure the two versions of this key are identical
+            if not s_key.equals(o_key, identical=True):
+                if verbose:
+                    print("key mismatch!")
+                err = "key mismatch occurred! '{}' --- '{}'".format(repr(self), repr(other))
+                raise RuntimeError(err)
 
-        # Use the validator in the stored `SchemaDict` instance to validate `self`
-        self.schema.validate(self)
         return
 
     def is_duplicate_of(self, other, ignore_case=True, verbose=None):
@@ -150,6 +633,9 @@ class Struct(schema.JSONOrderedDict):
         duplicates.  If any `distinguishing` elements are mismatched, the instances are not
         duplicates.  Currently not checking is done to make sure these tests are consistent.
 
+        Keys are compared following the plan constructed (once per class) by `duplicate_plan`:
+        `unique` keys first, and then `distinguishing` ones.
+
         """
         if verbose is None:
             verbose = VERBOSE
@@ -162,38 +648,16 @@ class Struct(schema.JSONOrderedDict):
 
         DEFAULT_BEHAVIOR = True
 
-        s_keys = self.keychain.keys()
-        o_keys = other.keychain.keys()
-        keys = set(s_keys + o_keys)
-        # NOTE: speed-up comparison by getting 'uniqe'-specific list
-        #    perhaps also specific list for `Key`s that are set
-        for ky in keys:
+        # Keychains of the same class are identical, otherwise compare each key explicitly
+        if other.keychain is not self.keychain:
+            self._check_keychain(other, verbose)
+
+        for ky, unique in self._get_duplicate_plan():
             if verbose:
                 print("key: '{}'".format(ky))
-            # note: this may produce error if a key-chain mismatch occurs... not sure if possible
-            s_key = getattr(self.keychain, ky.upper())
-            o_key = getattr(other.keychain, ky.upper())
-            # Make sure the two versions of this key are identical
-            if not s_key.equals(o_key, identical=True):
-                if verbose:
-                    print("key mismatch!")
-                err = "key mismatch occurred! '{}' --- '{}'".format(repr(self), repr(other))
-                raise RuntimeError(err)
-
-            # If neither Key is unique or distinguishing, then comparison doesnt matter
-            s_uniq = s_key.unique
-            o_uniq = o_key.unique
-            s_dist = s_key.distinguishing
-            o_dist = o_key.distinguishing
-            # note: only 2 checks are needed here, as above both versions of key are compared
-            if (not s_dist and not o_dist and not s_uniq and not o_uniq):
-                if verbose:
-                    print("not unique or distinguishing")
-                continue
 
-            # key must be unique of distinguishing to matter
-            kis = (str(ky) in self) and (s_uniq or s_dist)
-            kio = (str(ky) in other) and (o_uniq or o_dist)
+            kis = (ky in self)
+            kio = (ky in other)
             # If only one object has this parameter, not the same
             if kis != kio:
                 if verbose:
@@ -203,29 +667,22 @@ class Struct(schema.JSONOrderedDict):
             # If neither has parameter
             if not kis:
                 if verbose:
-                    print("kis: {}, {}".format((ky in self), kis))
-                    print("kio: {}, {}".format((ky in other), kio))
                     print("key absent")
                 continue
 
-            # Already established that both instances have this key; get the values
-            s_val = self[ky]
-            o_val = other[ky]
             # established that keys are either unique or distinguishing; thus diff means not dup
-            if s_val != o_val:
+            if self._peek(ky) != other._peek(ky):
                 if verbose:
                     print("value mismatch")
                 return False
             # If the same, and unique, then yes duplicates
-            elif (s_uniq or o_uniq):
+            elif unique:
                 if verbose:
                     print("unique value match")
                 return True
             # If not unique and values match, indeterminate... continue
-            else:
-                if verbose:
-                    print("non-'unique' matching")
-                pass
+            elif verbose:
+                print("non-'unique' matching")
 
         if verbose:
             print("No determinant (mis)matches, returning default: '{}'".format(DEFAULT_BEHAVIOR))
@@ -257,3 +714,10 @@ class Spectrum(Struct):
 @set_struct_schema("entry")
 class Entry(Struct):
     pass
+
+
+# Compact storage of (many) instances of each class
+PhotometryTable = Photometry.Table
+SpectrumTable = Spectrum.Table
+QuantityTable = Quantity.Table
+SourceTable = Source.Table
@@ -0,0 +1,290 @@
+"""Compact, column-based storage for large numbers of `Struct` instances (e.g. photometry).
+
+Each `Struct` instance is an `OrderedDict` with its own instance `__dict__`, so that storing
+millions of them (e.g. the points of many light-curves) is dominated by per-object overhead.
+A `StructTable` instead stores each property as a single column: numbers and booleans in typed
+`array.array`s, and everything else in lists of (interned) values.  Rows are accessed through
+light-weight, read-only `RowView`s, and real `Struct` instances (or JSON) are constructed only
+when needed.
+
+Table classes are constructed for each `Struct` subclass by `struct.set_struct_schema`, e.g.
+`Photometry.Table`, which is also available as `struct.PhotometryTable`.
+
+"""
+import sys
+import array
+from collections import OrderedDict
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+import six
+
+from . import utils
+
+# Typecodes of `array.array`s used to store columns of each (exact) python type
+_ARRAY_TYPES = {float: 'd', bool: 'b'}
+for _tt in six.integer_types:
+    _ARRAY_TYPES[_tt] = 'q'
+
+
+class _Column(object):
+    """Values of a single property, for all rows of a table.
+    """
+
+    __slots__ = ('values', 'mask', 'kind')
+
+    def __init__(self, size):
+        # Value type of the column, `None` for a generic list
+        self.kind = None
+        self.values = [None] * size
+        # Presence of each value (`None` if all are present)
+        self.mask = bytearray(size)
+        return
+
+    def append(self, value):
+        values = self.values
+        kind = type(value)
+        if kind is not self.kind:
+            # Use a typed array while all values (so far) are of the same numeric type
+            if (len(values) == 0) and (kind in _ARRAY_TYPES):
+                self.values = values = array.array(_ARRAY_TYPES[kind])
+                self.kind = kind
+            elif self.kind is not None:
+                self.values = values = [self.kind(vv) for vv in values]
+                self.kind = None
+
+        # NOTE: only exact `str` can be interned, not subclasses (e.g. `numpy.str_`)
+        if kind is str:
+            value = sys.intern(value)
+
+        try:
+            values.append(value)
+        except (OverflowError, TypeError):
+            # Value does not fit in the typed array (e.g. very large integers)
+            self.values = values = [self.kind(vv) for vv in values]
+            self.kind = None
+            values.append(value)
+
+        if self.mask is not None:
+            self.mask.append(1)
+        return
+
+    def append_missing(self):
+        if self.mask is None:
+            self.mask = bytearray(b'\x01') * len(self.values)
+
+        if self.kind is None:
+            self.values.append(None)
+        else:
+            self.values.append(self.kind())
+        self.mask.append(0)
+        return
+
+    def has(self, index):
+        return (self.mask is None) or bool(self.mask[index])
+
+    def get(self, index):
+        value = self.values[index]
+        if self.kind is bool:
+            value = bool(value)
+        return value
+
+    def finalize(self):
+        """Drop the mask if all values are present.
+        """
+        if (self.mask is not None) and (self.mask.count(0) == 0):
+            self.mask = None
+        return
+
+
+class RowView(Mapping):
+    """Read-only view of a single row of a `StructTable`, behaving like a (read-only) `Struct`.
+    """
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+        return
+
+    def __getitem__(self, name):
+        col = self._table._columns.get(name)
+        if (col is None) or (not col.has(self._index)):
+            raise KeyError(name)
+        return col.get(self._index)
+
+    def __contains__(self, name):
+        col = self._table._columns.get(name)
+        return (col is not None) and col.has(self._index)
+
+    def __iter__(self):
+        index = self._index
+        for name, col in six.iteritems(self._table._columns):
+            if col.has(index):
+                yield name
+
+    def __len__(self):
+        return sum(1 for name in self)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, dict(self))
+
+    def __str__(self):
+        return utils.json_dump_str(self.to_dict())
+
+    @property
+    def keychain(self):
+        return self._table._STRUCT._KEYCHAIN
+
+    @property
+    def schema(self):
+        return self._table._STRUCT._SCHEMA
+
+    def to_dict(self):
+        """Construct an `OrderedDict` with the values of this row.
+        """
+        index = self._index
+        return OrderedDict((name, col.get(index))
+                           for name, col in six.iteritems(self._table._columns)
+                           if col.has(index))
+
+    def to_struct(self, validate=False):
+        """Construct an instance of the associated `Struct` class, with the values of this row.
+        """
+        return self._table._STRUCT(validate=validate, **self.to_dict())
+
+    def is_duplicate_of(self, other, **kwargs):
+        return self.to_struct().is_duplicate_of(_as_struct(other), **kwargs)
+
+
+class StructTable(object):
+    """Column-based storage of the values of many instances of a `Struct` class.
+
+    Sub-classes are constructed for each `Struct` subclass by `table_class`.
+
+    """
+
+    _STRUCT = None
+
+    def __init__(self, records=None):
+        """Initialize the table, optionally adding the given `records` (dictionaries).
+        """
+        if self._STRUCT is None:
+            raise ValueError("`_STRUCT` must be set, use the `Table` attribute of a `Struct`!")
+
+        self._columns = OrderedDict()
+        self._size = 0
+        if records is not None:
+            self.extend(records)
+        return
+
+    @classmethod
+    def from_records(cls, records):
+        """Construct a table from an iterable of dictionaries (or `Struct` instances).
+        """
+        return cls(records)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._size
+        if not (0 <= index < self._size):
+            raise IndexError("Index {} out of range for table of size {}!".format(
+                index, self._size))
+        return RowView(self, index)
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield RowView(self, index)
+
+    def __repr__(self):
+        return "{}(rows={}, columns={})".format(
+            type(self).__name__, self._size, list(self._columns.keys()))
+
+    @property
+    def columns(self):
+        return list(self._columns.keys())
+
+    def column(self, name, missing=None):
+        """Get a list of all values of the named property, using `missing` for absent values.
+        """
+        col = self._columns.get(name)
+        if col is None:
+            return [missing] * self._size
+
+        return [col.get(ii) if col.has(ii) else missing for ii in range(self._size)]
+
+    def append(self, record):
+        """Add a single record (dictionary, or `Struct` instance) as a new row.
+        """
+        struct = self._STRUCT
+        columns = self._columns
+        size = self._size
+        # Check all names before modifying any column, so that a bad record leaves no partial row
+        if not struct._extendable:
+            for name in record:
+                if (name not in columns) and (name not in struct._KEYCHAIN):
+                    err = "'{}' not in `keychain`, and not extendable!".format(name)
+                    raise RuntimeError(err)
+
+        for name, value in six.iteritems(record):
+            col = columns.get(name)
+            if col is None:
+                col = _Column(size)
+                columns[name] = col
+
+            col.append(value)
+
+        self._size = size = size + 1
+        for col in six.itervalues(columns):
+            if len(col.values) < size:
+                col.append_missing()
+
+        return
+
+    def extend(self, records):
+        """Add each of the given records as new rows.
+        """
+        for rec in records:
+            self.append(rec)
+
+        for col in six.itervalues(self._columns):
+            col.finalize()
+        return
+
+    def to_records(self):
+        """Construct a list of `OrderedDict` for all rows.
+        """
+        return [row.to_dict() for row in self]
+
+    def to_structs(self, validate=False):
+        """Construct a list of instances of the associated `Struct` class, for all rows.
+        """
+        return [row.to_struct(validate=validate) for row in self]
+
+    def dumps(self, **kwargs):
+        """Construct a JSON string of the list of all rows, see `utils.json_dump_str` for `kwargs`.
+        """
+        return utils.json_dump_str(self.to_records(), **kwargs)
+
+    def validate(self, **kwargs):
+        """Validate all rows, see `SchemaDict.validate_many` for arguments and return values.
+        """
+        return self._STRUCT._SCHEMA.validate_many((row.to_dict() for row in self), **kwargs)
+
+
+def table_class(struct_class):
+    """Construct a `StructTable` subclass for storing instances of the given `Struct` class.
+    """
+    name = struct_class.__name__ + "Table"
+    return type(name, (StructTable,), {"_STRUCT": struct_class})
+
+
+def _as_struct(item):
+    return item.to_struct() if isinstance(item, RowView) else item
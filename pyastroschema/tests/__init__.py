@@ -0,0 +1,26 @@
+"""Tests for `pyastroschema`.
+
+Benchmarks (the `test_benchmark_*` functions, see `benchmark`) are skipped unless the
+environment variable `PYASTROSCHEMA_BENCHMARKS` is set, e.g.:
+    $ PYASTROSCHEMA_BENCHMARKS=1 nosetests -s path/to/test_file.py
+
+"""
+import os
+import functools
+from unittest import SkipTest
+
+# Whether benchmarks are run (instead of being skipped)
+BENCHMARKS = (os.environ.get("PYASTROSCHEMA_BENCHMARKS", "0").lower()
+              not in ["", "0", "false", "no"])
+
+
+def benchmark(func):
+    """Decorator for benchmarks, which only print timings, and are skipped unless `BENCHMARKS`.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not BENCHMARKS:
+            raise SkipTest("Benchmarks are only run if `PYASTROSCHEMA_BENCHMARKS` is set")
+        return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,158 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import re
+import copy
+import json
+import timeit
+
+from nose.tools import assert_true, assert_false
+
+from pyastroschema import bundle, keys
+from pyastroschema.schema import SchemaDict
+from pyastroschema.struct import Entry
+from pyastroschema.tests import benchmark
+
+# Number of photometry points in the entry used in benchmarks
+BENCHMARK_NUM_POINTS = int(os.environ.get("PYASTROSCHEMA_BENCH_BUNDLE_POINTS", 200))
+
+SRC = dict(alias="1", name="Someone")
+PHOT = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+ENTRIES = [
+    dict(name="sn1990a", sources=[SRC], photometry=[PHOT, PHOT]),
+    dict(name="sn1990a", sources=[SRC], redshift=[dict(value="0.1", source="1")]),
+    dict(name="sn1990a", sources=[SRC], redshift=dict(value="0.1", source="1"), ra="1:2:3"),
+    dict(name="sn1990a", sources=[SRC], photometry=[PHOT, dict(PHOT, magnitude="bright")]),
+    dict(name="sn1990a", sources=[SRC], photometry=[dict(PHOT, time=[1, "a"])]),
+    dict(name="sn1990a", sources=[SRC], photometry=[]),
+    dict(name="sn1990a", sources=[dict(name=3)]),
+    dict(name="sn1990a", sources=[SRC], redshift=[dict(value="0. 1", source="1")]),
+    dict(name="sn", sources=[SRC]),
+    dict(name=3, sources=[SRC]),
+    dict(sources=[SRC]),
+]
+
+
+def _errors(schema_dict, data, compiled=False):
+    errors = []
+    for item in data:
+        item = copy.deepcopy(item)
+        if compiled:
+            found = [schema_dict.compile().check(item)]
+            found = [err for err in found if err is not None]
+        else:
+            found = schema_dict._get_validator(False).iter_errors(item)
+        errors.append(sorted((list(err.path), list(err.schema_path), err.message)
+                             for err in found))
+    return errors
+
+
+def test_bundle():
+    print("test_bundle.test_bundle()")
+    for name, data in [("entry", ENTRIES),
+                       ("photometry", [PHOT, dict(PHOT, magnitude=[1]), dict(PHOT, time="x")]),
+                       ("source", [SRC, dict(alias=1), dict(name="x", alias="2", url=3)])]:
+        schema_dict = SchemaDict(name)
+        bundled = schema_dict.bundle()
+        assert_true(isinstance(bundled, SchemaDict))
+        assert_false("$ref" in json.dumps(bundled))
+        assert_true(bundled._name == schema_dict._name)
+        # The original schema is unchanged
+        assert_true(schema_dict == SchemaDict(name))
+
+        # Errors are identical, including their paths
+        for compiled in [False, True]:
+            errors = _errors(schema_dict, data, compiled=compiled)
+            assert_true(errors == _errors(bundled, data, compiled=compiled))
+            assert_true(any(len(err) > 0 for err in errors))
+            assert_true(len(errors[0]) == 0)
+
+        # Property attributes (used for keys) are kept, while 'type' and 'format' are resolved
+        for k1, k2 in zip(keys.Keychain(schema_dict).keys(), keys.Keychain(bundled).keys()):
+            assert_true(k1 == k2)
+            for attr in ['unique', 'distinguishing', 'no_source', 'priority', 'kind_preference']:
+                assert_true(getattr(k1, attr) == getattr(k2, attr))
+
+    # Bundled schema do not need to be loaded from their original location
+    bundled = SchemaDict(json.loads(json.dumps(Entry._SCHEMA.bundle())))
+    assert_true(_errors(bundled, ENTRIES) == _errors(Entry._SCHEMA, ENTRIES))
+    return
+
+
+def test_bundle_recursive():
+    print("test_bundle.test_bundle_recursive()")
+    node = dict(type="object", properties=dict(value={"$ref": "#/definitions/value"},
+                                               child={"$ref": "#/definitions/node"}))
+    schema = dict(definitions=dict(node=node, value=dict(type="integer")),
+                  properties=dict(tree={"$ref": "#/definitions/node"},
+                                  root={"$ref": "#", "description": "Recursive."},
+                                  count={"$ref": "#/definitions/value", "minimum": 100}))
+    bundled = bundle.bundle_schema(schema)
+    assert_true(bundled["properties"]["root"]["description"] == "Recursive.")
+    assert_false("minimum" in bundled["properties"]["count"])
+    refs = set(["#/definitions/" + name for name in bundled["definitions"]
+                if name.startswith(bundle._DEFINITION_PREFIX)])
+    assert_true(len(refs) == 1)
+    text = json.dumps(bundled)
+    assert_true(set(re.findall(r'"\$ref": "([^"]*)"', text)) == refs | set(["#"]))
+    # Recursion is not unrolled: each recursive target is only included once
+    assert_true(text.count('"child"') == 2)
+
+    data = [dict(tree=dict(child=dict(child=dict(value=1)))),
+            dict(tree=dict(child=dict(child=dict(value="1")))),
+            dict(root=dict(root=dict(tree=dict(child=dict(value=2.5))))),
+            dict(root=dict(count=2)),
+            dict(root=dict(root=dict(count="2")))]
+    errors = _errors(SchemaDict(schema), data)
+    assert_true(errors == _errors(SchemaDict(bundled), data))
+    assert_true([len(err) > 0 for err in errors] == [False, True, True, False, True])
+    return
+
+
+def test_bundled_files():
+    print("test_bundle.test_bundled_files()")
+    from pyastroschema import PATHS, utils
+    from pyastroschema.__main__ import get_schema_filenames
+
+    # Bundled files (written by `python -m pyastroschema`) are shipped, and are up to date
+    fnames = sorted(os.listdir(PATHS.BUNDLE_DIR))
+    assert_true("entry.json" in fnames)
+    for fname in get_schema_filenames():
+        base = os.path.basename(fname)
+        if base == os.path.basename(PATHS.META_SCHEMA_FILE):
+            continue
+        assert_true(base in fnames)
+        bundled = utils.json_load_file(os.path.join(PATHS.BUNDLE_DIR, base))
+        assert_true(bundled == json.loads(json.dumps(SchemaDict(fname).bundle())))
+
+    return
+
+
+@benchmark
+def test_benchmark_bundle():
+    print("test_bundle.test_benchmark_bundle()")
+    NUM = 5
+    data = dict(ENTRIES[1], photometry=[dict(PHOT, e_magnitude=ii*0.01)
+                                        for ii in range(BENCHMARK_NUM_POINTS)])
+    bundled = Entry._SCHEMA.bundle()
+    t_bundle = min(timeit.repeat(Entry._SCHEMA.bundle, number=1, repeat=3))
+    print("\tbundle 'entry' schema: {:.2e} s".format(t_bundle))
+
+    for compiled in [False, True]:
+        times = []
+        for schema_dict in [Entry._SCHEMA, bundled]:
+            validator = schema_dict._get_validator(compiled)
+            validator.validate(data)
+            times.append(min(timeit.repeat(lambda: validator.validate(data),
+                                           number=NUM, repeat=3)) / NUM)
+
+        print("\tvalidate entry with {} points{}, original: {:.2e} s, bundled: {:.2e} s "
+              "({:.1f}x)".format(BENCHMARK_NUM_POINTS, " (compiled)" if compiled else "",
+                                 times[0], times[1], times[0]/times[1]))
+
+    return
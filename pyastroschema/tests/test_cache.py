@@ -0,0 +1,178 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import sys
+import shutil
+import tempfile
+import timeit
+import subprocess
+
+import jsonschema
+
+from nose.tools import assert_true, assert_false, assert_raises
+
+from pyastroschema import cache, struct
+from pyastroschema.tests import benchmark
+
+PHOT = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+
+
+def _construct(name="photometry"):
+    @struct.set_struct_schema(name)
+    class Test_Struct(struct.Struct):
+        pass
+
+    return Test_Struct
+
+
+def _with_cache(func, cache_dir, enabled=True):
+    """Call the function using a temporary cache.
+    """
+    old = (cache.CACHE, cache.ENABLED)
+    cache.CACHE = cache.SchemaCache(cache_dir)
+    cache.ENABLED = enabled
+    try:
+        return func()
+    finally:
+        cache.CACHE, cache.ENABLED = old
+
+
+def test_cache():
+    print("test_cache.test_cache()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fresh = _with_cache(_construct, temp_dir, enabled=False)
+        assert_false(os.path.exists(cache.SchemaCache(temp_dir).filename))
+        stored = _with_cache(_construct, temp_dir)
+        assert_true(os.path.exists(cache.SchemaCache(temp_dir).filename))
+        cached = _with_cache(_construct, temp_dir)
+
+        for cls in [stored, cached]:
+            assert_true(cls._SCHEMA == fresh._SCHEMA)
+            for attr in ['_name', '_filename', '_ref_path']:
+                assert_true(getattr(cls._SCHEMA, attr) == getattr(fresh._SCHEMA, attr))
+
+            # Keys are identical, including their attributes
+            assert_true([repr(kk) for kk in cls._KEYCHAIN.keys()] ==
+                        [repr(kk) for kk in fresh._KEYCHAIN.keys()])
+            for kk, ff in zip(cls._KEYCHAIN.keys(), fresh._KEYCHAIN.keys()):
+                assert_true(kk.__dict__ == ff.__dict__)
+                with assert_raises(AttributeError):
+                    kk.unique = True
+
+            assert_true(cls._KEYCHAIN.MAGNITUDE == "magnitude")
+            assert_true(cls._get_duplicate_plan() == fresh._get_duplicate_plan())
+
+        # Cached classes validate normally, including `$ref`s resolved from cached documents
+        _with_cache(lambda: cached(**PHOT), temp_dir)
+        with assert_raises(jsonschema.ValidationError):
+            _with_cache(lambda: cached(**dict(PHOT, magnitude=[1])), temp_dir)
+
+        # Cache files for other directories are separate
+        assert_true(cache.SchemaCache(temp_dir).filename != cache.CACHE.filename)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+def test_user_schemas():
+    print("test_cache.test_user_schemas()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache_dir = os.path.join(temp_dir, "cache")
+        fname = os.path.join(temp_dir, "mine.json")
+        for kind in ["string", "number"]:
+            with open(fname, 'w') as out:
+                out.write('{"title": "mine", "properties": {"x": {"type": "%s"}}}' % kind)
+            # User schema files are never cached, so changes to them are always used
+            cls = _with_cache(lambda: _construct(fname), cache_dir)
+            assert_true(cls._SCHEMA["properties"]["x"]["type"] == kind)
+            assert_true(cache.SchemaCache(cache_dir).get(("struct", fname, (), (), True)) is None)
+
+        assert_true(cache._builtin_source(fname) is None)
+        assert_true(cache._builtin_source("photometry") == "photometry")
+        path = os.path.join(cache.PATHS.SCHEMA_DIR, "photometry.json")
+        assert_true(cache._builtin_source(path) == "photometry.json")
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+def test_trusted():
+    print("test_cache.test_trusted()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        _with_cache(_construct, temp_dir)
+        fname = cache.SchemaCache(temp_dir).filename
+        assert_true(len(cache.SchemaCache(temp_dir)._load()) > 0)
+        # Cache files which can be written by others are not loaded
+        os.chmod(fname, 0o666)
+        if hasattr(os, "getuid"):
+            assert_true(cache.SchemaCache(temp_dir)._load() == {})
+        os.chmod(fname, 0o600)
+        assert_true(len(cache.SchemaCache(temp_dir)._load()) > 0)
+        # Rewriting replaces the existing file
+        cache.SchemaCache(temp_dir).set("test", 1)
+        assert_true(cache.SchemaCache(temp_dir).get("test") == 1)
+        assert_true([ff for ff in os.listdir(temp_dir) if ff.endswith(".tmp")] == [])
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+def test_schema_hash():
+    print("test_cache.test_schema_hash()")
+    # Modified schema files change the name of the cache file (without reading the files)
+    fname = cache.PATHS.INDEX_JSON_FILE
+    info = os.stat(fname)
+    before = cache._schema_hash()
+    try:
+        os.utime(fname, ns=(info.st_atime_ns, info.st_mtime_ns + 1000))
+        assert_true(cache._schema_hash() != before)
+    finally:
+        os.utime(fname, ns=(info.st_atime_ns, info.st_mtime_ns))
+
+    assert_true(cache._schema_hash() == before)
+    return
+
+
+@benchmark
+def test_benchmark_cache():
+    print("test_cache.test_benchmark_cache()")
+    NUM = 5
+    temp_dir = tempfile.mkdtemp()
+    try:
+        def construct():
+            return [_construct(name) for name in
+                    ["source", "quantity", "photometry", "spectrum", "entry"]]
+
+        t_fresh = min(timeit.repeat(lambda: _with_cache(construct, temp_dir, enabled=False),
+                                    number=NUM, repeat=3)) / NUM
+        t_cache = min(timeit.repeat(lambda: _with_cache(construct, temp_dir),
+                                    number=NUM, repeat=3)) / NUM
+        print("\tconstruct `Struct` classes, fresh: {:.2e} s, cached: {:.2e} s ({:.1f}x)".format(
+            t_fresh, t_cache, t_fresh/t_cache))
+
+        # Time importing the module in new processes
+        code = "import time; beg = time.time(); import pyastroschema.struct; " \
+               "print(time.time() - beg)"
+        times = []
+        for enabled in ["0", "1"]:
+            env = dict(os.environ, PYASTROSCHEMA_CACHE=enabled, PYASTROSCHEMA_CACHE_DIR=temp_dir)
+            out = [subprocess.check_output([sys.executable, "-c", code], env=env)
+                   for ii in range(3)]
+            times.append(min(float(oo) for oo in out))
+
+        print("\timport `pyastroschema.struct`, fresh: {:.2e} s, cached: {:.2e} s".format(*times))
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
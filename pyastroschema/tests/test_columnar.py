@@ -0,0 +1,135 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import timeit
+from unittest import SkipTest
+
+from nose.tools import assert_true, assert_false
+
+try:
+    import numpy as np
+except ImportError:
+    raise SkipTest("`numpy` is required for columnar validation")
+
+from pyastroschema.struct import Photometry, Source
+from pyastroschema.tests import benchmark
+
+
+def _rows(columns):
+    """Convert columns to a list of row dictionaries, skipping masked and `None` values.
+    """
+    size = len(list(columns.values())[0])
+    rows = [{} for ii in range(size)]
+    for name, vals in columns.items():
+        mask = np.ma.getmaskarray(vals) if isinstance(vals, np.ma.MaskedArray) else None
+        vals = vals.data if isinstance(vals, np.ma.MaskedArray) else vals
+        for ii, vv in enumerate(np.asarray(vals).tolist()):
+            if (vv is None) or ((mask is not None) and mask[ii]):
+                continue
+            rows[ii][name] = vv
+    return rows
+
+
+def _photometry_columns(num, seed=1234):
+    rand = np.random.RandomState(seed)
+
+    def choice(opts, frac_masked=0.0):
+        vals = np.array(opts)[rand.randint(0, len(opts), num)]
+        if frac_masked > 0.0:
+            vals = np.ma.masked_array(vals, mask=(rand.uniform(size=num) < frac_masked))
+        return vals
+
+    columns = dict(
+        time=choice(["45481.00", "2018-01-01", "2018/01/01", "45482.5", "hello", " 1"], 0.1),
+        magnitude=choice([18.2, 19.1, 17.3, 12.0], 0.2),
+        e_magnitude=choice(["0.1", "0.2", "bad", "1e-2", " 0.1"], 0.3),
+        band=choice(["V", "B", "R", "g", "r"], 0.1),
+        source=choice(["1", "2", "1,2"], 0.05),
+        flux=choice(["1.0", "2.0"], 0.9),
+        u_flux=choice(["erg/s"], 0.3),
+        frequency=choice([1.0, 2.5], 0.8),
+        u_frequency=choice(["GHz"], 0.3),
+        upperlimit=choice([True, False], 0.5),
+        telescope=np.array([None, "HST", "Swift"], dtype=object)[rand.randint(0, 3, num)],
+    )
+    return columns
+
+
+def test_photometry_equivalence():
+    print("test_columnar.test_photometry_equivalence()")
+    columns = _photometry_columns(2000)
+    bad = Photometry.validate_columns(columns)
+    rows = _rows(columns)
+    check = Photometry._SCHEMA.compile()
+    bad_rows = np.array([not check.is_valid(row) for row in rows])
+    print("\t{} / {} rows invalid".format(np.count_nonzero(bad), bad.size))
+    # Make sure there is a mix of good and bad rows
+    assert_true(0 < np.count_nonzero(bad) < bad.size)
+    assert_true(np.all(bad == bad_rows))
+    return
+
+
+def test_structured_array():
+    data = np.array([("45481.00", 18.2, "V", "1"), ("45481.00", 18.2, "V", ""),
+                     ("hello", 18.2, "V", "1")],
+                    dtype=[('time', 'U10'), ('magnitude', 'f8'), ('band', 'U2'),
+                           ('source', 'U4')])
+    bad = Photometry.validate_columns(data)
+    assert_true(list(bad) == [False, False, True])
+
+    # Missing required columns
+    bad = Photometry.validate_columns(dict(magnitude=np.array([1.0, 2.0])))
+    assert_true(list(bad) == [True, True])
+    return
+
+
+def test_source_equivalence():
+    # `Source` uses `anyOf` with 'minimum' and 'minLength' constraints
+    columns = dict(
+        alias=np.array([0, 1, -1, 3, None, "", "4"], dtype=object),
+        name=np.array(["abc", "ab", None, "abcd", "abc", "abc", None], dtype=object),
+        arxivid=np.ma.masked_array(["1605.01054"]*7, mask=[1, 1, 1, 1, 0, 0, 0]),
+    )
+    bad = Source.validate_columns(columns)
+    check = Source._SCHEMA.compile()
+    bad_rows = [not check.is_valid(row) for row in _rows(columns)]
+    print(list(bad), bad_rows)
+    assert_true(list(bad) == bad_rows)
+    assert_false(np.all(bad))
+    return
+
+
+def test_check_array():
+    from pyastroschema.columnar import ColumnarValidator
+    schema = Photometry._SCHEMA
+    validator = ColumnarValidator(schema, resolver=schema._get_ref_resolver())
+
+    values = np.array(["1.0", "2e3", "bad", " 1", "-4"])
+    bad = validator.check_array('magnitude', values)
+    assert_true(list(bad) == [False, False, True, True, False])
+    assert_false(np.any(validator.check_array('magnitude', np.linspace(0.0, 1.0, 100000))))
+    return
+
+
+@benchmark
+def test_benchmark_columnar():
+    print("test_columnar.test_benchmark_columnar()")
+    NUM = 20000
+    columns = _photometry_columns(NUM)
+    rows = _rows(columns)
+
+    def run_rows():
+        return Photometry.validate_many(rows)
+
+    def run_columns():
+        return Photometry.validate_columns(columns)
+
+    t_rows = min(timeit.repeat(run_rows, number=1, repeat=3))
+    t_cols = min(timeit.repeat(run_columns, number=1, repeat=3))
+    print("\t{} rows: validate_many: {:.2e} s, validate_columns: {:.2e} s ({:.1f}x)".format(
+        NUM, t_rows, t_cols, t_rows/t_cols))
+    return
@@ -0,0 +1,213 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import copy
+import timeit
+
+import jsonschema
+
+from nose.tools import assert_true, assert_raises, assert_false
+
+import pyastroschema as pas
+from pyastroschema import validation
+from pyastroschema.compiler import CompiledValidator
+from pyastroschema.schema import SchemaDict
+from pyastroschema.tests import benchmark
+
+
+def _load_fixtures():
+    """Load all test instances in `tests/test_schema/`, returns list of (schema-name, instance).
+    """
+    fixtures = []
+    for name in sorted(os.listdir(pas.PATHS.TESTS_SCHEMA_DIR)):
+        fnames = []
+        for path, _, files in os.walk(os.path.join(pas.PATHS.TESTS_SCHEMA_DIR, name)):
+            fnames.extend([os.path.join(path, ff) for ff in files if ff.endswith('.json')])
+
+        for fname in sorted(fnames):
+            data = pas.utils.json_load_file(fname)
+            # Some fixtures are wrapped with meta-data
+            if ('entry' in data) and ('valid' in data):
+                data = data['entry']
+            fixtures.append((name, data))
+
+    return fixtures
+
+
+def _variants(data):
+    """Construct variants of an instance, with each property removed, or given a bad value.
+    """
+    vars = [data]
+    for kk in data.keys():
+        dup = copy.deepcopy(data)
+        dup.pop(kk)
+        vars.append(dup)
+        for bad in [-1, "", "h", True, [], ["1", "x"]]:
+            dup = copy.deepcopy(data)
+            dup[kk] = bad
+            vars.append(dup)
+
+    return vars
+
+
+def _compare(sdict, data):
+    """Make sure that the compiled and standard validators report identical errors.
+    """
+    path = sdict._ref_path_formatted
+    resolver = jsonschema.RefResolver(path, None)
+    standard = validation.PAS_Validator(sdict, resolver=resolver)
+    compiled = CompiledValidator(sdict, resolver=jsonschema.RefResolver(path, None))
+
+    # Use copies as default values may be added to instances
+    std_err = next(standard.iter_errors(copy.deepcopy(data)), None)
+    cmp_err = compiled.check(copy.deepcopy(data))
+    print("\t", data, "\n\t\t", repr(std_err), repr(cmp_err))
+    if std_err is None:
+        assert_true(cmp_err is None)
+        return True
+
+    assert_true(cmp_err is not None)
+    assert_true(std_err.message == cmp_err.message)
+    assert_true(list(std_err.path) == list(cmp_err.path))
+    assert_true(list(std_err.schema_path) == list(cmp_err.schema_path))
+    assert_true(std_err.validator == cmp_err.validator)
+    return False
+
+
+def test_equivalence_fixtures():
+    print("test_compiler.test_equivalence_fixtures()")
+    fixtures = _load_fixtures()
+    assert_true(len(fixtures) > 0)
+
+    schemas = {}
+    num_good = 0
+    num_bad = 0
+    for name, data in fixtures:
+        if name not in schemas:
+            schemas[name] = SchemaDict(name)
+        for var in _variants(data):
+            if _compare(schemas[name], var):
+                num_good += 1
+            else:
+                num_bad += 1
+
+    # Make sure that both successes and failures were compared
+    assert_true(num_good > 0)
+    assert_true(num_bad > 0)
+    return
+
+
+def test_equivalence_entry():
+    print("test_compiler.test_equivalence_entry()")
+    sdict = SchemaDict("entry")
+
+    src = dict(alias="1", name="The Open Supernova Catalog")
+    phot = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+    quant = dict(value="0.01", source="1")
+    good = dict(name="sn1990a", sources=[src], photometry=[phot, phot], redshift=[quant])
+    assert_true(_compare(sdict, good))
+
+    # Errors deep inside nested (referenced) structures
+    bad = copy.deepcopy(good)
+    bad['photometry'][1]['magnitude'] = "bright"
+    assert_false(_compare(sdict, bad))
+
+    bad = copy.deepcopy(good)
+    bad['sources'][0].pop('alias')
+    assert_false(_compare(sdict, bad))
+
+    bad = copy.deepcopy(good)
+    bad['redshift'] = [dict(value="0.01")]
+    assert_false(_compare(sdict, bad))
+
+    return
+
+
+def test_defaults():
+    schema = dict(properties=dict(foo=dict(default='bar'), num=dict(type='number')))
+    compiled = CompiledValidator(schema)
+    obj = {}
+    compiled.validate(obj)
+    assert_true(obj == {'foo': 'bar'})
+
+    with assert_raises(pas.ValidationError):
+        compiled.validate(dict(num="1"))
+
+    return
+
+
+def test_recursive_ref():
+    schema = {
+        "definitions": {
+            "node": {
+                "type": "object",
+                "properties": {
+                    "value": {"type": "number"},
+                    "children": {"type": "array", "items": {"$ref": "#/definitions/node"}}
+                }
+            }
+        },
+        "$ref": "#/definitions/node"
+    }
+    compiled = CompiledValidator(schema)
+    compiled.validate(dict(value=1, children=[dict(value=2, children=[dict(value=3)])]))
+
+    bad = dict(value=1, children=[dict(value=2, children=[dict(value="3")])])
+    assert_false(compiled.is_valid(bad))
+    err = compiled.check(bad)
+    assert_true(list(err.path) == ['children', 0, 'children', 0, 'value'])
+    return
+
+
+def test_schemadict_compiled():
+    sdict = SchemaDict("photometry", compiled=True)
+    sdict.validate(dict(time="45481.00", magnitude="18.2", band="V", source="1"))
+    with assert_raises(pas.ValidationError):
+        sdict.validate(dict(magnitude="18.2", band="V", source="1"))
+
+    # The compiled validator should be cached
+    assert_true(sdict.compile() is sdict.compile())
+
+    # Per-call override to use the standard validator
+    with assert_raises(pas.ValidationError):
+        sdict.validate(dict(magnitude="18.2", band="V", source="1"), compiled=False)
+
+    return
+
+
+@benchmark
+def test_benchmark():
+    print("test_compiler.test_benchmark()")
+    NUM = 20
+
+    fixtures = _load_fixtures()
+    schemas = {}
+    for name, data in fixtures:
+        if name not in schemas:
+            schemas[name] = SchemaDict(name)
+
+    for name, sdict in schemas.items():
+        tests = [var for nn, data in fixtures if nn == name for var in _variants(data)]
+        resolver = sdict._get_ref_resolver()
+        standard = validation.PAS_Validator(sdict, resolver=resolver)
+        compiled = sdict.compile()
+
+        def run_standard():
+            for tt in tests:
+                standard.is_valid(tt)
+
+        def run_compiled():
+            for tt in tests:
+                compiled.is_valid(tt)
+
+        t_std = min(timeit.repeat(run_standard, number=NUM, repeat=3))
+        t_cmp = min(timeit.repeat(run_compiled, number=NUM, repeat=3))
+        msg = "\t{:12s}: {:4d} instances, jsonschema: {:.2e} s, compiled: {:.2e} s ({:.1f}x)"
+        print(msg.format(name, len(tests)*NUM, t_std, t_cmp, t_std/t_cmp))
+
+    return
@@ -0,0 +1,181 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import random
+import timeit
+import itertools
+
+from nose.tools import assert_true
+
+from pyastroschema import dedup
+from pyastroschema.struct import Source, Quantity
+from pyastroschema.tests import benchmark
+
+
+def _random_sources(num, seed=1234):
+    rand = random.Random(seed)
+    opts = dict(
+        alias=[1, 2, 3],
+        name=["Catalog A", "Catalog B"],
+        bibcode=["2018ApJ...000..000A", "2018ApJ...000..000B"],
+        arxivid=["1605.01054", "1605.01055"],
+        doi=["10.1000/a", "10.1000/b"],
+        url=["http://a", "http://b"],
+    )
+    items = []
+    for ii in range(num):
+        src = Source(validate=False)
+        for kk, vals in opts.items():
+            if rand.random() < 0.5:
+                src[kk] = rand.choice(vals)
+        items.append(src)
+
+    return items
+
+
+def _random_quantities(num, seed=5678):
+    rand = random.Random(seed)
+    items = []
+    for ii in range(num):
+        qq = Quantity(validate=False)
+        qq['value'] = rand.choice(["1.0", "2.0", 1.0, [1.0, 2.0], (1.0, 2.0)])
+        qq['source'] = rand.choice(["1", "2"])
+        if rand.random() < 0.3:
+            qq['units_value'] = rand.choice(["km/s", "kpc"])
+        if rand.random() < 0.3:
+            qq['derived'] = rand.choice([True, False, 1])
+        items.append(qq)
+
+    return items
+
+
+def _is_duplicate_of_reference(self, other):
+    """Original implementation of `Struct.is_duplicate_of`, comparing keys in `set` order.
+    """
+    if type(other) is not type(self):
+        return False
+
+    s_keys = self.keychain.keys()
+    o_keys = other.keychain.keys()
+    for ky in set(s_keys + o_keys):
+        s_key = getattr(self.keychain, ky.upper())
+        o_key = getattr(other.keychain, ky.upper())
+        if not s_key.equals(o_key, identical=True):
+            raise RuntimeError("key mismatch occurred!")
+
+        if not (s_key.distinguishing or s_key.unique):
+            continue
+        kis = (str(ky) in self)
+        kio = (str(ky) in other)
+        if kis != kio:
+            return False
+        if not kis:
+            continue
+        if self[ky] != other[ky]:
+            return False
+        elif s_key.unique:
+            return True
+
+    return True
+
+
+def _is_ambiguous(aa, bb):
+    """Whether the result of comparing two instances depends on the order of comparisons.
+
+    i.e. if a `unique` key matches, while another (relevant) key does not.
+    """
+    match = False
+    mismatch = False
+    for kk, unique in type(aa)._get_duplicate_plan():
+        if (kk in aa) != (kk in bb):
+            mismatch = True
+        elif (kk in aa) and (aa[kk] != bb[kk]):
+            mismatch = True
+        elif (kk in aa) and unique:
+            match = True
+
+    return match and mismatch
+
+
+def _brute_force(items):
+    pairs = set()
+    for ii, jj in itertools.combinations(range(len(items)), 2):
+        if items[ii].is_duplicate_of(items[jj]):
+            pairs.add((ii, jj))
+    return pairs
+
+
+def _group_pairs(groups):
+    return set(pair for gg in groups for pair in itertools.combinations(gg, 2))
+
+
+def test_equivalence():
+    print("test_dedup.test_equivalence()")
+    for items in [_random_sources(200), _random_quantities(200),
+                  _random_sources(50) + _random_quantities(50)]:
+        groups = dedup.group_duplicates(items)
+        print("\t{} items, {} groups".format(len(items), len(groups)))
+        assert_true(len(groups) > 0)
+        assert_true(_group_pairs(groups) == _brute_force(items))
+
+        uniq = dedup.deduplicate(items)
+        assert_true(len(uniq) == len(items) - sum(len(gg) - 1 for gg in groups))
+        assert_true(len(dedup.group_duplicates(uniq)) == 0)
+
+    return
+
+
+@benchmark
+def test_benchmark_dedup():
+    print("test_dedup.test_benchmark_dedup()")
+    NUM = 300
+    items = _random_sources(NUM)
+
+    t_pair = min(timeit.repeat(lambda: _brute_force(items), number=1, repeat=3))
+    t_hash = min(timeit.repeat(lambda: dedup.group_duplicates(items), number=1, repeat=3))
+    print("\t{} sources, pairwise: {:.2e} s, hashed: {:.2e} s ({:.1f}x)".format(
+        NUM, t_pair, t_hash, t_pair/t_hash))
+    return
+
+
+def test_plan_equivalence():
+    print("test_dedup.test_plan_equivalence()")
+    num_amb = 0
+    for items in [_random_sources(100), _random_quantities(100)]:
+        for aa, bb in itertools.combinations(items, 2):
+            # The original result depended on the (hash-based) `set` ordering of keys
+            if _is_ambiguous(aa, bb):
+                num_amb += 1
+                continue
+
+            assert_true(aa.is_duplicate_of(bb) == _is_duplicate_of_reference(aa, bb))
+
+    print("\t{} ambiguous pairs".format(num_amb))
+    return
+
+
+@benchmark
+def test_benchmark_is_duplicate_of():
+    print("test_dedup.test_benchmark_is_duplicate_of()")
+    NUM = 100
+    for name, items in [("Source", _random_sources(NUM)), ("Quantity", _random_quantities(NUM))]:
+        pairs = list(itertools.combinations(items, 2))
+
+        def run_reference():
+            for aa, bb in pairs:
+                _is_duplicate_of_reference(aa, bb)
+
+        def run_plan():
+            for aa, bb in pairs:
+                aa.is_duplicate_of(bb)
+
+        t_ref = min(timeit.repeat(run_reference, number=1, repeat=3))
+        t_plan = min(timeit.repeat(run_plan, number=1, repeat=3))
+        print("\t{:8s}: {} pairs, original: {:.2e} s, plan: {:.2e} s ({:.1f}x)".format(
+            name, len(pairs), t_ref, t_plan, t_ref/t_plan))
+
+    return
@@ -0,0 +1,146 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import copy
+import timeit
+
+from nose.tools import assert_true, assert_false, assert_raises
+
+from jsonschema.exceptions import ValidationError
+
+from pyastroschema import defaults
+from pyastroschema.schema import SchemaDict
+from pyastroschema.struct import Entry
+from pyastroschema.tests import benchmark
+
+# Number of instances used in benchmarks
+BENCHMARK_NUM = int(os.environ.get("PYASTROSCHEMA_BENCH_DEFAULTS_NUM", 2000))
+
+NODE = {
+    "type": "object",
+    "properties": {
+        "value": {"type": "integer", "default": 0},
+        "children": {"type": "array", "items": {"$ref": "#/definitions/node"}}
+    }
+}
+
+SCHEMA = {
+    "definitions": {"node": NODE},
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "default": "none"},
+        "tree": {"$ref": "#/definitions/node"},
+        "pair": {"type": "array", "items": [{"properties": {"a": {"default": 1}}}],
+                 "additionalItems": {"properties": {"b": {"default": 2}}}},
+        "either": {"anyOf": [{"properties": {"x": {"default": 1}}, "required": ["y"]},
+                             {"properties": {"z": {"default": 2}}},
+                             {"properties": {"w": {"default": 3}}}]},
+        "both": {"allOf": [{"properties": {"x": {"default": 1}}},
+                           {"properties": {"y": {"default": 2}}}]},
+    },
+    "patternProperties": {"^p_": {"properties": {"p": {"default": True}}}},
+    "additionalProperties": {"properties": {"extra": {"default": []}}}
+}
+
+DATA = [
+    {},
+    {"name": "a", "tree": {"children": [{"value": 2}, {"children": [{}]}]}},
+    {"pair": [{}, {}, {"b": 4}], "either": {"y": 1}, "both": {}},
+    {"either": {}, "p_1": {}, "other": {}, "tree": {"value": 3}},
+]
+
+
+def test_defaults_plan():
+    print("test_defaults.test_defaults_plan()")
+    schema_dict = SchemaDict(SCHEMA)
+    plan = schema_dict.defaults_plan()
+    assert_false(plan.empty)
+    assert_true(schema_dict.defaults_plan() is plan)
+
+    for compiled in [False, True]:
+        # Pure validators never modify instances
+        data = copy.deepcopy(DATA)
+        schema_dict.validate_many(data, compiled=compiled, set_defaults=False)
+        for item in data:
+            schema_dict.validate(item, compiled=compiled, set_defaults=False)
+        assert_true(data == DATA)
+
+        # Setting defaults separately is the same as setting them while validating
+        expected = copy.deepcopy(DATA)
+        for item in expected:
+            schema_dict.validate(item, compiled=compiled)
+        assert_true(expected != DATA)
+
+        data = copy.deepcopy(DATA)
+        schema_dict.apply_defaults(data)
+        assert_true(data == expected)
+        assert_true(plan.apply_one(copy.deepcopy(DATA[1])) == expected[1])
+
+    # Errors are still found without defaults
+    bad = dict(DATA[1], name=3)
+    for compiled in [False, True]:
+        with assert_raises(ValidationError):
+            schema_dict.validate(bad, compiled=compiled, set_defaults=False)
+    assert_true(len(schema_dict.validate_many([bad] + DATA, set_defaults=False)) == 1)
+
+    # Schemas without defaults have empty plans
+    assert_true(Entry._SCHEMA.defaults_plan().empty)
+    plan = defaults.DefaultsPlan({"items": {"properties": {"a": {"type": "string"}}}})
+    assert_true(plan.empty)
+    assert_true(plan.apply_one([{}]) == [{}])
+    return
+
+
+def test_key_defaults():
+    print("test_defaults.test_key_defaults()")
+    key_schema = SchemaDict("key")
+    attrs = [dict(), dict(unique=True), dict(priority=3, format="numeric")]
+    expected = copy.deepcopy(attrs)
+    for item in expected:
+        key_schema.validate(item)
+
+    data = copy.deepcopy(attrs)
+    key_schema.validate_many(data, set_defaults=False)
+    assert_true(data == attrs)
+    key_schema.apply_defaults(data)
+    assert_true(data == expected)
+    return
+
+
+@benchmark
+def test_benchmark_defaults():
+    print("test_defaults.test_benchmark_defaults()")
+    key_schema = SchemaDict("key")
+    attrs = [dict(unique=bool(ii % 2), priority=ii) for ii in range(BENCHMARK_NUM)]
+
+    def validate(set_defaults):
+        data = copy.deepcopy(attrs)
+        key_schema.validate_many(data, set_defaults=set_defaults)
+        return data
+
+    def separate():
+        data = validate(False)
+        key_schema.apply_defaults(data)
+        return data
+
+    def copied():
+        return copy.deepcopy(attrs)
+
+    assert_true(validate(True) == separate())
+    times = [min(timeit.repeat(func, number=1, repeat=3))
+             for func in [copied, lambda: validate(True), lambda: validate(False), separate]]
+    times = [tt - times[0] for tt in times[1:]]
+    print("\t{} instances, validate with defaults: {:.2e} s, pure: {:.2e} s, "
+          "pure then defaults: {:.2e} s".format(BENCHMARK_NUM, *times))
+
+    data = copy.deepcopy(attrs)
+    plan = key_schema.defaults_plan()
+    dur = min(timeit.repeat(lambda: plan.apply(data), number=1, repeat=3))
+    print("\tapply defaults plan: {:.2e} s ({:.2e} s per instance)".format(
+        dur, dur / BENCHMARK_NUM))
+    return
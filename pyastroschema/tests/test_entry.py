@@ -5,14 +5,17 @@ Can be run with:
     $ nosetests path/to/test_file.py:Test_Class.test_method
 
 """
-# import copy
+import copy
+import timeit
 
 import jsonschema
 
-from nose.tools import assert_true
+from nose.tools import assert_true, assert_raises
 
 # import pyastroschema as pas
-from pyastroschema.struct import Entry
+from pyastroschema import dedup
+from pyastroschema.struct import Entry, Photometry
+from pyastroschema.tests import benchmark
 
 
 S1 = dict(
@@ -45,3 +48,141 @@ def test_basics():
     assert_true(ent[keys.NAME] == E1['name'])
 
     return
+
+
+def test_validate_nested_edit():
+    print("test_entry.test_validate_nested_edit()")
+    phot = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+    for incremental in [False, True]:
+        ent = Entry(name="test-entry", sources=[S1], photometry=[dict(phot)])
+        ent['photometry'][0]['magnitude'] = 'garbage'
+        with assert_raises(jsonschema.ValidationError):
+            ent.validate(incremental=incremental)
+
+    # Values returned by `get` can also be modified in place
+    ent = Entry(name="test-entry", sources=[S1], photometry=[dict(phot)])
+    ent.get('photometry').append(dict(phot, magnitude='garbage'))
+    with assert_raises(jsonschema.ValidationError):
+        ent.validate(incremental=True)
+
+    return
+
+
+def test_validate_reads():
+    print("test_entry.test_validate_reads()")
+    ent = _entry_with_photometry(10)
+    ent['sources'] = [dict(S1)]
+    ent.validate()
+    other = ent.cow_copy()
+
+    # Only reading values does not flag them for re-validation, or copy shared values
+    for ee in [ent, other]:
+        assert_true(ee.is_duplicate_of(ee.cow_copy()))
+        assert_true(len(dedup.group_duplicates([ee, ee.cow_copy()])) == 1)
+        text = [ee.dumps(), str(ee), repr(ee)]
+        assert_true(all('18.2' in tt for tt in text))
+        assert_true(ee._dirty == set())
+
+    assert_true(set(other._shared.keys()) == set(['photometry', 'sources']))
+    assert_true(other._peek('photometry') is ent._peek('photometry'))
+    return
+
+
+@benchmark
+def test_benchmark_incremental():
+    print("test_entry.test_benchmark_incremental()")
+    NUM = 20000
+    phot = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+    ent = Entry(name="test-entry", sources=[S1], photometry=[dict(phot) for ii in range(NUM)])
+
+    def edit_full():
+        ent['name'] = "test-entry-2"
+        ent.validate(incremental=False)
+
+    def edit_incremental():
+        ent['name'] = "test-entry-3"
+        ent.validate(incremental=True)
+
+    t_full = min(timeit.repeat(edit_full, number=1, repeat=3))
+    t_incr = min(timeit.repeat(edit_incremental, number=10, repeat=3)) / 10
+    print("\t{} points, full: {:.2e} s, incremental: {:.2e} s ({:.1f}x)".format(
+        NUM, t_full, t_incr, t_full/t_incr))
+
+    # Bad edits are still found
+    ent['name'] = 1
+    with assert_raises(jsonschema.ValidationError):
+        ent.validate(incremental=True)
+
+    return
+
+
+def _entry_with_photometry(num):
+    phot = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+    ent = Entry(name="test-entry", sources=[S1], validate=False)
+    ent['photometry'] = [Photometry(parent=ent, validate=False, **phot) for ii in range(num)]
+    return ent
+
+
+def test_cow_copy():
+    print("test_entry.test_cow_copy()")
+    ent = _entry_with_photometry(10)
+    ent['sources'] = [dict(S1), dict(S2)]
+    cc = ent.cow_copy()
+    assert_true(cc == ent)
+    assert_true(cc._parent is ent._parent)
+
+    # Modifying the copy does not modify the original (and vice versa)
+    cc['photometry'][3]['magnitude'] = "10.0"
+    cc['sources'][0]['alias'] = 5
+    assert_true(ent['photometry'][3]['magnitude'] == "18.2")
+    assert_true(ent['sources'][0]['alias'] == 0)
+    ent['photometry'].append(Photometry(parent=ent, validate=False, time="1.0"))
+    assert_true(len(cc['photometry']) == 10)
+    assert_true(len(ent['photometry']) == 11)
+
+    # Parent links of nested structs are re-pointed to the copy, not duplicated
+    assert_true(all(pp._parent is cc for pp in cc['photometry']))
+    assert_true(all(pp._parent is ent for pp in ent['photometry']))
+
+    # Copies of copies, and values accessed through `items` and `get`
+    c2 = cc.cow_copy()
+    c2.get('photometry')[0]['band'] = "R"
+    assert_true(dict(c2.items())['photometry'][0]['band'] == "R")
+    assert_true(cc['photometry'][0]['band'] == "V")
+    assert_true(c2['photometry'][3]['magnitude'] == "10.0")
+    assert_true(c2['photometry'][3]._parent is c2)
+
+    # Deep copies also re-point (and do not copy) parents
+    dc = copy.deepcopy(ent)
+    assert_true(dc == ent)
+    assert_true(all(pp._parent is dc for pp in dc['photometry']))
+    dc = copy.deepcopy(ent['photometry'][0])
+    assert_true(dc._parent is ent)
+
+    # Overwriting a shared value does not copy it
+    cc = ent.cow_copy()
+    cc['photometry'] = []
+    assert_true(len(ent['photometry']) == 11)
+    return
+
+
+@benchmark
+def test_benchmark_cow_copy():
+    print("test_entry.test_benchmark_cow_copy()")
+    NUM = 20000
+    ent = _entry_with_photometry(NUM)
+
+    def edit(func):
+        cc = func(ent)
+        cc['photometry'][10]['magnitude'] = "10.0"
+        return cc
+
+    t_deep = min(timeit.repeat(lambda: edit(copy.deepcopy), number=1, repeat=3))
+    t_cow = min(timeit.repeat(lambda: edit(Entry.cow_copy), number=1, repeat=3))
+    print("\t{} points, copy and edit, deepcopy: {:.2e} s, cow_copy: {:.2e} s ({:.1f}x)".format(
+        NUM, t_deep, t_cow, t_deep/t_cow))
+
+    cc = edit(Entry.cow_copy)
+    assert_true(ent['photometry'][10]['magnitude'] == "18.2")
+    assert_true(cc['photometry'][10]._parent is cc)
+    return
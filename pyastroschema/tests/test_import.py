@@ -0,0 +1,105 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import sys
+import subprocess
+
+from nose.tools import assert_true, assert_false, assert_raises
+
+import pyastroschema as pas
+from pyastroschema.tests import benchmark
+
+# Maximum fraction of the time to import `pyastroschema.struct` spent on `import pyastroschema`
+IMPORT_FRACTION = 0.25
+# Maximum (cumulative) time to import `pyastroschema`, in seconds; only checked if set
+IMPORT_BUDGET = os.environ.get("PYASTROSCHEMA_IMPORT_BUDGET", None)
+# Modules which must not be loaded by `import pyastroschema`
+HEAVY_MODULES = ["jsonschema", "numpy", "orjson", "six", "json", "pickle", "shutil",
+                 "pyastroschema.struct", "pyastroschema.schema", "pyastroschema.utils"]
+
+
+def _run(code):
+    """Run python code in a new process, returning the `stdout` and `stderr` output.
+    """
+    proc = subprocess.Popen([sys.executable, "-X", "importtime", "-c", code],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    assert_true(proc.returncode == 0)
+    return out.decode('utf-8'), err.decode('utf-8')
+
+
+def _import_times(err):
+    """Parse the cumulative import time (in seconds) of each module from `-X importtime` output.
+    """
+    times = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        vals = line.split("|")
+        try:
+            times[vals[2].strip()] = float(vals[1]) * 1e-6
+        except ValueError:
+            continue
+
+    return times
+
+
+def test_lazy_attributes():
+    print("test_import.test_lazy_attributes()")
+    # Nothing else is imported with the package
+    out, err = _run("import sys, pyastroschema as pas; pas.PATHS.SCHEMA_DIR; "
+                    "print(sorted(sys.modules))")
+    modules = eval(out)
+    for name in ["jsonschema", "pyastroschema.struct", "pyastroschema.utils", "shutil"]:
+        assert_false(name in modules)
+
+    # Submodules and attributes are loaded on first access
+    assert_true(pas.struct.Entry.__name__ == "Entry")
+    assert_true(pas.SchemaDict is pas.schema.SchemaDict)
+    assert_true(issubclass(pas.ValidationError, Exception))
+    assert_true("struct" in dir(pas))
+    with assert_raises(AttributeError):
+        pas.nothing
+    return
+
+
+def test_import_budget():
+    print("test_import.test_import_budget()")
+    # Heavy dependencies are not loaded
+    out, err = _run("import sys, pyastroschema; print(sorted(sys.modules))")
+    modules = eval(out)
+    for name in HEAVY_MODULES:
+        assert_false(name in modules)
+
+    # Compare against loading `struct` in the same process, which is robust to the machine load
+    fracs = []
+    for ii in range(3):
+        out, err = _run("import pyastroschema; import pyastroschema.struct")
+        times = _import_times(err)
+        fracs.append(times["pyastroschema"] / times["pyastroschema.struct"])
+    assert_true(min(fracs) < IMPORT_FRACTION)
+
+    if IMPORT_BUDGET is not None:
+        out, err = _run("import pyastroschema")
+        assert_true(_import_times(err)["pyastroschema"] < float(IMPORT_BUDGET))
+    return
+
+
+@benchmark
+def test_benchmark_import():
+    print("test_import.test_benchmark_import()")
+    times = []
+    for ii in range(3):
+        out, err = _run("import pyastroschema")
+        times.append(_import_times(err)["pyastroschema"])
+
+    out, err = _run("import pyastroschema.struct")
+    t_struct = _import_times(err)["pyastroschema.struct"]
+    dur = min(times)
+    print("\t`import pyastroschema`: {:.2e} s, with `struct`: {:.2e} s".format(dur, t_struct))
+    return
@@ -7,10 +7,14 @@ Can be run with:
 """
 # from __future__ import absolute_import, division, print_function, unicode_literals
 
+import timeit
+
 from nose.tools import assert_true, assert_raises   # , assert_false, assert_equal,
 
 # import pyastroschema as pas
-from pyastroschema.keys import Key
+from pyastroschema.keys import Key, Keychain
+from pyastroschema import validation
+from pyastroschema.tests import benchmark
 
 import jsonschema  # noqa
 from jsonschema.exceptions import ValidationError
@@ -103,3 +107,51 @@ def test_comparisons():
     print(keys)
     assert_true(len(keys) == 1)
     return
+
+
+def test_trusted():
+    print("test_key.test_trusted()")
+    for kwargs in [dict(), dict(type='string', unique=False), dict(distinguishing=True)]:
+        k1 = Key("t1", **kwargs)
+        k2 = Key.trusted("t1", **kwargs)
+        assert_true(type(k2) is Key)
+        assert_true(k1.__dict__ == k2.__dict__)
+        assert_true(repr(k1) == repr(k2))
+        with assert_raises(AttributeError):
+            k2.unique = True
+
+    # Trusted keys are not validated
+    k1 = Key.trusted("t1", unique="true")
+    assert_true(k1.unique == "true")
+    with assert_raises(ValidationError):
+        Key("t1", unique="true")
+    with assert_raises(ValueError):
+        Key.trusted("T1")
+
+    kc1 = Keychain(SIMPLEST_SCHEMA)
+    kc2 = Keychain(SIMPLEST_SCHEMA, trusted=True)
+    assert_true([repr(kk) for kk in kc1.keys()] == [repr(kk) for kk in kc2.keys()])
+    return
+
+
+@benchmark
+def test_benchmark_validate():
+    print("test_key.test_benchmark_validate()")
+    NUM = 1000
+    key = Key("t1", type='string', unique=False)
+    compiled = key._get_validator()
+    plain = validation.PAS_Validator(key.schema)
+    attrs = dict(key.__dict__)
+
+    t_plain = min(timeit.repeat(lambda: plain.validate(attrs), number=NUM, repeat=3)) / NUM
+    t_comp = min(timeit.repeat(lambda: compiled.check(attrs), number=NUM, repeat=3)) / NUM
+    print("	validate key attributes, validator: {:.2e} s, compiled: {:.2e} s ({:.1f}x)".format(
+        t_plain, t_comp, t_plain/t_comp))
+
+    t_init = min(timeit.repeat(lambda: Key("t1", type='string', unique=False),
+                               number=NUM, repeat=3)) / NUM
+    t_trust = min(timeit.repeat(lambda: Key.trusted("t1", type='string', unique=False),
+                                number=NUM, repeat=3)) / NUM
+    print("	construct key, validated: {:.2e} s, trusted: {:.2e} s ({:.1f}x)".format(
+        t_init, t_trust, t_init/t_trust))
+    return
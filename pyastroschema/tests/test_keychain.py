@@ -6,11 +6,17 @@ Can be run with:
 
 """
 # from __future__ import absolute_import, division, print_function, unicode_literals
+import os
+import gc
+import timeit
+import tracemalloc
 
 from nose.tools import assert_true, assert_raises
 
 # import pyastroschema as pas
+from pyastroschema import struct, schema, keys as keys_module
 from pyastroschema.keys import Keychain, Key
+from pyastroschema.tests import benchmark
 
 
 SIMPLEST_SCHEMA = dict(
@@ -127,3 +133,127 @@ def test_extendable():
         assert_true(len(keys.keys()) == 2)
 
     return
+
+
+def test_lookup():
+    print("test_keychain.test_lookup()")
+    keys = Keychain(SIMPLEST_SCHEMA, mutable=True, extendable=True)
+    assert_true("alias" in keys)
+    assert_true("nothing" not in keys)
+    # Unhashable values are never keys
+    assert_true(["alias"] not in keys)
+    assert_true(keys["alias"] is keys.ALIAS)
+    assert_true(keys.get_key_by_name("name") is keys.NAME)
+    with assert_raises(KeyError):
+        keys["nothing"]
+    with assert_raises(ValueError):
+        keys.get_key_by_name("nothing", create_if_missing=False)
+    assert_true(keys.get_key_by_name("nothing") == "nothing")
+
+    # Lookups must stay consistent when keys are added and replaced
+    keys.TEST = Key("test", type='string', unique=False)
+    assert_true(keys["test"] is keys.TEST)
+    new = Key("alias", type='string', unique=False)
+    keys.ALIAS = new
+    assert_true(keys["alias"] is new)
+    assert_true(len(keys.keys()) == 3)
+    assert_true(keys.keys()[0] is new)
+    return
+
+
+@benchmark
+def test_benchmark_lookup():
+    print("test_keychain.test_benchmark_lookup()")
+    # Set to 1000000 for a full-sized benchmark
+    NUM = int(os.environ.get("PYASTROSCHEMA_BENCH_KEYCHAIN_ROWS", 1000))
+
+    @struct.set_struct_schema("photometry", extendable=False)
+    class Photometry(struct.Struct):
+        pass
+
+    keychain = Photometry._KEYCHAIN
+    names = [str(kk) for kk in keychain.keys()]
+    row = Photometry(validate=False)
+
+    def run_list():
+        for ii in range(NUM):
+            for nn in names:
+                nn in keychain._keys
+
+    def run_index():
+        for ii in range(NUM):
+            for nn in names:
+                nn in keychain
+
+    def run_assign():
+        for ii in range(NUM):
+            for nn in names:
+                row[nn] = ii
+
+    t_list = min(timeit.repeat(run_list, number=1, repeat=3))
+    t_index = min(timeit.repeat(run_index, number=1, repeat=3))
+    t_assign = min(timeit.repeat(run_assign, number=1, repeat=3))
+    print("\t{} rows x {} fields, membership: list {:.2e} s, index {:.2e} s ({:.1f}x)".format(
+        NUM, len(names), t_list, t_index, t_list/t_index))
+    print("\tassigning all fields (non-extendable struct): {:.2e} s".format(t_assign))
+    return
+
+
+def test_intern():
+    print("test_keychain.test_intern()")
+    key = Key.intern("interned", type='string', unique=False, names=dict(a=[1, 2]))
+    # Identical names and attributes give the same instance, in any order
+    assert_true(Key.intern("interned", names=dict(a=[1, 2]), unique=False, type='string') is key)
+    assert_true(Key.intern("interned", type='string', unique=True, names=dict(a=[1, 2])) is not key)
+    assert_true(Key.intern("interned", type='string', unique=False) is not key)
+    assert_true(repr(key) == repr(Key("interned", type='string', unique=False,
+                                      names=dict(a=[1, 2]))))
+    # Attributes given with their default values are equivalent to missing ones
+    assert_true(Key.intern("interned", unique=False, distinguishing=True) is
+                Key.intern("interned"))
+
+    # Shared between keychains of the same, or different schemas with the same properties
+    phot = Keychain("photometry")
+    assert_true(phot.TIME is Keychain("photometry").TIME)
+    other = dict(SIMPLEST_SCHEMA, title="other")
+    other['properties'] = dict(SIMPLEST_SCHEMA['properties'], extra=dict(type="string"))
+    other = Keychain(other)
+    assert_true(other.ALIAS is Keychain(SIMPLEST_SCHEMA).ALIAS)
+    assert_true(phot.get_key_by_name("missing") is other.get_key_by_name("missing"))
+
+    # Lists of a `SchemaDict` are equivalent to plain lists
+    tracked = schema.SchemaDict(dict(properties=dict(kind=dict(type=["string", "number"]))))
+    key = Key.intern("kind", type=["string", "number"])
+    assert_true(type(tracked["properties"]["kind"]["type"]) is not list)
+    assert_true(Key.intern("kind", **tracked["properties"]["kind"]) is key)
+    assert_true(Keychain(tracked).KIND is key)
+    return
+
+
+@benchmark
+def test_benchmark_intern():
+    print("test_keychain.test_benchmark_intern()")
+    schemas = [schema.SchemaDict(name)
+               for name in ["source", "quantity", "photometry", "spectrum", "entry"]]
+    props = [(name, vals) for sch in schemas for name, vals in sch.properties.items()]
+
+    def measure(func):
+        gc.collect()
+        tracemalloc.start()
+        dur = timeit.default_timer()
+        result = func()
+        dur = timeit.default_timer() - dur
+        mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, dur, mem
+
+    keys_module._INTERNED.clear()
+    fresh, t_fresh, m_fresh = measure(lambda: [Key(nn, **vv) for nn, vv in props])
+    first, t_first, m_first = measure(lambda: [Key.intern(nn, **vv) for nn, vv in props])
+    again, t_again, m_again = measure(lambda: [Key.intern(nn, **vv) for nn, vv in props])
+    assert_true([repr(kk) for kk in fresh] == [repr(kk) for kk in again])
+    print("\t{} keys ({} distinct), construct: {:.2e} s, {:.2e} bytes".format(
+        len(props), len(set(id(kk) for kk in first)), t_fresh, m_fresh))
+    print("\t\tinterned, first: {:.2e} s, {:.2e} bytes; again: {:.2e} s, {:.2e} bytes".format(
+        t_first, m_first, t_again, m_again))
+    return
@@ -0,0 +1,245 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import copy
+import json
+import shutil
+import tempfile
+import timeit
+
+import jsonschema
+
+from nose.tools import assert_true, assert_false, assert_raises
+
+from pyastroschema import lazy, utils
+from pyastroschema.struct import Entry
+from pyastroschema.tests import benchmark
+
+# Number of photometry points used in benchmarks
+BENCHMARK_NUM_POINTS = int(os.environ.get("PYASTROSCHEMA_BENCH_LAZY_POINTS", 20000))
+
+PHOT = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+
+
+def _entry(num):
+    return dict(name="SN-é", sources=[dict(alias="1", name="Someone [et al]")],
+                redshift=[dict(value="0.1", source="1")],
+                photometry=[dict(PHOT, e_magnitude=ii*0.1) for ii in range(num)],
+                extra=dict(values=[1, 2.5, None, dict(text="]}\\\"{[")], flag=True))
+
+
+def _write(temp_dir, data, name="entry.json", **kwargs):
+    fname = os.path.join(temp_dir, name)
+    with open(fname, 'w') as out:
+        json.dump(data, out, **kwargs)
+    return fname
+
+
+def test_open():
+    print("test_lazy.test_open()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        data = _entry(10)
+        for kwargs in [dict(), dict(indent=2), dict(separators=(',', ':'))]:
+            fname = _write(temp_dir, data, **kwargs)
+            ent = Entry.open(fname)
+            assert_true(isinstance(ent, Entry))
+            assert_true(list(ent.keys()) == list(data.keys()))
+            # Nothing is decoded until accessed
+            assert_true(all(isinstance(vv, (lazy._Span, lazy.LazyList))
+                            for vv in dict.values(ent)))
+
+            assert_true(ent['name'] == data['name'])
+            phot = ent['photometry']
+            assert_true(isinstance(phot, lazy.LazyList))
+            assert_true(len(phot) == 10)
+            assert_true(phot[3] == data['photometry'][3])
+            assert_true(phot[-1] == data['photometry'][-1])
+            assert_true(type(list.__getitem__(phot, 4)) is lazy._Span)
+            assert_true(ent.get('extra') == data['extra'])
+            assert_true(ent.get('nothing') is None)
+
+            # Comparisons decode everything, and convert to a normal instance
+            assert_true(ent == data)
+            assert_true(type(ent) is Entry)
+            assert_true(json.loads(ent.dumps()) == data)
+
+        # Modifications are kept when the remaining values are decoded
+        ent = Entry.open(fname)
+        ent['photometry'].append(dict(PHOT))
+        ent['photometry'][0]['band'] = "R"
+        ent['name'] = "other"
+        ent.validate()
+        dup = copy.deepcopy(ent)
+        assert_true(type(dup) is Entry)
+        assert_true(len(dup['photometry']) == 11)
+        assert_true(dup['photometry'][0]['band'] == "R")
+        assert_true(dup['name'] == "other")
+
+        # Lists which are not only containers are decoded as a whole
+        data['photometry'] = [dict(PHOT), 3]
+        ent = Entry.open(_write(temp_dir, data), validate=False)
+        assert_false(isinstance(ent['photometry'], lazy.LazyList))
+        assert_true(ent['photometry'][1] == 3)
+
+        with open(fname, 'w') as out:
+            out.write(json.dumps(_entry(2))[:-10])
+        with assert_raises(ValueError):
+            Entry.open(fname)
+        with open(fname, 'w') as out:
+            out.write("[1, 2]")
+        with assert_raises(ValueError):
+            Entry.open(fname)
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+def test_open_validation():
+    print("test_lazy.test_open_validation()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        data = _entry(10)
+        data['photometry'][5]['time'] = dict(bad=True)
+        data['redshift'] = "0.1"
+        fname = _write(temp_dir, data)
+
+        # Invalid values are only found once accessed, with the same errors as full validation
+        ent = Entry.open(fname)
+        assert_true(ent['photometry'][4] == data['photometry'][4])
+        for key, path in [('photometry', ['photometry', 5, 'time']), ('redshift', ['redshift'])]:
+            with assert_raises(jsonschema.ValidationError) as cm:
+                ent[key][5] if (key == 'photometry') else ent[key]
+            assert_true(list(cm.exception.path)[:len(path)] == path)
+
+            sub = dict((kk, vv) for kk, vv in data.items() if kk in ['name', 'sources', key])
+            errors = Entry._SCHEMA.validate_many([sub])
+            assert_true(errors[0].path == list(cm.exception.path))
+
+        ent = Entry.open(fname, validate=False)
+        assert_true(ent['photometry'][5] == data['photometry'][5])
+
+        # Object-level constraints are checked immediately
+        data = _entry(2)
+        data.pop('sources')
+        fname = _write(temp_dir, data)
+        with assert_raises(jsonschema.ValidationError):
+            Entry.open(fname)
+        assert_true(Entry.open(fname, validate=False)['name'] == data['name'])
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+def test_open_value_constraints():
+    print("test_lazy.test_open_value_constraints()")
+    from pyastroschema import struct
+
+    # Object-level keywords which depend on the values of properties
+    for extra in [{"not": {"properties": {"x": {"type": "string"}}}},
+                  {"anyOf": [{"properties": {"x": {"type": "number"}}}]},
+                  {"dependencies": {"x": {"properties": {"y": {"type": "number"}}}}}]:
+        schema = dict(properties=dict(x={}, y={}), **extra)
+
+        @struct.set_struct_schema(schema)
+        class Test_Struct(struct.Struct):
+            pass
+
+        assert_false(lazy._presence_only(Test_Struct._SCHEMA))
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with assert_raises(jsonschema.ValidationError):
+                Test_Struct(x="bad", y="bad")
+            with assert_raises(jsonschema.ValidationError):
+                Test_Struct.open(_write(temp_dir, dict(x="bad", y="bad")))
+            ok = Test_Struct.open(_write(temp_dir, dict(x=1, y=2)))
+            assert_true(ok == dict(x=1, y=2))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    assert_true(lazy._presence_only(Entry._SCHEMA))
+    return
+
+
+def test_close():
+    print("test_lazy.test_close()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = _write(temp_dir, _entry(4))
+        with Entry.open(fname) as ent:
+            assert_true(ent['name'] == "SN-é")
+            source = ent._source
+        assert_true(source.buffer.closed)
+        # Values which were not decoded can no longer be accessed
+        with assert_raises(ValueError):
+            ent['photometry'][0]
+
+        # Materialized instances are closed, and are no longer lazy
+        with Entry.open(fname) as ent:
+            source = ent._source
+            ent.materialize()
+            assert_true(source.buffer.closed)
+        assert_true(type(ent) is Entry)
+        assert_true(len(ent['photometry']) == 4)
+
+        ent = Entry.open(fname)
+        ent.close()
+        assert_true(ent._source.buffer.closed)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+def test_incremental_edit():
+    print("test_lazy.test_incremental_edit()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = _write(temp_dir, _entry(4))
+        for name, bad in [('redshift', 3),
+                          ('photometry', dict(PHOT, magnitude="garbage"))]:
+            ent = Entry.open(fname)
+            assert_true(ent._dirty == set())
+            ent[name].append(bad)
+            assert_true(ent._dirty == set([name]))
+            with assert_raises(jsonschema.ValidationError):
+                ent.validate(incremental=True)
+            ent.close()
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+@benchmark
+def test_benchmark_open():
+    print("test_lazy.test_benchmark_open()")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = _write(temp_dir, _entry(BENCHMARK_NUM_POINTS), indent=2)
+
+        def load_full():
+            ent = Entry(**utils.json_load_file(fname))
+            return ent['name'], ent['redshift']
+
+        def load_lazy():
+            ent = Entry.open(fname)
+            return ent['name'], ent['redshift']
+
+        assert_true(load_full() == load_lazy())
+        t_full = min(timeit.repeat(load_full, number=1, repeat=3))
+        t_lazy = min(timeit.repeat(load_lazy, number=1, repeat=3))
+        print("\t{} points, read name and redshift, full: {:.2e} s, lazy: {:.2e} s ({:.1f}x)"
+              .format(BENCHMARK_NUM_POINTS, t_full, t_lazy, t_full/t_lazy))
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
@@ -0,0 +1,146 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import io
+import json
+import shutil
+import tempfile
+
+from nose.tools import assert_true, assert_raises
+
+from pyastroschema import __main__ as cli
+from pyastroschema.tests import benchmark
+
+SRC = dict(alias="1", name="The Open Supernova Catalog")
+PHOT = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+GOOD = dict(name="sn1990a", sources=[SRC], photometry=[PHOT, PHOT])
+BAD = dict(name="sn1990b", sources=[SRC], photometry=[PHOT, dict(PHOT, magnitude="bright")])
+
+
+def _write_entries(path, num_good, num_bad):
+    sub = os.path.join(path, "sub")
+    os.mkdir(sub)
+    for ii in range(num_good + num_bad):
+        ent = GOOD if ii < num_good else BAD
+        fname = os.path.join(path if (ii % 2 == 0) else sub, "entry_{:03d}.json".format(ii))
+        with open(fname, 'w') as out:
+            json.dump(ent, out)
+
+    # Unparseable file
+    fname = os.path.join(sub, "broken.json")
+    with open(fname, 'w') as out:
+        out.write('{"name": ')
+
+    return
+
+
+def test_validate_files():
+    print("test_main.test_validate_files()")
+    path = tempfile.mkdtemp()
+    try:
+        _write_entries(path, 6, 3)
+        fnames = cli.find_files([path])
+        assert_true(len(fnames) == 10)
+        assert_true(cli.find_files([os.path.join(path, "*.json")]) ==
+                    sorted(ff for ff in fnames if os.path.dirname(ff) == path))
+
+        for jobs in [1, 2]:
+            out = io.StringIO()
+            summary = cli.validate_files(fnames, jobs=jobs, out=out)
+            print("\tjobs={}: {}".format(jobs, out.getvalue()[:200]))
+            assert_true(summary["valid"] == 6)
+            assert_true(summary["invalid"] == 4)
+
+            results = json.loads(out.getvalue())
+            assert_true(results["invalid"] == 4)
+            errors = {os.path.basename(res["file"]): res["errors"] for res in results["results"]}
+            assert_true(errors["entry_008.json"][0]["path"] == ["photometry", 1, "magnitude"])
+            assert_true(errors["broken.json"][0]["message"].startswith("JSONDecodeError"))
+
+        # Fail-fast and NDJSON output
+        out = io.StringIO()
+        summary = cli.validate_files(fnames, jobs=1, fail_fast=True, out=out,
+                                     output_format="ndjson")
+        lines = [json.loads(ll) for ll in out.getvalue().splitlines()]
+        assert_true(summary["invalid"] == 1)
+        assert_true(lines[-1]["type"] == "summary")
+        assert_true(lines[-1]["skipped"] == len(fnames) - len(lines) + 1)
+        assert_true(all(ll["type"] == "file" for ll in lines[:-1]))
+
+        with assert_raises(ValueError):
+            cli.validate_files(fnames, output_format="xml")
+
+    finally:
+        shutil.rmtree(path)
+
+    return
+
+
+def test_init_worker():
+    print("test_main.test_init_worker()")
+    cli._init_worker("entry")
+    # The validator used by `_validate_file` is constructed before any files are validated
+    assert_true(cli._WORKER_SCHEMA._streaming_validator is not None)
+    streams = cli._WORKER_SCHEMA._get_streaming_validator()
+    path = tempfile.mkdtemp()
+    try:
+        _write_entries(path, 1, 0)
+        res = cli._validate_file((os.path.join(path, "entry_000.json"), None))
+    finally:
+        shutil.rmtree(path)
+
+    assert_true(res["valid"])
+    assert_true(cli._WORKER_SCHEMA._get_streaming_validator() is streams)
+    return
+
+
+def test_main_validate():
+    path = tempfile.mkdtemp()
+    try:
+        _write_entries(path, 2, 0)
+        output = os.path.join(path, "output.json")
+        status = cli.main(["validate", os.path.join(path, "entry_*.json"), "-o", output])
+        assert_true(status == 0)
+        with open(output, 'r') as inp:
+            summary = json.load(inp)
+        assert_true(summary["valid"] == 1)
+
+        status = cli.main(["validate", path, "-j", "2", "-o", output, "-f", "ndjson"])
+        assert_true(status == 1)
+
+    finally:
+        shutil.rmtree(path)
+
+    return
+
+
+@benchmark
+def test_benchmark_jobs():
+    print("test_main.test_benchmark_jobs()")
+    NUM = 200
+    path = tempfile.mkdtemp()
+    try:
+        big = dict(GOOD, photometry=[PHOT]*200)
+        fnames = []
+        for ii in range(NUM):
+            fname = os.path.join(path, "entry_{:03d}.json".format(ii))
+            with open(fname, 'w') as out:
+                json.dump(big, out)
+            fnames.append(fname)
+
+        jobs = sorted(set([1, 2, os.cpu_count() or 1]))
+        for jj in jobs:
+            summary = cli.validate_files(fnames, jobs=jj)
+            assert_true(summary["valid"] == NUM)
+            print("\tjobs={:3d}: {:.2e} s, {:.1f} files/s".format(
+                jj, summary["duration"], summary["files_per_sec"]))
+
+    finally:
+        shutil.rmtree(path)
+
+    return
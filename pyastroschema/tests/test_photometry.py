@@ -10,6 +10,7 @@ Can be run with:
 import os
 import glob
 import copy
+import timeit
 
 import jsonschema
 
@@ -17,6 +18,7 @@ from nose.tools import assert_true, assert_raises, assert_false
 
 import pyastroschema as pas
 from pyastroschema.struct import Photometry
+from pyastroschema.tests import benchmark
 
 # Good
 # -----------------
@@ -169,3 +171,70 @@ def test():
             jsonschema.validate(bt, photometry_schema, resolver=RESOLVER)
 
     return
+
+
+def test_validate_many():
+    print("test_photometry.test_validate_many()")
+    rows = YES + NAW
+    failures = Photometry.validate_many(rows)
+    print("failures = ", failures)
+    assert_true(len(failures) == len(NAW))
+    assert_true([ff.index for ff in failures] == list(range(len(YES), len(rows))))
+
+    failures = Photometry.validate_many(rows, max_errors=1)
+    assert_true(len(failures) == 1)
+    return
+
+
+def test_from_records():
+    print("test_photometry.test_from_records()")
+    phots = Photometry.from_records(YES)
+    assert_true(len(phots) == len(YES))
+    for phot, rec in zip(phots, YES):
+        ref = Photometry(**rec)
+        assert_true(isinstance(phot, Photometry))
+        assert_true(phot == ref)
+        assert_true(list(phot.keys()) == list(ref.keys()))
+        assert_true(phot._parent is None)
+        # Validated instances are ready for incremental validation
+        assert_true(phot._dirty == set())
+        phot.validate()
+
+    for naw in NAW:
+        with assert_raises(jsonschema.exceptions.ValidationError):
+            Photometry.from_records(YES + [naw])
+
+    # Without validation, everything is accepted
+    phots = Photometry.from_records(NAW, validate=False)
+    assert_true(len(phots) == len(NAW))
+
+    @pas.struct.set_struct_schema("photometry", extendable=False)
+    class Strict_Photometry(pas.struct.Struct):
+        pass
+
+    with assert_raises(RuntimeError):
+        Strict_Photometry.from_records([dict(YES_0, bad_key=1)], validate=False)
+
+    return
+
+
+@benchmark
+def test_benchmark_from_records():
+    print("test_photometry.test_benchmark_from_records()")
+    NUM = 5000
+    recs = [dict(time="{:.2f}".format(45000.0 + ii), magnitude="18.2", band="V", source="1")
+            for ii in range(NUM)]
+
+    for validate in [False, True]:
+        def run_init():
+            return [Photometry(validate=validate, **rr) for rr in recs]
+
+        def run_bulk():
+            return Photometry.from_records(recs, validate=validate)
+
+        t_init = min(timeit.repeat(run_init, number=1, repeat=3))
+        t_bulk = min(timeit.repeat(run_bulk, number=1, repeat=3))
+        print("\t{} records, validate={}: __init__: {:.2e} s, from_records: {:.2e} s "
+              "({:.1f}x)".format(NUM, validate, t_init, t_bulk, t_init/t_bulk))
+
+    return
@@ -16,6 +16,7 @@ from nose.tools import assert_true, assert_raises, assert_false  # , assert_equa
 
 import pyastroschema as pas
 from pyastroschema.schema import SchemaDict
+from pyastroschema.tests import benchmark
 
 
 SIMPLEST_SCHEMA = dict(
@@ -137,3 +138,154 @@ def test_create_from_multiple():
         schema.extend(SCHEMA_3)
 
     return
+
+
+def test_validate_many():
+    print("test_schemadict.test_validate_many()")
+    schema = SchemaDict(dict(
+        properties=dict(name=dict(type="string"), number=dict(type="number")),
+        required=["name"]
+    ))
+
+    good = dict(name="hello", number=1)
+    data = [good, dict(number=1), good, dict(name="hello", number="1"), good]
+
+    for compiled in [False, True]:
+        failures = schema.validate_many(data, compiled=compiled)
+        print("compiled = {}, failures = {}".format(compiled, failures))
+        assert_true(len(failures) == 2)
+        assert_true(failures[0].index == 1)
+        assert_true(failures[0].path == [])
+        assert_true('required' in failures[0].message)
+        assert_true(failures[1].index == 3)
+        assert_true(failures[1].path == ['number'])
+
+        # Stop after the first error
+        failures = schema.validate_many(iter(data), max_errors=1, compiled=compiled)
+        assert_true(len(failures) == 1)
+        assert_true(failures[0].index == 1)
+
+        # All valid
+        assert_true(len(schema.validate_many([good]*3, compiled=compiled)) == 0)
+
+    return
+
+
+def test_changes():
+    print("test_schemadict.test_changes()")
+    import copy
+    import pickle
+
+    schema = SchemaDict(copy.deepcopy(SIMPLEST_SCHEMA))
+    good = dict(alias="a", name="b", number="1")
+    bad = dict(alias="a", name="b", number=1)
+    for compiled in [False, True]:
+        assert_true(len(schema.validate_many([good, bad], compiled=compiled)) == 0)
+
+    # Nested modifications (and `extend`, `update`) change the version, and the validators
+    validator = schema.compile()
+    version = schema.version
+    schema["properties"]["number"] = dict(type="string")
+    assert_true(schema.version > version)
+    assert_false(schema.compile() is validator)
+    for compiled in [False, True]:
+        assert_true(len(schema.validate_many([good, bad], compiled=compiled)) == 1)
+
+    for modify in [lambda: schema["properties"]["number"].update(minLength=5),
+                   lambda: schema.setdefault("required", []).append("extra"),
+                   lambda: schema.extend(dict(properties=dict(other=dict(type="number")))),
+                   lambda: schema.update(dict(kitten=456))]:
+        validator = schema.compile()
+        version = schema.version
+        modify()
+        assert_true(schema.version > version)
+        assert_false(schema.compile() is validator)
+
+    # Only the 'default' keyword of (sub)schemas is not tracked, not e.g. properties named so
+    named = SchemaDict(dict(properties=dict(default=dict(type="string"), other=dict(
+        type="object", default=dict(a=[1])), listed=dict(enum=[dict(default=1)]))))
+    assert_true(named.validate_many([dict(default="a")], compiled=True) == [])
+    version = named.version
+    named["properties"]["other"]["default"]["a"].append(2)
+    assert_true(named.version == version)
+    named["properties"]["listed"]["enum"][0]["default"] = 2
+    assert_true(named.version > version)
+    version = named.version
+    named["properties"]["default"]["type"] = "number"
+    assert_true(named.version > version)
+    assert_true(len(named.validate_many([dict(default="a")], compiled=True)) == 1)
+    named.freeze()
+    with assert_raises(RuntimeError):
+        named["properties"]["default"]["type"] = "string"
+
+    # Otherwise validators are reused
+    validator = schema.compile()
+    schema.validate_many([good, bad])
+    assert_true(schema.compile() is validator)
+
+    # Frozen schemas cannot be modified, and are hashable
+    with assert_raises(TypeError):
+        hash(schema)
+    copied = copy.deepcopy(schema)
+    assert_true(schema.freeze() is schema)
+    for modify in [lambda: schema["properties"]["name"].pop("unique"),
+                   lambda: schema["required"].append("name"),
+                   lambda: schema.update(dict(kitten=1)),
+                   lambda: schema.clear()]:
+        with assert_raises(RuntimeError):
+            modify()
+
+    assert_true(copied == schema)
+    assert_false(copied.frozen)
+    copied["kitten"] = 1
+    for other in [copy.deepcopy(schema), pickle.loads(pickle.dumps(schema))]:
+        assert_true(other.frozen and (other == schema) and (hash(other) == hash(schema)))
+    assert_true(len(set([schema, copy.copy(schema), SchemaDict(schema).freeze()])) == 1)
+
+    # Schemas of `Struct` classes are not frozen, and changes to them are used by validation
+    @pas.struct.set_struct_schema("photometry")
+    class Test_Photometry(pas.struct.Struct):
+        pass
+
+    phot = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+    assert_false(Test_Photometry._SCHEMA.frozen)
+    Test_Photometry(**phot)
+    Test_Photometry._SCHEMA["required"] = ["kitten"]
+    with assert_raises(pas.ValidationError):
+        Test_Photometry(**phot)
+    return
+
+
+@benchmark
+def test_benchmark_validate_many():
+    print("test_schemadict.test_benchmark_validate_many()")
+    import timeit
+
+    NUM = 2000
+    schema = SchemaDict('photometry')
+    good = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+    bad = dict(time="45481.00", magnitude="bright", band="V", source="1")
+    data = [good if (ii % 10) else bad for ii in range(NUM)]
+
+    def loop():
+        failures = []
+        for ii, dd in enumerate(data):
+            try:
+                schema.validate(dd)
+            except pas.ValidationError as err:
+                failures.append((ii, list(err.path), err.message))
+        return failures
+
+    def many():
+        return schema.validate_many(data, compiled=False)
+
+    def many_compiled():
+        return schema.validate_many(data, compiled=True)
+
+    assert_true(len(loop()) == len(many()) == len(many_compiled()) == NUM // 10)
+    t_loop = min(timeit.repeat(loop, number=1, repeat=3))
+    t_many = min(timeit.repeat(many, number=1, repeat=3))
+    t_comp = min(timeit.repeat(many_compiled, number=1, repeat=3))
+    print("\t{} items: loop: {:.2e} s, validate_many: {:.2e} s, compiled: {:.2e} s".format(
+        NUM, t_loop, t_many, t_comp))
+    return
@@ -0,0 +1,254 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import io
+import copy
+import json
+import shutil
+import timeit
+import tempfile
+import tracemalloc
+
+from nose.tools import assert_true, assert_raises
+
+import pyastroschema as pas
+from pyastroschema.struct import Entry, Photometry, Source, Spectrum
+from pyastroschema.streaming import _StreamReader
+from pyastroschema.tests import benchmark
+
+# Number of photometric points in the synthetic entry used for benchmarking.  Set the
+# environment variable to e.g. 10000000 for a multi-GB entry.
+BENCHMARK_NUM_POINTS = int(os.environ.get("PYASTROSCHEMA_BENCH_STREAM_POINTS", 20000))
+
+SRC = dict(alias="1", name="The Open Supernova Catalog")
+PHOT = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+SPEC = dict(time="50434.0", u_fluxes="erg/s/cm^2/Angstrom", u_wavelengths="Angstrom",
+            data=[["3700.0000", "0.78484756"], ["3702.0000", "0.79"]], source="1,2")
+# NOTE: use separate copies of items, which are modified individually below
+GOOD = dict(name="sn1990a", sources=[dict(SRC), dict(SRC)],
+            photometry=[dict(PHOT), dict(PHOT), dict(PHOT)],
+            spectra=[SPEC], redshift=[dict(value="0.01", source="1")])
+
+ITEMS = dict(sources=Source, photometry=Photometry, spectra=Spectrum)
+
+
+def _bad_entries():
+    bads = []
+
+    # Errors in individual streamed items, possibly several
+    bad = copy.deepcopy(GOOD)
+    bad['photometry'][1]['magnitude'] = "bright"
+    bads.append(bad)
+
+    bad = copy.deepcopy(GOOD)
+    bad['photometry'][0].pop('time')
+    bad['photometry'][2]['magnitude'] = "bright"
+    bad['sources'][1].pop('alias')
+    bads.append(bad)
+
+    bad = copy.deepcopy(GOOD)
+    bad['spectra'][0]['time'] = "yesterday"
+    bads.append(bad)
+
+    # Errors in the list itself
+    bad = copy.deepcopy(GOOD)
+    bad['photometry'] = []
+    bads.append(bad)
+
+    bad = copy.deepcopy(GOOD)
+    bad['photometry'] = PHOT
+    bads.append(bad)
+
+    # Errors outside of the streamed lists
+    bad = copy.deepcopy(GOOD)
+    bad.pop('name')
+    bads.append(bad)
+
+    bad = copy.deepcopy(GOOD)
+    bad['redshift'] = [dict(value="0.01")]
+    bad['photometry'][1]['magnitude'] = "bright"
+    bads.append(bad)
+
+    return bads
+
+
+def _write(data, path):
+    fname = os.path.join(path, "entry.json")
+    with open(fname, 'w') as out:
+        json.dump(data, out, indent=2)
+    return fname
+
+
+def test_equivalence():
+    print("test_streaming.test_equivalence()")
+    check = Entry._SCHEMA.compile()
+    path = tempfile.mkdtemp()
+    try:
+        errors = Entry.validate_file(_write(GOOD, path))
+        assert_true(len(errors) == 0)
+
+        for bad in _bad_entries():
+            fname = _write(bad, path)
+            errors = Entry.validate_file(fname)
+            # The error found when validating the fully loaded entry must be reported
+            full = check.check(pas.utils.json_load_file(fname))
+            print("\t", repr(full), "\n\t\t", [list(err.path) for err in errors])
+            assert_true(full is not None)
+            assert_true(len(errors) > 0)
+            match = [(list(err.path) == list(full.path)) and (err.message == full.message) and
+                     (list(err.schema_path) == list(full.schema_path)) for err in errors]
+            assert_true(any(match))
+
+            # Errors in list items should match those from validating the item directly
+            loaded = pas.utils.json_load_file(fname)
+            for err in errors:
+                if len(err.path) < 3:
+                    continue
+                key, index = list(err.path)[:2]
+                item_err = ITEMS[key]._SCHEMA.compile().check(loaded[key][index])
+                assert_true(list(item_err.path) == list(err.path)[2:])
+                assert_true(item_err.message == err.message)
+
+            assert_true(len(Entry.validate_file(fname, max_errors=1)) == 1)
+
+    finally:
+        shutil.rmtree(path)
+
+    return
+
+
+def test_multiple_errors():
+    bad = copy.deepcopy(GOOD)
+    bad['photometry'][0].pop('time')
+    bad['photometry'][2]['magnitude'] = "bright"
+    bad['sources'][1].pop('alias')
+    path = tempfile.mkdtemp()
+    try:
+        errors = Entry.validate_file(_write(bad, path))
+    finally:
+        shutil.rmtree(path)
+
+    paths = [list(err.path)[:2] for err in errors]
+    assert_true(paths == [['sources', 1], ['photometry', 0], ['photometry', 2]])
+    return
+
+
+def test_list_length():
+    print("test_streaming.test_list_length()")
+    # Length errors do not depend on the order of keywords, e.g. 'items' before 'minItems'
+    item = {"type": "object", "properties": {"a": {"type": "string"}}}
+    values = {"type": "array", "items": item, "minItems": 2, "maxItems": 3}
+    schema = pas.SchemaDict(dict(properties=dict(values=values)))
+
+    @pas.struct.set_struct_schema(dict(schema))
+    class Lengths(pas.struct.Struct):
+        pass
+
+    path = tempfile.mkdtemp()
+    try:
+        for num, kw in [(0, "minItems"), (1, "minItems"), (2, None), (4, "maxItems")]:
+            data = [dict(a=str(ii)) for ii in range(num)]
+            fname = _write(dict(values=data), path)
+            errors = schema.validate_file(fname)
+            assert_true([err.validator for err in errors] == ([kw] if kw else []))
+            full = schema.compile().check(pas.utils.json_load_file(fname))
+            # Files opened lazily report the same error (empty lists are checked when accessed)
+            try:
+                Lengths.open(fname)
+                lazy = None
+            except pas.ValidationError as err:
+                lazy = err.validator
+            assert_true(lazy == (kw if num > 0 else None))
+            for err in errors:
+                assert_true(list(err.path) == list(full.path) == ["values"])
+                assert_true(list(err.schema_path) == list(full.schema_path))
+                if kw == "minItems":
+                    assert_true(err.message == full.message)
+    finally:
+        shutil.rmtree(path)
+
+    return
+
+
+def test_reader():
+    print("test_streaming.test_reader()")
+    values = [12345678, -1.5e-10, "a \"quoted\" string, with {brackets}", True, None,
+              [1, [2, [3, []]]], dict(a=dict(b=[1.0, "x"])), {}, False, "\u00e9\\", "\n",
+              float("-inf")]
+    text = "  [" + " ,\n ".join(json.dumps(vv) for vv in values) + "]  "
+    # Use a tiny chunk-size so that values are split across reads
+    for size in [1, 3, 7, 1000]:
+        reader = _StreamReader(io.StringIO(text), chunk_size=size)
+        reader.skip_ws()
+        reader.expect('[')
+        for vv in values:
+            reader.skip_ws()
+            assert_true(reader.decode_value() == vv)
+            reader.skip_ws()
+            reader.next()
+
+        reader.skip_ws()
+        assert_true(reader.peek() == '')
+
+    # Syntax errors are raised without reading the rest of the input
+    for bad in ['[1, ]', '{"a" 1}', '[tru, 1]', '"\\x"', '[1.5.2]']:
+        text = bad + " [" + "1, " * 100000 + "1]"
+        reader = _StreamReader(io.StringIO(text), chunk_size=64)
+        with assert_raises(ValueError):
+            reader.decode_value()
+        assert_true(len(reader._buf) < 1000)
+
+    return
+
+
+def _write_synthetic_entry(fname, num):
+    """Write an entry with `num` photometric points, without constructing it in memory.
+    """
+    with open(fname, 'w') as out:
+        out.write('{"name": "synthetic", "sources": [')
+        out.write(json.dumps(SRC))
+        out.write('], "photometry": [\n')
+        for ii in range(num):
+            if ii > 0:
+                out.write(',\n')
+            phot = dict(PHOT, time="{:.4f}".format(45000.0 + ii*1e-3))
+            out.write(json.dumps(phot))
+        out.write(']}')
+
+    return
+
+
+@benchmark
+def test_benchmark_memory():
+    print("test_streaming.test_benchmark_memory()")
+    path = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(path, "synthetic.json")
+        _write_synthetic_entry(fname, BENCHMARK_NUM_POINTS)
+        size = os.path.getsize(fname)
+
+        def run_full():
+            Entry._SCHEMA.validate(pas.utils.json_load_file(fname), compiled=True)
+
+        def run_stream():
+            assert_true(len(Entry.validate_file(fname)) == 0)
+
+        peaks = []
+        for func in [run_full, run_stream]:
+            tracemalloc.start()
+            dur = timeit.timeit(func, number=1)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            print("\t{:10s}: {:.2e} s, peak memory: {:.2e} bytes".format(
+                func.__name__, dur, peaks[-1]))
+
+        print("\tfile size: {:.2e} bytes, {} points".format(size, BENCHMARK_NUM_POINTS))
+    finally:
+        shutil.rmtree(path)
+
+    return
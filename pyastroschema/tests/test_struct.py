@@ -8,7 +8,7 @@ Can be run with:
 
 import warnings
 
-from nose.tools import assert_true, assert_raises
+from nose.tools import assert_true, assert_false, assert_raises
 
 import pyastroschema as pas
 from pyastroschema import struct, schema, keys
@@ -241,3 +241,83 @@ def test_custom_schema_class():
         Test_Struct(name_test="hello", number_test=1)
 
     return
+
+
+def test_incremental_validate():
+    print("test_struct.test_incremental_validate()")
+    schema_0 = dict(
+        properties=dict(
+            name=dict(type="string"),
+            number=dict(type="number"),
+            flag=dict(type="boolean", default=False),
+            values=dict(type="array", items=dict(type="number"))
+        ),
+        required=["name", "number"]
+    )
+
+    @struct.set_struct_schema(schema_0)
+    class Test_Struct(struct.Struct):
+        pass
+
+    test = Test_Struct(name="hello", number=1, values=[1, 2])
+    assert_true(test._dirty == set())
+
+    # By default, validation is always full
+    assert_false(struct.INCREMENTAL)
+    test.validate(incremental=True)
+    dict.__getitem__(test, "values").append("3")
+    test.validate(incremental=True)
+    with assert_raises(pas.ValidationError):
+        test.validate()
+    dict.__getitem__(test, "values").pop()
+    test.validate()
+    assert_true(test._dirty == set())
+
+    # Changed properties are tracked, and re-validated
+    test["number"] = "1"
+    assert_true(test._dirty == set(["number"]))
+    with assert_raises(pas.ValidationError) as cm:
+        test.validate(incremental=True)
+    assert_true(list(cm.exception.path) == ["number"])
+    # Failed validation leaves properties flagged
+    with assert_raises(pas.ValidationError):
+        test.validate(incremental=True)
+
+    test.update(number=2)
+    test.validate(incremental=True)
+
+    # Object-level constraints are checked
+    del test["name"]
+    with assert_raises(pas.ValidationError):
+        test.validate(incremental=True)
+    test.setdefault("name", "again")
+    test.validate(incremental=True)
+
+    # Defaults are restored, as with full validation
+    test.pop("flag")
+    test.validate(incremental=True)
+    assert_true(test["flag"] is False)
+
+    # Accessing mutable values flags them, as they can be modified in place
+    test.validate(incremental=True)
+    test["values"].append("3")
+    assert_true("values" in test._dirty)
+    with assert_raises(pas.ValidationError):
+        test.validate(incremental=True)
+    test["values"].pop()
+    test.validate(incremental=True)
+
+    # Changes through other references must be flagged explicitly
+    values = test["values"]
+    test.validate(incremental=True)
+    values.append("3")
+    test.validate(incremental=True)
+    test.mark_dirty("values")
+    with assert_raises(pas.ValidationError):
+        test.validate(incremental=True)
+
+    # Full validation
+    with assert_raises(pas.ValidationError):
+        test.validate(incremental=False)
+
+    return
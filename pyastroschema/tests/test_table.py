@@ -0,0 +1,156 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import gc
+import json
+import random
+import timeit
+import tracemalloc
+from collections import OrderedDict
+
+from nose.tools import assert_true, assert_false, assert_raises
+
+from pyastroschema import struct, table
+from pyastroschema.struct import Photometry, PhotometryTable
+from pyastroschema.tests import benchmark
+
+# Number of rows used in benchmarks, set the environment variable to e.g. 1000000
+BENCHMARK_NUM_ROWS = int(os.environ.get("PYASTROSCHEMA_BENCH_TABLE_ROWS", 20000))
+
+
+def _records(num, seed=1234):
+    rand = random.Random(seed)
+    recs = []
+    for ii in range(num):
+        rec = dict(time="{:.5f}".format(45000.0 + ii*0.01),
+                   magnitude="{:.2f}".format(rand.uniform(15.0, 20.0)),
+                   band=rand.choice(["V", "B", "R"]), source="1")
+        if rand.random() < 0.3:
+            rec['e_magnitude'] = "0.1"
+        if rand.random() < 0.2:
+            rec['upperlimit'] = rand.random() < 0.5
+        if rand.random() < 0.1:
+            rec['frequency'] = rand.choice([1.5, 2.5])
+        recs.append(rec)
+
+    # Round-trip through JSON so that strings are distinct objects, as when loaded from files
+    return json.loads(json.dumps(recs))
+
+
+def test_round_trip():
+    print("test_table.test_round_trip()")
+    recs = _records(1000)
+    tab = Photometry.Table.from_records(recs)
+    assert_true(Photometry.Table is PhotometryTable)
+    assert_true(len(tab) == len(recs))
+    assert_true(set(tab.columns) == set(kk for rr in recs for kk in rr))
+
+    # Row views behave like (read-only) dictionaries
+    for rec, row in zip(recs, tab):
+        assert_true(dict(row) == rec)
+        assert_true(len(row) == len(rec))
+        assert_true(('upperlimit' in row) == ('upperlimit' in rec))
+        assert_true(row.get('upperlimit') == rec.get('upperlimit'))
+
+    row = tab[-1]
+    assert_true(row.keychain is Photometry._KEYCHAIN)
+    with assert_raises(KeyError):
+        row['nothing']
+    with assert_raises(IndexError):
+        tab[len(recs)]
+
+    # Materialize full objects and JSON
+    phot = tab[3].to_struct(validate=True)
+    assert_true(isinstance(phot, Photometry))
+    assert_true(phot == recs[3])
+    assert_true(tab[3].is_duplicate_of(Photometry(**recs[3])))
+    assert_true(json.loads(tab.dumps()) == recs)
+    assert_true(tab.column('band') == [rr['band'] for rr in recs])
+    assert_true(tab.column('frequency') == [rr.get('frequency') for rr in recs])
+
+    # Numeric and boolean columns are stored in typed arrays
+    assert_true(tab._columns['upperlimit'].kind is bool)
+    assert_true(tab._columns['band'].kind is None)
+    assert_true(tab._columns['time'].mask is None)
+
+    assert_true(len(tab.validate()) == 0)
+    return
+
+
+def test_mixed_columns():
+    tab = PhotometryTable()
+    tab.append(dict(time="1.0", frequency=1.5))
+    tab.append(dict(time="2.0", frequency="2.5"))
+    tab.append(dict(time="3.0", frequency=2**70, e_time=0.1))
+    tab.append(dict(time="4.0"))
+    assert_true(tab.column('frequency') == [1.5, "2.5", 2**70, None])
+    assert_true(tab.column('e_time') == [None, None, 0.1, None])
+    assert_false('e_time' in tab[0])
+    # Invalid rows (missing 'source') are reported
+    assert_true(len(tab.validate()) == 4)
+
+    # Non-extendable classes reject unknown properties
+    @struct.set_struct_schema("photometry", extendable=False)
+    class Strict_Photometry(struct.Struct):
+        pass
+
+    tab = Strict_Photometry.Table()
+    with assert_raises(RuntimeError):
+        tab.append(dict(time="1.0", bad_key=1))
+    # Rejected records leave no partial rows
+    tab.append(dict(time="2.0", band="V"))
+    assert_true(len(tab) == 1)
+    assert_true(tab.column('time') == ["2.0"])
+    with assert_raises(RuntimeError):
+        tab.append(OrderedDict([("band", "B"), ("bad_key", 1)]))
+    tab.append(dict(time="3.0", band="R"))
+    assert_true(tab.column('band') == ["V", "R"])
+    assert_true(tab[1].to_dict() == dict(time="3.0", band="R"))
+
+    # Subclasses of `str` (e.g. `numpy.str_`) are stored as they are
+    class Name(str):
+        pass
+
+    tab = PhotometryTable()
+    tab.append(dict(time=Name("1.0"), band="V"))
+    assert_true(tab.column('time') == ["1.0"])
+    assert_true(type(tab[0]['time']) is Name)
+
+    with assert_raises(ValueError):
+        table.StructTable()
+
+    return
+
+
+@benchmark
+def test_benchmark_table():
+    print("test_table.test_benchmark_table()")
+
+    def measure(func):
+        recs = _records(BENCHMARK_NUM_ROWS)
+        gc.collect()
+        tracemalloc.start()
+        beg = tracemalloc.get_traced_memory()[0]
+        dur = timeit.default_timer()
+        result = func(recs)
+        dur = timeit.default_timer() - dur
+        # Drop the input records, only retaining the constructed container
+        del recs
+        gc.collect()
+        mem = tracemalloc.get_traced_memory()[0] - beg
+        tracemalloc.stop()
+        return result, dur, mem
+
+    structs, t_obj, m_obj = measure(lambda recs: [Photometry(validate=False, **rr) for rr in recs])
+    tab, t_tab, m_tab = measure(PhotometryTable.from_records)
+    assert_true(len(tab) == len(structs))
+    print("\t{} rows, list of `Photometry`: {:.2e} s, {:.2e} bytes".format(
+        BENCHMARK_NUM_ROWS, t_obj, m_obj))
+    print("\t{} rows, `PhotometryTable`:    {:.2e} s, {:.2e} bytes ({:.1f}x smaller)".format(
+        BENCHMARK_NUM_ROWS, t_tab, m_tab, m_obj/m_tab))
+    return
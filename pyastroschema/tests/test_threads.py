@@ -0,0 +1,138 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import sys
+import copy
+import pickle
+import timeit
+import threading
+
+from nose.tools import assert_true
+
+from pyastroschema import schema
+from pyastroschema.schema import SchemaDict
+from pyastroschema.tests import benchmark
+
+# Number of threads used to stress test a single schema
+STRESS_THREADS = int(os.environ.get("PYASTROSCHEMA_BENCH_THREADS", 16))
+# Number of entries validated in benchmarks
+BENCHMARK_NUM = int(os.environ.get("PYASTROSCHEMA_BENCH_THREADS_NUM", 4000))
+
+SRC = dict(alias="1", name="Someone")
+PHOT = dict(time="45481.00", magnitude="18.2", band="V", source="1")
+ENTRIES = [
+    dict(name="sn1990a", sources=[SRC], photometry=[PHOT, PHOT]),
+    dict(name="sn1990a", sources=[SRC], redshift=[dict(value="0.1", source="1")]),
+    dict(name="sn1990a", sources=[SRC], photometry=[PHOT, dict(PHOT, magnitude="bright")]),
+    dict(name="sn1990a", sources=[dict(name=3)]),
+    dict(name=3, sources=[SRC]),
+    dict(sources=[SRC]),
+]
+
+
+def _results(schema_dict, data):
+    """Validation results of each item, for each type of validator, without modifying the items.
+    """
+    results = []
+    for compiled in [False, True]:
+        validator = schema_dict._get_validator(compiled, set_defaults=False)
+        results.append([[(list(err.path), err.message) for err in validator.iter_errors(item)]
+                        for item in data])
+    return results
+
+
+def test_stress_threads():
+    print("test_threads.test_stress_threads()")
+    data = [copy.deepcopy(ENTRIES[ii % len(ENTRIES)]) for ii in range(120)]
+    expected = _results(SchemaDict("entry"), data)
+    expected_many = SchemaDict("entry").validate_many(data, set_defaults=False, jobs=1)
+    assert_true(len(expected_many) > 0)
+
+    # A single, fresh, schema is used from all threads at once
+    schema_dict = SchemaDict("entry")
+    barrier = threading.Barrier(STRESS_THREADS)
+    results = [None] * STRESS_THREADS
+    errors = []
+
+    def run(num):
+        try:
+            barrier.wait()
+            compiled = schema_dict.compile()
+            pure = schema_dict.compile(set_defaults=False)
+            plan = schema_dict.defaults_plan()
+            found = _results(schema_dict, data)
+            many = schema_dict.validate_many(data, set_defaults=False, jobs=1 + num % 3)
+            # Instances owned by each thread can have their defaults set
+            own = copy.deepcopy(data[:10])
+            schema_dict.validate_many(own, compiled=bool(num % 2))
+            results[num] = (compiled, pure, plan, found, many)
+        except Exception as err:
+            errors.append(err)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=run, args=(ii,)) for ii in range(STRESS_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert_true(len(errors) == 0)
+    # Cached validators are constructed exactly once
+    for ii in range(3):
+        assert_true(len(set(id(res[ii]) for res in results)) == 1)
+    assert_true(results[0][0] is schema_dict.compile())
+    for res in results:
+        assert_true(res[3] == expected)
+        assert_true(res[4] == expected_many)
+    return
+
+
+def test_validate_many_jobs():
+    print("test_threads.test_validate_many_jobs()")
+    schema_dict = SchemaDict("entry")
+    data = [ENTRIES[ii % len(ENTRIES)] for ii in range(3*schema.THREAD_CHUNK_SIZE + 5)]
+    for compiled in [False, True]:
+        expected = schema_dict.validate_many(data, compiled=compiled, set_defaults=False)
+        assert_true(len(expected) > schema.THREAD_CHUNK_SIZE)
+        for jobs in [2, 4]:
+            found = schema_dict.validate_many(iter(data), compiled=compiled,
+                                              set_defaults=False, jobs=jobs)
+            assert_true(found == expected)
+            for max_errors in [1, 7, len(expected) - 1]:
+                found = schema_dict.validate_many(data, max_errors=max_errors, compiled=compiled,
+                                                  set_defaults=False, jobs=jobs)
+                assert_true(found == expected[:max_errors])
+
+    # Cached validators are not copied
+    schema_dict.validate(copy.deepcopy(ENTRIES[0]), compiled=False)
+    for other in [copy.deepcopy(schema_dict), pickle.loads(pickle.dumps(schema_dict))]:
+        assert_true(other == schema_dict)
+        assert_true(other._compiled_validator is None)
+        assert_true(other.validate_many(data, set_defaults=False, jobs=2) == expected)
+    return
+
+
+@benchmark
+def test_benchmark_threads():
+    print("test_threads.test_benchmark_threads()")
+    schema_dict = SchemaDict("entry")
+    data = [ENTRIES[ii % len(ENTRIES)] for ii in range(BENCHMARK_NUM)]
+    schema_dict.compile(set_defaults=False)
+    times = []
+    for jobs in [1, 4]:
+        times.append(min(timeit.repeat(
+            lambda: schema_dict.validate_many(data, set_defaults=False, jobs=jobs),
+            number=1, repeat=3)))
+
+    print("\t{} entries (free-threaded: {}), jobs=1: {:.2e} s, jobs=4: {:.2e} s ({:.1f}x)".format(
+        BENCHMARK_NUM, schema.FREE_THREADED, times[0], times[1], times[0]/times[1]))
+    return
@@ -0,0 +1,256 @@
+"""Test methods.
+
+Can be run with:
+    $ nosetests path/to/test_file.py
+    $ nosetests path/to/test_file.py:Test_Class.test_method
+
+"""
+import os
+import gc
+import io
+import json
+import shutil
+import tempfile
+import timeit
+import tracemalloc
+from collections import OrderedDict
+
+from nose.tools import assert_true, assert_false, assert_raises
+
+import pyastroschema as pas
+from pyastroschema import utils, schema
+from pyastroschema.struct import Entry
+from pyastroschema.tests import benchmark
+
+
+def test_registry_cache():
+    print("test_utils.test_registry_cache()")
+    registry = utils.SchemaRegistry()
+
+    # Cached objects should be reused, and copies should be distinct but equal
+    index_1 = registry.index(copy=False)
+    index_2 = registry.index(copy=False)
+    assert_true(index_1 is index_2)
+
+    index_3 = registry.index()
+    assert_false(index_3 is index_1)
+    assert_true(index_3 == index_1)
+
+    # Modifying a copy should not change the cached version
+    index_3[pas.META_KEYS.INDEX].pop('source')
+    assert_true('source' in registry.index()[pas.META_KEYS.INDEX])
+
+    schema_1, path, name = registry.schema('photometry')
+    schema_2, _, _ = registry.schema('photometry')
+    assert_true(name == 'photometry')
+    assert_true(schema_1 == schema_2)
+    assert_false(schema_1 is schema_2)
+    assert_false(schema_1['properties'] is schema_2['properties'])
+    return
+
+
+def test_registry_invalidation():
+    print("test_utils.test_registry_invalidation()")
+    registry = utils.SchemaRegistry()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "test.json")
+        with open(fname, 'w') as out:
+            json.dump(dict(title="test", value=1), out)
+
+        data, path, name = registry.schema(fname)
+        assert_true(data['value'] == 1)
+        assert_true(name == "test")
+
+        # Rewrite file, and make sure the modification time changes
+        with open(fname, 'w') as out:
+            json.dump(dict(title="test", value=2), out)
+        mtime = os.path.getmtime(fname) + 10.0
+        os.utime(fname, (mtime, mtime))
+
+        data, path, name = registry.schema(fname)
+        assert_true(data['value'] == 2)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
+
+
+@benchmark
+def test_benchmark_registry():
+    print("test_utils.test_benchmark_registry()")
+    NUM = 200
+
+    def load_disk():
+        utils.json_load_file(utils.path_for_schema_file('photometry'))
+
+    def load_registry():
+        utils.load_schema_dict('photometry')
+
+    t_disk = min(timeit.repeat(load_disk, number=NUM, repeat=3))
+    t_reg = min(timeit.repeat(load_registry, number=NUM, repeat=3))
+    print("\tphotometry x{}: disk: {:.2e} s, registry: {:.2e} s ({:.1f}x)".format(
+        NUM, t_disk, t_reg, t_disk/t_reg))
+    return
+
+
+def _entry(num):
+    phot = dict(time="45481.00", magnitude="18.2", band="V", source="1", u_time="MJD")
+    return Entry(name="SN-\u00e9", sources=[dict(alias=0)], validate=False,
+                 photometry=[dict(phot, e_magnitude=ii*0.01) for ii in range(num)])
+
+
+def test_json_backends():
+    print("test_utils.test_json_backends()")
+    ent = _entry(20)
+    kw = utils._json_dump_kwargs()
+    # Identical mode matches the `json` module, with the previous formatting
+    assert_true(ent.dumps(identical=True) == json.dumps(ent, **kw))
+    assert_true(str(ent) == ent.dumps())
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "test.json")
+        for backend in utils.JSON_BACKENDS:
+            for pretty in [True, False]:
+                text = ent.dumps(pretty=pretty, backend=backend)
+                # Order of keys and non-ASCII characters are preserved
+                assert_true("SN-\u00e9" in text)
+                assert_true(list(json.loads(text).keys()) == list(ent.keys()))
+                assert_true(json.loads(text) == json.loads(json.dumps(ent)))
+                assert_true(("\n" in text) == pretty)
+
+                # Streamed output matches the full string
+                out = io.StringIO()
+                utils.json_dump_stream(ent, out, pretty=pretty, backend=backend)
+                assert_true(out.getvalue() == text)
+                ent.dump(fname, pretty=pretty, backend=backend)
+                with open(fname, 'r') as inp:
+                    assert_true(inp.read() == text)
+
+        ent.dump(fname, identical=True)
+        with open(fname, 'r') as inp:
+            assert_true(inp.read() == json.dumps(ent, **kw))
+    finally:
+        shutil.rmtree(temp_dir)
+
+    # Values not supported by a backend fall back to `json`, for the whole document
+    assert_true(utils.JSON_BACKEND == "json")
+    data = OrderedDict([("a", dict(b=1.5)), ("c", [2**70, float("nan"), float("-inf")])])
+    expected = json.dumps(data, **utils._json_dump_kwargs())
+    assert_true("NaN" in expected)
+    for backend in utils.JSON_BACKENDS:
+        assert_true(json.loads(utils.json_dump_str([2**70], backend=backend)) == [2**70])
+        assert_true(utils.json_dump_str(data, backend=backend) == expected)
+        out = io.StringIO()
+        utils.json_dump_stream(data, out, backend=backend)
+        assert_true(out.getvalue() == expected)
+
+    # Keys which are not strings are converted as by `json`
+    data = OrderedDict([(None, 1), (True, 2), (False, 3), (4, dict([(1.5, 5), (2**70, 6)])),
+                        ("x", {float("nan"): 7, float("-inf"): [8]})])
+    for pretty in [True, False]:
+        expected = json.dumps(data, **utils._json_dump_kwargs(indent=2 if pretty else None))
+        assert_true('"null"' in expected)
+        for backend in utils.JSON_BACKENDS:
+            assert_true(utils.json_dump_str(data, pretty=pretty, backend=backend) == expected)
+            out = io.StringIO()
+            utils.json_dump_stream(data, out, pretty=pretty, backend=backend)
+            assert_true(out.getvalue() == expected)
+    with assert_raises(TypeError):
+        utils.json_dump_stream({(1, 2): 1}, io.StringIO())
+    # Custom backends
+    utils.register_json_backend("test", lambda data, pretty: json.dumps(data))
+    try:
+        assert_true(utils.json_dump_str([1], backend="test") == "[1]")
+    finally:
+        utils.JSON_BACKENDS.pop("test")
+    assert_true(utils.json_dump_str([1], backend="json", pretty=False) == "[1]")
+
+    return
+
+
+@benchmark
+def test_benchmark_json():
+    print("test_utils.test_benchmark_json()")
+    NUM = 20000
+    ent = _entry(NUM)
+    out = io.StringIO()
+    t_ident = min(timeit.repeat(lambda: ent.dumps(identical=True), number=1, repeat=3))
+    print("\tEntry with {} points, identical: {:.2e} s".format(NUM, t_ident))
+    for backend in utils.JSON_BACKENDS:
+        for pretty in [True, False]:
+            dur = min(timeit.repeat(lambda: ent.dumps(pretty=pretty, backend=backend),
+                                    number=1, repeat=3))
+            t_str = min(timeit.repeat(
+                lambda: utils.json_dump_stream(ent, out, pretty=pretty, backend=backend),
+                number=1, repeat=3))
+            print("\t\t'{}' (pretty={}): {:.2e} s ({:.1f}x), stream: {:.2e} s".format(
+                backend, pretty, dur, t_ident/dur, t_str))
+
+    return
+
+
+def test_json_loaders():
+    print("test_utils.test_json_loaders()")
+    ent = _entry(20)
+    text = ent.dumps()
+    data = utils.json_load_str(text)
+    assert_true(isinstance(data, OrderedDict))
+    assert_true(isinstance(data['photometry'][0], OrderedDict))
+    loaded = schema.JSONOrderedDict.loads(text, ordered=False)
+    assert_true(type(loaded) is schema.JSONOrderedDict)
+    assert_true(type(loaded['photometry'][0]) is dict)
+
+    for backend in utils.JSON_LOADERS:
+        for inp in [text, text.encode('utf-8')]:
+            data = utils.json_load_str(inp, ordered=False, backend=backend)
+            assert_true(type(data) is dict)
+            assert_true(type(data['photometry'][0]) is dict)
+            assert_true(data == ent)
+            assert_true(list(data.keys()) == list(ent.keys()))
+            # Values not supported by a backend fall back to `json`
+            assert_true(utils.json_load_str("[NaN, {}]".format(2**70), ordered=False,
+                                            backend=backend)[1] == 2**70)
+
+    # Cached schemas can be loaded as either type
+    fname = utils.path_for_schema_file('photometry')
+    registry = utils.SchemaRegistry()
+    plain = registry.load_file(fname, ordered=False)
+    assert_true(type(plain) is dict)
+    assert_true(isinstance(registry.load_file(fname), OrderedDict))
+    assert_true(plain == registry.load_file(fname))
+    return
+
+
+@benchmark
+def test_benchmark_json_load():
+    print("test_utils.test_benchmark_json_load()")
+    NUM = 20000
+    temp_dir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(temp_dir, "entry.json")
+        _entry(NUM).dump(fname)
+
+        def measure(**kwargs):
+            dur = min(timeit.repeat(lambda: utils.json_load_file(fname, **kwargs),
+                                    number=1, repeat=3))
+            gc.collect()
+            tracemalloc.start()
+            data = utils.json_load_file(fname, **kwargs)
+            mem = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            del data
+            return dur, mem
+
+        t_ord, m_ord = measure(ordered=True)
+        print("\tEntry with {} points, `OrderedDict`: {:.2e} s, {:.2e} bytes".format(
+            NUM, t_ord, m_ord))
+        for backend in utils.JSON_LOADERS:
+            dur, mem = measure(ordered=False, backend=backend)
+            print("\t\t'{}' `dict`: {:.2e} s ({:.1f}x), {:.2e} bytes ({:.1f}x smaller)".format(
+                backend, dur, t_ord/dur, mem, m_ord/mem))
+    finally:
+        shutil.rmtree(temp_dir)
+
+    return
@@ -6,15 +6,65 @@ Can be run with:
 
 """
 # from __future__ import absolute_import, division, print_function, unicode_literals
+import os
+import timeit
+
+import six
 
 from nose.tools import assert_true, assert_raises   # , assert_false, assert_equal,
 
 # import pyastroschema as pas
+from pyastroschema import validation
 from pyastroschema.validation import PAS_Validator
+from pyastroschema.tests import benchmark
 
 import jsonschema  # noqa
 from jsonschema.exceptions import ValidationError
 
+# Number of values of each kind used in benchmarks
+BENCHMARK_NUM_VALUES = int(os.environ.get("PYASTROSCHEMA_BENCH_FORMAT_VALUES", 20000))
+
+# Values which are tricky to check, with `float` accepting some (but not all) of the strings
+FORMAT_VALUES = [
+    0, 12, -3.5, 1e300, True, 2**80, float('nan'), "2.234", "-2.23e4", "+1.", ".5", "1e5",
+    "1E-5", "007", "nan", "-inf", "Infinity", "1_000", "\t12", "12\n", u"\u0661\u0662", "", " ",
+    " 2.234", "2.234 ", "2p234", "h", "V", "e5", "1e", "1.2.3", "--1", "-", "/", "1/2",
+    "2019-01-01", "2019-01-01T12:00:00", "12/31/1999", "1,5", [], ["1"], {}, None, dict(a=1)]
+
+
+def _numeric_reference(value):
+    """Original numeric format check (except for raising errors on containers and `None`).
+    """
+    if isinstance(value, (list, dict)) or (value is None):
+        return False
+
+    if isinstance(value, six.string_types) and ' ' in value:
+        return False
+
+    try:
+        float(value)
+    except ValueError:
+        return False
+
+    return True
+
+
+def _astrotime_reference(value):
+    if (not _numeric_reference(value)) and (('-' not in value) and ('/' not in value)):
+        return False
+
+    return True
+
+
+def _benchmark_values(num):
+    return dict(
+        numbers=[ii * 0.37 for ii in range(num)],
+        numeric_strings=["{:.3f}".format(ii * 0.37) for ii in range(num)],
+        repeated_strings=["{:.3f}".format(ii % 100 * 0.37) for ii in range(num)],
+        iso_dates=["20{:02d}-01-{:02d}".format(ii % 100, ii % 28 + 1) for ii in range(num)],
+        garbage=["band-{}".format(chr(65 + ii % 26)) if ii % 2 else "V" * (ii % 7 + 1)
+                 for ii in range(num)])
+
 
 schema_numeric = {
     "type": ["number", "string"],
@@ -129,3 +179,56 @@ def test_numeric_listable():
         pas_valid.validate([12, "2.234", "hello"])
 
     return
+
+
+def test_format_checks():
+    print("test_validator.test_format_checks()")
+    for memo_limit in [validation.FORMAT_MEMO_LIMIT, 0]:
+        old = validation.FORMAT_MEMO_LIMIT
+        validation.FORMAT_MEMO_LIMIT = memo_limit
+        try:
+            # Check twice: the second time strings may be memoized
+            for ii in range(2):
+                for value in FORMAT_VALUES:
+                    numeric = validation.contains_numeric_value(value)
+                    assert_true(numeric == _numeric_reference(value))
+                    if isinstance(value, six.string_types):
+                        assert_true(validation.is_astrotime_compatible(value) ==
+                                    _astrotime_reference(value))
+                    else:
+                        assert_true(validation.is_astrotime_compatible(value) == numeric)
+        finally:
+            validation.FORMAT_MEMO_LIMIT = old
+
+    for fmt, func in validation.FORMAT_FUNCTIONS.items():
+        assert_true(validation.format_checker.checkers[fmt][0] is func)
+        assert_true(validation.check_many(fmt, FORMAT_VALUES) ==
+                    [func(vv) for vv in FORMAT_VALUES])
+
+    # Values which previously raised errors are now invalid
+    pas_valid = PAS_Validator(schema_numeric)
+    for value in [None, dict(a=1)]:
+        with assert_raises(ValidationError):
+            pas_valid.validate(value)
+
+    return
+
+
+@benchmark
+def test_benchmark_formats():
+    print("test_validator.test_benchmark_formats()")
+    NUM = 3
+    for name, values in _benchmark_values(BENCHMARK_NUM_VALUES).items():
+        for fmt, ref in [("numeric", _numeric_reference), ("astrotime", _astrotime_reference)]:
+            func = validation.FORMAT_FUNCTIONS[fmt]
+            assert_true([func(vv) for vv in values] == [ref(vv) for vv in values])
+            times = [min(timeit.repeat(lambda: [ff(vv) for vv in values], number=NUM,
+                                       repeat=3)) / NUM for ff in [ref, func]]
+            times.append(min(timeit.repeat(lambda: validation.check_many(fmt, values),
+                                           number=NUM, repeat=3)) / NUM)
+            print("\t{:>16s} ({} values), {:>9s}, original: {:.2e} s, new: {:.2e} s ({:.1f}x), "
+                  "batch: {:.2e} s ({:.1f}x)".format(name, len(values), fmt, times[0], times[1],
+                                                     times[0]/times[1], times[2],
+                                                     times[0]/times[2]))
+
+    return
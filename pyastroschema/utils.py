@@ -3,13 +3,119 @@
 
 import os
 import json
+import math
+import pickle
+import threading
 from collections import OrderedDict
 
 from . import PATHS, META_KEYS
 
 
+class SchemaRegistry(object):
+    """Process-wide cache of the schema-index and schema files, loaded from disk only as needed.
+
+    Each file is parsed once and stored along with its modification time; if the file on disk
+    changes, the cached entry is invalidated and the file is reloaded.  Callers are given copies
+    of the cached data by default, so that modifications do not propagate back into the cache.
+    Copies are made from a cached pickle of the data, which is considerably faster than either
+    `copy.deepcopy` or re-parsing the JSON.
+
+    """
+
+    def __init__(self, index_fname=None):
+        if index_fname is None:
+            index_fname = PATHS.INDEX_JSON_FILE
+
+        self._index_fname = index_fname
+        # Cached data for each filename, stored as `(mtime, data, pickled-data)`
+        self._cache = {}
+        self._lock = threading.Lock()
+        return
+
+    def load_file(self, fname, copy=True, ordered=None):
+        """Load the JSON data from the given filename, using the cached version if possible.
+
+        Arguments
+        ---------
+        fname : str
+            Path to JSON file.
+        copy : bool
+            If `True`, return a copy of the cached data, otherwise the cached object itself
+            (which must *not* be modified) is returned.
+        ordered : bool or `None`
+            Load JSON objects as `OrderedDict`s or plain `dict`s, see `json_load_str`.
+
+        Returns
+        -------
+        data : `OrderedDict` (or `dict`)
+
+        """
+        if ordered is None:
+            ordered = JSON_ORDERED
+
+        fname = os.path.abspath(fname)
+        key = (fname, bool(ordered))
+        mtime = os.path.getmtime(fname)
+        cached = self._cache.get(key, None)
+        if (cached is None) or (cached[0] != mtime):
+            with self._lock:
+                # Check again, in case another thread has already reloaded this file
+                cached = self._cache.get(key, None)
+                if (cached is None) or (cached[0] != mtime):
+                    data = json_load_file(fname, ordered=ordered)
+                    blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+                    cached = (mtime, data, blob)
+                    self._cache[key] = cached
+
+        if copy:
+            return pickle.loads(cached[2])
+
+        return cached[1]
+
+    def index(self, copy=True):
+        """Load the schema-index.
+        """
+        return self.load_file(self._index_fname, copy=copy)
+
+    def schema(self, sname, copy=True):
+        """Load the schema with the given name (from the index) or filename.
+
+        Returns
+        -------
+        schema : odict
+        path : str
+        name : str
+
+        """
+        if os.path.exists(sname):
+            schema = self.load_file(sname, copy=copy)
+            name = os.path.basename(sname).split('.json')[0]
+            path = os.path.join(os.path.abspath(os.path.dirname(sname)), "")
+            return schema, path, name
+
+        schema_fname = path_for_schema_file(sname)
+        schema = self.load_file(schema_fname, copy=copy)
+        path = os.path.join(os.path.abspath(os.path.dirname(schema_fname)), "")
+        title = schema['title']
+        if title != sname:
+            err = "Loaded schema title mismatch!  Target: '{}', Loaded: '{}'".format(sname, title)
+            raise ValueError(err)
+
+        return schema, path, title
+
+    def clear(self):
+        """Remove all cached data.
+        """
+        with self._lock:
+            self._cache.clear()
+        return
+
+
+REGISTRY = SchemaRegistry()
+
+
 def load_schema_index():
-    index = json_load_file(PATHS.INDEX_JSON_FILE)
+    index = REGISTRY.index()
     return index
 
 
@@ -21,14 +127,14 @@ def index_entry_for_schema(sname):
     schema_meta: dict
 
     """
-    index = load_schema_index()
+    index = REGISTRY.index(copy=False)
     index = index[META_KEYS.INDEX]
     if sname not in index.keys():
         err = "Schema '{}' does not exist as a file, and is not found in the index!".format(sname)
         raise ValueError(err)
 
     # Load the meta-data for this particular schema
-    schema_meta = index[sname]
+    schema_meta = OrderedDict(index[sname])
     return schema_meta
 
 
@@ -49,53 +155,311 @@ def path_for_schema_file(sname):
 
 
 def load_schema_dict(sname):
-    """
+    """Load a schema, by name or filename, using the process-wide `REGISTRY` cache.
 
     Returns
     -------
     schema : odict
+    path : str
+    name : str
 
     """
-    if os.path.exists(sname):
-        schema = json_load_file(sname)
-        name = os.path.basename(sname).split('.json')[0]
-        path = os.path.join(os.path.abspath(os.path.dirname(sname)), "")
-        return schema, path, name
+    return REGISTRY.schema(sname)
 
-    schema_fname = path_for_schema_file(sname)
-    schema = json_load_file(schema_fname)
-    path = os.path.join(os.path.abspath(os.path.dirname(schema_fname)), "")
-    title = schema['title']
-    if title != sname:
-        err = "Loaded schema title mismatch!  Target: '{}', Loaded: '{}'".format(sname, title)
-        raise ValueError(err)
 
-    return schema, path, title
+def _encode_json(data, pretty):
+    """Encode data to JSON using the standard-library `json` module.
+    """
+    return json.dumps(data, **_json_dump_kwargs(indent=2 if pretty else None))
+
+
+def _encode_orjson(data, pretty):
+    """Encode data to JSON using `orjson`, falling back to `json` for unsupported values.
+    """
+    if not _orjson_compatible(data):
+        return _encode_json(data, pretty)
+    return _orjson_dumps(data, pretty)
+
+
+def _orjson_dumps(data, pretty):
+    option = _ORJSON_PRETTY if pretty else _ORJSON_COMPACT
+    return orjson.dumps(data, option=option).decode('utf-8')
+
+
+# Range of integers which `orjson` can encode
+_ORJSON_INT_RANGE = (-2**63, 2**64)
+
+
+def _orjson_compatible(data):
+    """Whether `orjson` encodes `data` the same as `json`, i.e. without errors or lost values.
+
+    `orjson` cannot encode integers larger than 64-bit, and writes non-finite floats as `null`
+    (instead of `NaN` and `Infinity`).  Keys which are not strings are converted differently.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        if (kind is bool) or (value is None) or isinstance(value, str):
+            continue
+        elif isinstance(value, dict):
+            if not all(type(key) is str for key in value):
+                return False
+            stack.extend(value.values())
+        elif isinstance(value, list) or (kind is tuple):
+            stack.extend(value)
+        elif kind is float:
+            if not math.isfinite(value):
+                return False
+        elif kind is int:
+            if not (_ORJSON_INT_RANGE[0] <= value < _ORJSON_INT_RANGE[1]):
+                return False
+        else:
+            # e.g. subclasses of `float` (such as `numpy.float64`), which `orjson` rejects
+            return False
+
+    return True
+
+
+# Functions used to encode JSON, by name.  Each is called as `func(data, pretty)` and must return
+# a `str`.  Additional backends can be added with `register_json_backend`
+JSON_BACKENDS = OrderedDict([("json", _encode_json)])
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+else:
+    _ORJSON_COMPACT = orjson.OPT_NON_STR_KEYS
+    _ORJSON_PRETTY = orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2
+    JSON_BACKENDS["orjson"] = _encode_orjson
+
+# Default backend used to serialize JSON, `None` to use the fastest available.  Other backends
+# (e.g. 'orjson') are faster, but can differ in formatting, see `json_dump_str`.
+JSON_BACKEND = "json"
+
+
+def register_json_backend(name, func):
+    """Add a function used to encode JSON, which can then be selected as the `backend`.
+
+    Arguments
+    ---------
+    name : str
+        Name of the backend.
+    func : callable
+        Called as `func(data, pretty)`, returning a JSON `str`.  Output must preserve the order
+        of dictionary keys, and must not escape non-ASCII characters (`ensure_ascii=False`).
+
+    """
+    JSON_BACKENDS[name] = func
+    return
+
 
+def get_json_backend(backend=None):
+    """Get the function used to encode JSON for the given backend name.
 
-def json_dump_str(odict, **kwargs):
+    If `backend` is `None`, the module-level `JSON_BACKEND` is used (by default 'json'), and if
+    that is also `None` the most recently added backend (i.e. the fastest available) is used.
+
+    """
+    if backend is None:
+        backend = JSON_BACKEND
+    if backend is None:
+        backend = next(reversed(JSON_BACKENDS))
+
+    try:
+        return JSON_BACKENDS[backend]
+    except KeyError:
+        err = "Unknown JSON backend '{}', available: {}".format(backend, list(JSON_BACKENDS))
+        raise ValueError(err)
+
+
+def json_dump_str(odict, pretty=True, identical=False, backend=None, **kwargs):
     """Dump the contents of a dictionary to a string using json formatting.
+
+    Arguments
+    ---------
+    odict : dict
+    pretty : bool
+        Indent the output (`True`), otherwise use compact output.
+    identical : bool
+        If `True`, use the standard-library `json` module, producing output identical to
+        previous versions.  Other backends can differ in formatting, e.g. `orjson` separates
+        keys from values with ': ' instead of ':', and formats some floats differently.  Data
+        which `orjson` cannot encode identically (e.g. non-finite floats) is encoded by `json`.
+    backend : str or `None`
+        Name of the backend to use (see `get_json_backend`).
+    **kwargs
+        Passed to `json.dumps`, which is then always used.
+
     """
-    kw = _json_dump_kwargs(indent=2)
-    jsonstring = json.dumps(odict, **kw)
-    return jsonstring
+    if identical or kwargs:
+        kw = _json_dump_kwargs(indent=2 if pretty else None, **kwargs)
+        return json.dumps(odict, **kw)
+
+    return get_json_backend(backend)(odict, pretty)
 
 
-def json_dump_file(odict, fname, **kwargs):
+def json_dump_file(odict, fname, pretty=True, identical=False, backend=None, **kwargs):
     """Dump the contents of a dictionary to a JSON file with the given filename.
+
+    See `json_dump_stream` for arguments.
+
     """
-    kw = _json_dump_kwargs(**kwargs)
     with open(fname, 'w') as out:
+        json_dump_stream(odict, out, pretty=pretty, identical=identical, backend=backend,
+                         **kwargs)
+    return
+
+
+def json_dump_stream(odict, out, pretty=True, identical=False, backend=None, **kwargs):
+    """Write the contents of a dictionary as JSON to the given (text) file object.
+
+    The output is written in pieces, without constructing the full JSON string in memory: each
+    element of the top-level container, and of any containers within it, is encoded separately.
+
+    Arguments
+    ---------
+    odict : dict
+    out : file-like
+        Object with a `write` method accepting `str`.
+    pretty, identical, backend, **kwargs
+        See `json_dump_str`.
+
+    """
+    if identical or kwargs:
+        kw = _json_dump_kwargs(indent=2 if pretty else None, **kwargs)
         json.dump(odict, out, **kw)
+        return
+
+    encode = get_json_backend(backend)
+    if encode is _encode_orjson:
+        # Choose the encoder once, so that the whole document is formatted consistently
+        encode = _orjson_dumps if _orjson_compatible(odict) else _encode_json
+    # Match the key-value separator used by the backend
+    sample = encode({"": 0}, pretty)
+    colon = sample[sample.index('""') + 2:sample.rindex("0")]
+    write = out.write
+    for chunk in _iter_json_chunks(odict, encode, pretty, colon, _JSON_STREAM_DEPTH):
+        write(chunk)
+
+    return
+
+
+# Number of levels of nested containers which `json_dump_stream` writes element by element
+_JSON_STREAM_DEPTH = 2
+
+
+def _iter_json_chunks(data, encode, pretty, colon, depth, indent=""):
+    """Yield pieces of the JSON encoding of `data`, each container element separately.
+    """
+    is_dict = isinstance(data, dict)
+    if (depth <= 0) or not (is_dict or isinstance(data, (list, tuple))) or (len(data) == 0):
+        text = encode(data, pretty)
+        if pretty and indent:
+            # JSON strings cannot contain literal new-lines, so this only indents the structure
+            text = text.replace("\n", "\n" + indent)
+        yield text
+        return
+
+    beg, end = ("{", "}") if is_dict else ("[", "]")
+    inner = indent + "  " if pretty else ""
+    sep = "\n" + inner if pretty else ""
+    items = data.items() if is_dict else data
+    yield beg
+    first = True
+    for item in items:
+        yield sep if first else "," + sep
+        first = False
+        if is_dict:
+            name, item = item
+            yield encode(_json_key(name), pretty) + colon
+        for chunk in _iter_json_chunks(item, encode, pretty, colon, depth - 1, inner):
+            yield chunk
+
+    if pretty:
+        yield "\n" + indent
+    yield end
+    return
+
+
+def _json_key(key):
+    """Convert a dictionary key to a string, in the same way as `json`.
+    """
+    if isinstance(key, str):
+        return str(key)
+    if isinstance(key, float):
+        # NOTE: `json.dumps` writes non-finite values as 'NaN', 'Infinity' and '-Infinity'
+        return json.dumps(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+
+    err = "keys must be str, int, float, bool or None, not {}".format(type(key).__name__)
+    raise TypeError(err)
+
+
+def _decode_orjson(text):
+    """Decode JSON using `orjson`, falling back to `json` for unsupported values.
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # e.g. 'NaN' and 'Infinity', or integers larger than 64-bit
+        return json.loads(text)
+
+
+# Functions used to decode JSON into plain `dict`s, by name.  Each is called as `func(text)` with
+# a `str` or `bytes`.  Additional loaders can be added with `register_json_loader`
+JSON_LOADERS = OrderedDict([("json", json.loads)])
+if orjson is not None:
+    JSON_LOADERS["orjson"] = _decode_orjson
+
+# Default for whether JSON objects are loaded as `OrderedDict` (instead of plain `dict`)
+JSON_ORDERED = True
+
+
+def register_json_loader(name, func):
+    """Add a function used to decode JSON into plain `dict`s, which can then be selected.
+    """
+    JSON_LOADERS[name] = func
     return
 
 
-def json_load_file(fname):
-    """Load the contents of a JSON file into an `OrderedDict`.
+def get_json_loader(backend=None):
+    """Get the function used to decode JSON for the given backend name.
+
+    If `backend` is `None`, the most recently added backend (i.e. the fastest available) is used.
+
     """
+    if backend is None:
+        backend = next(reversed(JSON_LOADERS))
+
     try:
-        with open(fname, 'r') as inp:
-            data = json.load(inp, object_pairs_hook=OrderedDict)
+        return JSON_LOADERS[backend]
+    except KeyError:
+        err = "Unknown JSON loader '{}', available: {}".format(backend, list(JSON_LOADERS))
+        raise ValueError(err)
+
+
+def json_load_file(fname, ordered=None, backend=None):
+    """Load the contents of a JSON file, see `json_load_str` for arguments.
+    """
+    if ordered is None:
+        ordered = JSON_ORDERED
+
+    try:
+        if ordered:
+            with open(fname, 'r') as inp:
+                data = json.load(inp, object_pairs_hook=OrderedDict)
+        else:
+            with open(fname, 'rb') as inp:
+                data = get_json_loader(backend)(inp.read())
     except Exception:
         print("ERROR: Failed to load file '{}'".format(fname))
         raise
@@ -103,11 +467,28 @@ def json_load_file(fname):
     return data
 
 
-def json_load_str(jstr):
-    """Load the contents of a JSON formatted string into an `OrderedDict`.
+def json_load_str(jstr, ordered=None, backend=None):
+    """Load the contents of a JSON formatted string into an `OrderedDict` (or `dict`).
+
+    Arguments
+    ---------
+    jstr : str or bytes
+    ordered : bool or `None`
+        Load JSON objects as `OrderedDict` (`True`), or as plain `dict` (`False`) which is
+        considerably faster and smaller, and also preserves the order of keys on python 3.7+.
+        If `None`, the module-level `JSON_ORDERED` value is used.
+    backend : str or `None`
+        Name of the loader used for plain `dict`s (see `get_json_loader`).  `OrderedDict`s are
+        always loaded using the `json` module, which is faster than converting afterwards.
+
     """
-    data = json.loads(jstr, object_pairs_hook=OrderedDict)
-    return data
+    if ordered is None:
+        ordered = JSON_ORDERED
+
+    if ordered:
+        return json.loads(jstr, object_pairs_hook=OrderedDict)
+
+    return get_json_loader(backend)(jstr)
 
 
 def _json_dump_kwargs(**kwargs):
@@ -3,6 +3,8 @@
 
 # from numbers import Number
 # from past.builtins import basestring
+import re
+
 import six
 
 from jsonschema import FormatChecker
@@ -38,16 +40,25 @@ _PAS_Validator = _extend_with_default(Validator)
 format_checker = FormatChecker()
 
 
-# Register a new format checker that checks for numerical values of the proper format
-#     NOTE: list of valid numeric values is *not* accepted, must be specified in schema
-@format_checker.checks(pas.KEY_FORMATS.NUMERIC)
-def contains_numeric_value(value):
-    if isinstance(value, list):
-        return False
+# Maximum number of distinct strings whose format-check results are stored (per format)
+FORMAT_MEMO_LIMIT = 100000
+
+# Strings which are certainly accepted by `float` (anything else is checked by calling it)
+_NUMERIC_PATTERN = re.compile(r'[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?\Z')
+# Types which are always numeric
+_NUMBER_TYPES = (float, bool) + six.integer_types
+# Results of format checks for previously seen strings, by format
+_FORMAT_MEMOS = {}
 
-    if isinstance(value, six.string_types) and ' ' in value:
+
+def _numeric_string(value):
+    if _NUMERIC_PATTERN.match(value) is not None:
+        return True
+
+    if ' ' in value:
         return False
 
+    # Other forms accepted by `float`, e.g. 'nan', '1_000', non-ascii digits
     try:
         float(value)
     except ValueError:
@@ -56,17 +67,109 @@ def contains_numeric_value(value):
     return True
 
 
+def _astrotime_string(value):
+    return ('-' in value) or ('/' in value) or _numeric_string(value)
+
+
+def _memoized(format, check_string):
+    """Store the results of `check_string` for each distinct string, up to `FORMAT_MEMO_LIMIT`.
+    """
+    memo = _FORMAT_MEMOS.setdefault(format, {})
+
+    def check(value):
+        result = memo.get(value)
+        if result is None:
+            result = check_string(value)
+            if len(memo) < FORMAT_MEMO_LIMIT:
+                memo[value] = result
+        return result
+
+    return check
+
+
+_numeric_string_memo = _memoized(pas.KEY_FORMATS.NUMERIC, _numeric_string)
+_astrotime_string_memo = _memoized(pas.KEY_FORMATS.ASTROTIME, _astrotime_string)
+
+
+def _convertible(value):
+    # Check other types (e.g. `numpy` scalars) by conversion; containers and `None` are invalid
+    if isinstance(value, (list, dict)) or (value is None):
+        return False
+
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+
+    return True
+
+
+# Register a new format checker that checks for numerical values of the proper format
+#     NOTE: list of valid numeric values is *not* accepted, must be specified in schema
+@format_checker.checks(pas.KEY_FORMATS.NUMERIC)
+def contains_numeric_value(value):
+    if type(value) in _NUMBER_TYPES:
+        return True
+
+    if isinstance(value, six.string_types):
+        return _numeric_string_memo(value)
+
+    return _convertible(value)
+
+
 # Register a new format checker that checks for numerical values of the proper format
 #     NOTE: list of valid numeric values is *not* accepted, must be specified in schema
 @format_checker.checks(pas.KEY_FORMATS.ASTROTIME)
 def is_astrotime_compatible(value):
-    if isinstance(value, list):
-        return False
+    if type(value) in _NUMBER_TYPES:
+        return True
 
-    if (not contains_numeric_value(value)) and (('-' not in value) and ('/' not in value)):
-        return False
+    if isinstance(value, six.string_types):
+        return _astrotime_string_memo(value)
 
-    return True
+    return _convertible(value)
+
+
+# Format checks with a batch form, see `check_many`
+FORMAT_FUNCTIONS = {
+    pas.KEY_FORMATS.NUMERIC: contains_numeric_value,
+    pas.KEY_FORMATS.ASTROTIME: is_astrotime_compatible,
+}
+
+
+def check_many(format, values):
+    """Check whether each of a list of values is of the given format.
+
+    Equivalent to calling the registered format checker on each value, but faster for long lists
+    (e.g. the elements of a column of photometry).
+
+    Arguments
+    ---------
+    format : str
+        One of the formats in `FORMAT_FUNCTIONS`.
+    values : list
+
+    Returns
+    -------
+    results : list of bool
+
+    """
+    check = FORMAT_FUNCTIONS[format]
+    memo = _FORMAT_MEMOS[format]
+    get = memo.get
+    number_types = _NUMBER_TYPES
+    string_types = six.string_types
+    results = []
+    for value in values:
+        if type(value) in number_types:
+            result = True
+        else:
+            result = get(value) if isinstance(value, string_types) else None
+            if result is None:
+                result = check(value)
+        results.append(result)
+
+    return results
 
 
 # Register a new format checker that checks for string values
@@ -80,8 +183,16 @@ def is_string_format(value):
 '''
 
 # Create a new instance of your custom validator. Add a custom type.
-def PAS_Validator(schema, **kwargs):
-    pas_valid = _PAS_Validator(schema, format_checker=format_checker, **kwargs)
+def PAS_Validator(schema, set_defaults=True, **kwargs):
+    """Construct a validator using the astroschema format checkers.
+
+    If `set_defaults` is True, the 'default' values of missing properties are set in each
+    validated instance.  Otherwise instances are never modified (so that e.g. shared or read-only
+    data can be validated), see `defaults.DefaultsPlan` to set them separately.
+
+    """
+    validator_class = _PAS_Validator if set_defaults else Validator
+    pas_valid = validator_class(schema, format_checker=format_checker, **kwargs)
     return pas_valid
 
 